@@ -0,0 +1,238 @@
+"""
+Scaling benchmarks for shape_and_color and past_game.
+
+Both packages have modules with the same names (libs, delaunay_triangles),
+so every (suite, case, number of points) runs in its own Python process with
+the package directory on the path. A crash or a timeout only fails that entry.
+
+Usage:
+    python benchmark.py [--suite shape_and_color past_game] [--case NAME ...]
+                        [--sizes 100 1000 ...] [--repeat 3] [--seed 0]
+                        [--output results.json] [--baseline baseline.json]
+                        [--tolerance 0.25] [--save-baseline]
+
+The results are written as JSON. With a baseline, the median time of each
+entry is compared with the baseline one and the command fails when any entry
+is slower by more than the tolerance. "--save-baseline" replaces the entries
+that were run in the baseline and keeps the others, so a new case is added
+with "--case NAME --save-baseline".
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+
+BENCHMARK_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIRECTORY = os.path.dirname(BENCHMARK_DIRECTORY)
+SUITES = ("shape_and_color", "past_game")
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIRECTORY, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIRECTORY, "baseline.json")
+DEFAULT_TIMEOUT = 1800
+
+# Differences below this many seconds are noise
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def load_cases(suite: str) -> dict:
+    sys.path.insert(0, os.path.join(ROOT_DIRECTORY, suite))
+    sys.path.insert(0, BENCHMARK_DIRECTORY)
+    return importlib.import_module(f"{suite}_cases").CASES
+
+
+def run_case(suite: str, case: str, num_points: int, seed: int, repeat: int) -> dict:
+    """ Set up and time one entry in this process. """
+    setup, max_points = load_cases(suite)[case]
+    run, counters = setup(num_points, seed)
+
+    times = list()
+    with open(os.devnull, "w") as devnull:
+        for i in range(repeat):
+            # Some of the old code prints while it works
+            stdout = sys.stdout
+            sys.stdout = devnull
+            try:
+                begin = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - begin)
+            finally:
+                sys.stdout = stdout
+    return {"times": times, "counters": counters}
+
+
+def run_case_in_subprocess(suite: str, case: str, num_points: int, seed: int,
+                           repeat: int, timeout: float) -> dict:
+    result = {"suite": suite, "case": case, "num_points": num_points}
+    command = [sys.executable, os.path.abspath(__file__), "--child",
+               suite, case, str(num_points), str(seed), str(repeat)]
+    try:
+        process = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        result["status"] = "timeout"
+        return result
+
+    lines = process.stdout.strip().splitlines()
+    if process.returncode != 0 or not lines:
+        result["status"] = "error"
+        result["error"] = (process.stderr.strip().splitlines() or [f"exit code {process.returncode}"])[-1]
+        return result
+
+    child_result = json.loads(lines[-1])
+    times = child_result["times"]
+    result["status"] = "ok"
+    result["times"] = times
+    result["median"] = statistics.median(times)
+    result["min"] = min(times)
+    result["counters"] = child_result["counters"]
+    return result
+
+
+def get_key(result: dict) -> tuple:
+    return result["suite"], result["case"], result["num_points"]
+
+
+def baseline_results_of(path: str) -> list:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+
+def merge_results(results: list, baseline_results: list) -> list:
+    """
+    The baseline entries with those of "results" in their place, and the new
+    entries of "results" after the others of their case, or at the end.
+    """
+    new_results = {get_key(result): result for result in results}
+    merged = [new_results.pop(get_key(result), result) for result in baseline_results]
+    for result in results:
+        if get_key(result) not in new_results:
+            continue
+        positions = [i for i, other in enumerate(merged)
+                     if (other["suite"], other["case"]) == (result["suite"], result["case"])]
+        merged.insert(positions[-1] + 1 if positions else len(merged), result)
+    return merged
+
+
+def compare_with_baseline(results: list, baseline_results: list, tolerance: float) -> list:
+    """
+    Returns the entries slower than the baseline by more than "tolerance",
+    and the entries that worked in the baseline but fail now.
+    """
+    baseline = {get_key(result): result for result in baseline_results}
+    regressions = list()
+    for result in results:
+        baseline_result = baseline.get(get_key(result))
+        if baseline_result is None or baseline_result["status"] != "ok":
+            continue
+        if result["status"] != "ok":
+            regressions.append({**result, "baseline": baseline_result["median"]})
+            continue
+        ratio = result["median"] / baseline_result["median"] if baseline_result["median"] > 0 else 1
+        result["baseline"] = baseline_result["median"]
+        result["ratio"] = ratio
+        if ratio > 1 + tolerance \
+                and result["median"] - baseline_result["median"] > MIN_REGRESSION_SECONDS:
+            regressions.append(result)
+    return regressions
+
+
+def format_result(result: dict) -> str:
+    line = f"{result['suite']:16} {result['case']:36} {result['num_points']:>8} "
+    if result["status"] != "ok":
+        return line + f"{result['status']:>12}  {result.get('error', '')}"
+    line += f"{result['median']:>11.4f}s"
+    if "ratio" in result:
+        line += f"  x{result['ratio']:.2f} of baseline"
+    return line
+
+
+def main(args):
+    if args.list:
+        cases = load_cases(args.list)
+        print(json.dumps({case: max_points for case, (setup, max_points) in cases.items()}))
+        return 0
+    if args.child:
+        suite, case, num_points, seed, repeat = args.child
+        result = run_case(suite, case, int(num_points), int(seed), int(repeat))
+        print(json.dumps(result))
+        return 0
+
+    results = list()
+    for suite in args.suite:
+        process = subprocess.run([sys.executable, os.path.abspath(__file__), "--list", suite],
+                                 capture_output=True, text=True, check=True)
+        cases = json.loads(process.stdout)
+        for case, max_points in cases.items():
+            if args.case and case not in args.case:
+                continue
+            for num_points in args.sizes:
+                if max_points is not None and num_points > max_points:
+                    result = {"suite": suite, "case": case, "num_points": num_points,
+                              "status": "skipped"}
+                else:
+                    result = run_case_in_subprocess(suite, case, num_points, args.seed,
+                                                    args.repeat, args.timeout)
+                results.append(result)
+                print(format_result(result), flush=True)
+
+    regressions = list()
+    baseline_path = args.baseline
+    if not args.save_baseline and os.path.exists(baseline_path):
+        baseline_results = baseline_results_of(baseline_path)
+        regressions = compare_with_baseline(results, baseline_results, args.tolerance)
+
+    output = {
+        "metadata": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    output_path = baseline_path if args.save_baseline else args.output
+    if args.save_baseline and os.path.exists(baseline_path):
+        output["results"] = merge_results(output["results"], baseline_results_of(baseline_path))
+    with open(output_path, "w") as file:
+        json.dump(output, file, indent=2)
+    print(f"Wrote {output_path}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {baseline_path}:")
+        for regression in regressions:
+            print("  " + format_result(regression))
+        return 1
+    return 0
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(description="Scaling benchmarks")
+    parser.add_argument("--suite", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--case", nargs="+", help="run only these cases")
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help="seconds allowed for one entry including its setup")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, 0.25 is 25%%")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results as the new baseline")
+    parser.add_argument("--list", choices=SUITES, help=argparse.SUPPRESS)
+    parser.add_argument("--child", nargs=5, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
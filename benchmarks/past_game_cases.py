@@ -0,0 +1,130 @@
+"""
+Benchmark cases for past_game.
+
+The triangulation is quadratic in the number of points, so its case stops
+at MAX_POINTS. "Mission" binds events on a Tk canvas, so the mission creation
+case times "DelaunayMissionCreator.create_delaunay_triangles", which is all
+the work of "DelaunayMissionCreator.create" apart from that.
+
+The reducer and mapper cases take the triangles of a jittered grid instead,
+which are built in linear time, and go up to MAX_POLYGON_POINTS. Beyond it
+the label image of "PolygonMapper" alone would not fit in memory (4 bytes
+a pixel, 2133 pixels a point).
+"""
+
+import math
+import random
+from libs import Point, Polygon, UndirectedLineSegment
+from mission_creator import DelaunayMissionCreator
+from polygon_mapper import PolygonMapper
+from side_reducer import SideReducer
+
+
+MAX_POINTS = 1000
+MAX_POLYGON_POINTS = 100000
+
+# Same density as the game: 600 points on a 1600x800 canvas
+PIXELS_PER_POINT = 1600 * 800 / 600
+
+
+def get_canvas_size(num_points: int) -> tuple:
+    width = int(math.sqrt(2 * num_points * PIXELS_PER_POINT))
+    return width, width // 2
+
+
+def create_polygons(num_points: int, seed: int) -> list:
+    random.seed(seed)
+    width, height = get_canvas_size(num_points)
+    return DelaunayMissionCreator().create_delaunay_triangles(width, height, num_points)
+
+
+def create_grid_polygons(num_points: int, seed: int) -> list:
+    """
+    Two triangles per cell of a grid of about "num_points" points on the
+    canvas of "get_canvas_size", the inner points moved at random by up to a
+    quarter of a cell, so that they look like the Delaunay triangles.
+    """
+    rng = random.Random(seed)
+    width, height = get_canvas_size(num_points)
+    num_columns = max(int(round(math.sqrt(2 * num_points))), 2)
+    num_rows = max(num_points // num_columns, 2)
+    cell_width = (width - 20) / (num_columns - 1)
+    cell_height = (height - 20) / (num_rows - 1)
+    jitter = min(cell_width, cell_height) / 4
+
+    grid = list()
+    for row in range(num_rows):
+        points = list()
+        for column in range(num_columns):
+            x = 10 + column * cell_width
+            y = 10 + row * cell_height
+            if 0 < row < num_rows - 1 and 0 < column < num_columns - 1:
+                x += rng.uniform(-jitter, jitter)
+                y += rng.uniform(-jitter, jitter)
+            points.append(Point(round(x), round(y)))
+        grid.append(points)
+
+    polygons = list()
+    for row in range(num_rows - 1):
+        for column in range(num_columns - 1):
+            p00 = grid[row][column]
+            p10 = grid[row][column + 1]
+            p01 = grid[row + 1][column]
+            p11 = grid[row + 1][column + 1]
+            for p1, p2, p3 in ((p00, p10, p11), (p00, p11, p01)):
+                polygons.append(Polygon((UndirectedLineSegment(p1, p2), UndirectedLineSegment(p2, p3),
+                                         UndirectedLineSegment(p3, p1))))
+    return polygons
+
+
+def setup_mission_creator(num_points: int, seed: int):
+    counters = dict()
+
+    def run():
+        counters["num_polygons"] = len(create_polygons(num_points, seed))
+    return run, counters
+
+
+def setup_side_reducer(num_points: int, seed: int):
+    polygons = create_grid_polygons(num_points, seed)
+    counters = {"num_polygons": len(polygons)}
+
+    def run():
+        random.seed(seed)
+        reduced_polygons = list(polygons)
+        SideReducer().reduce_randomly(reduced_polygons, DelaunayMissionCreator.NUM_OF_REDUCE)
+        counters["num_reduced_polygons"] = len(reduced_polygons)
+    return run, counters
+
+
+def setup_reduce_to(num_points: int, seed: int):
+    """ Combine the triangles down to a tenth of their number. """
+    polygons = create_grid_polygons(num_points, seed)
+    counters = {"num_polygons": len(polygons)}
+
+    def run():
+        reduced_polygons = list(polygons)
+        SideReducer().reduce_to(reduced_polygons, len(polygons) // 10)
+        counters["num_reduced_polygons"] = len(reduced_polygons)
+    return run, counters
+
+
+def setup_polygon_mapper(num_points: int, seed: int):
+    polygons = create_grid_polygons(num_points, seed)
+    width, height = get_canvas_size(num_points)
+    counters = {"num_polygons": len(polygons), "width": width, "height": height}
+
+    def run():
+        PolygonMapper(width, height).map(polygons)
+    return run, counters
+
+
+"""
+name -> (setup, maximum number of points)
+"""
+CASES = {
+    "DelaunayMissionCreator.create": (setup_mission_creator, MAX_POINTS),
+    "SideReducer.reduce_randomly": (setup_side_reducer, MAX_POLYGON_POINTS),
+    "SideReducer.reduce_to": (setup_reduce_to, MAX_POLYGON_POINTS),
+    "PolygonMapper.map": (setup_polygon_mapper, MAX_POLYGON_POINTS),
+}
@@ -0,0 +1,226 @@
+"""
+Benchmark cases for shape_and_color.
+
+Each case is set up from a number of points and a seed and returns a function
+doing the timed work once, and a dict of counters describing the input.
+The canvas grows with the number of points so that the density stays the
+one of the moderators, except for the rendering cases which use a fixed image.
+"""
+
+import math
+import random
+import numpy as np
+from delaunay_triangles import DelaunayTriangles
+from kinetic import KineticMesh
+from libs import Point
+from moderators import Moderator, DriftAnimationModerator
+from renderers import RasterRenderer
+from simulation import MeshSimulation, IncreaseRule, MoveRule
+from spatial_index import TriangleGrid
+from triangulation_engines import TiledEngine
+
+
+RENDER_WIDTH = 4096
+RENDER_HEIGHT = 2048
+# Given explicitly, so that the tiled case does not depend on the number of CPUs
+TILED_NUM_WORKERS = 2
+TILED_NUM_TILES = 6
+
+
+def get_canvas_size(num_points: int) -> tuple:
+    """ A 2:1 canvas holding "num_points" at the density of the moderators. """
+    width = int(math.sqrt(2 * num_points * Moderator.num_points_adjuster))
+    return width, width // 2
+
+
+def create_delaunay_triangles(num_points: int, seed: int, engine: str = "sweep_hull"):
+    width, height = get_canvas_size(num_points)
+    points = DelaunayTriangles.create_points_randomly(width, height, num_points, seed=seed)
+    delaunay_triangles = DelaunayTriangles(width, height, engine=engine)
+    delaunay_triangles.triangulation(points)
+    return delaunay_triangles
+
+
+def setup_points(num_points: int, seed: int):
+    width, height = get_canvas_size(num_points)
+    counters = {"width": width, "height": height}
+
+    def run():
+        points = DelaunayTriangles.create_points_randomly(width, height, num_points, seed=seed)
+        counters["num_points"] = len(points)
+    return run, counters
+
+
+def create_triangulation_setup(engine: str):
+    def setup_triangulation(num_points: int, seed: int):
+        width, height = get_canvas_size(num_points)
+        points = DelaunayTriangles.create_points_randomly(width, height, num_points, seed=seed)
+        counters = {"num_points": len(points)}
+
+        def run():
+            random.seed(seed)
+            delaunay_triangles = DelaunayTriangles(width, height, engine=engine)
+            delaunay_triangles.triangulation(points)
+            counters["num_triangles"] = delaunay_triangles.mesh.num_triangles
+        return run, counters
+    return setup_triangulation
+
+
+def setup_tiled_triangulation(num_points: int, seed: int):
+    width, height = get_canvas_size(num_points)
+    points = DelaunayTriangles.create_points_randomly(width, height, num_points, seed=seed)
+    engine = TiledEngine(num_workers=TILED_NUM_WORKERS, num_tiles=TILED_NUM_TILES)
+    # The vertices of the huge triangle are triangulated too
+    counters = {"num_points": len(points), "num_workers": engine.num_workers,
+                "num_tiles": engine.get_num_tiles(len(points) + 3)}
+
+    def run():
+        random.seed(seed)
+        delaunay_triangles = DelaunayTriangles(width, height)
+        delaunay_triangles.triangulation(points, engine=engine)
+        counters["num_triangles"] = delaunay_triangles.mesh.num_triangles
+    return run, counters
+
+
+def setup_adjacency(num_points: int, seed: int):
+    delaunay_triangles = create_delaunay_triangles(num_points, seed)
+    mesh = delaunay_triangles.mesh
+    counters = {"num_triangles": mesh.num_triangles}
+
+    def run():
+        mesh.compute_adjacency(mesh.compute_neighbors(mesh.triangles))
+    return run, counters
+
+
+def setup_spatial_index(num_points: int, seed: int):
+    delaunay_triangles = create_delaunay_triangles(num_points, seed)
+    mesh = delaunay_triangles.mesh
+    counters = {"num_triangles": mesh.num_triangles}
+
+    def run():
+        TriangleGrid(mesh.vertices, mesh.triangles)
+    return run, counters
+
+
+def setup_locate_many(num_points: int, seed: int):
+    """ Locate as many random points as there are points in the mesh. """
+    delaunay_triangles = create_delaunay_triangles(num_points, seed)
+    mesh = delaunay_triangles.mesh
+    width, height = get_canvas_size(num_points)
+    queries = np.random.default_rng(seed).uniform((0, 0), (width, height), size=(num_points, 2))
+    mesh.spatial_index
+    counters = {"num_triangles": mesh.num_triangles, "num_queries": num_points}
+
+    def run():
+        counters["found"] = int(np.count_nonzero(mesh.locate_many(queries) >= 0))
+    return run, counters
+
+
+def setup_find_triangle(num_points: int, seed: int):
+    delaunay_triangles = create_delaunay_triangles(num_points, seed)
+    counters = {"num_triangles": delaunay_triangles.mesh.num_triangles}
+
+    def run():
+        delaunay_triangles.find_triangle_has_in_edge(Point(1, 1))
+    return run, counters
+
+
+def create_tick_setup(rule_name: str):
+    def setup_tick(num_points: int, seed: int):
+        """
+        Warm the simulation up so that the frontier is a wave across the mesh,
+        then time one tick per run.
+        """
+        random.seed(seed)
+        delaunay_triangles = create_delaunay_triangles(num_points, seed)
+        mesh = delaunay_triangles.mesh
+        if rule_name == "increase":
+            start_triangles = [delaunay_triangles.find_triangle_has_in_edge(Point(1, 1))]
+            rule = IncreaseRule(start_triangles)
+        else:
+            start_triangles = random.sample(range(mesh.num_triangles),
+                                            max(mesh.num_triangles // 100, 1))
+            rule = MoveRule(start_triangles)
+        simulation = MeshSimulation(mesh, rule, seed=seed)
+        for triangle in start_triangles:
+            simulation.set_color_index(triangle, random.randrange(1, len(simulation.palette)))
+        for i in range(int(math.sqrt(num_points)) // 2):
+            simulation.step()
+        counters = {"num_triangles": mesh.num_triangles, "frontier": len(simulation.rule.frontier)}
+
+        def run():
+            counters["changed"] = len(simulation.step())
+        return run, counters
+    return setup_tick
+
+
+def setup_kinetic_step(num_points: int, seed: int):
+    """ Time one frame of the drift animation after a few frames of warm-up. """
+    delaunay_triangles = create_delaunay_triangles(num_points, seed)
+    mesh = delaunay_triangles.mesh
+    kinetic_mesh = KineticMesh(mesh, DriftAnimationModerator.speed,
+                               1 / DriftAnimationModerator.target_fps, seed=seed)
+    for i in range(10):
+        kinetic_mesh.step()
+    counters = {"num_triangles": mesh.num_triangles}
+
+    def run():
+        num_flips = kinetic_mesh.num_flips
+        counters["moved"] = len(kinetic_mesh.step())
+        counters["flips"] = kinetic_mesh.num_flips - num_flips
+    return run, counters
+
+
+def setup_insert_remove_point(num_points: int, seed: int):
+    """ Insert a random point into the mesh and remove it again. """
+    delaunay_triangles = create_delaunay_triangles(num_points, seed)
+    width, height = delaunay_triangles.width, delaunay_triangles.height
+    rng = np.random.default_rng(seed)
+    counters = {"num_triangles": delaunay_triangles.mesh.num_triangles}
+
+    def run():
+        x, y = rng.uniform((0, 0), (width, height)).tolist()
+        vertex = delaunay_triangles.insert_point(Point(x, y))
+        counters["changed"] = len(delaunay_triangles.changed_triangles)
+        if vertex >= 0:
+            delaunay_triangles.remove_vertex(vertex)
+    return run, counters
+
+
+def setup_raster_draw(num_points: int, seed: int):
+    density = num_points / ((RENDER_WIDTH - 2 * DelaunayTriangles.MARGIN)
+                            * (RENDER_HEIGHT - 2 * DelaunayTriangles.MARGIN))
+    points = DelaunayTriangles.create_points_poisson_disk(RENDER_WIDTH, RENDER_HEIGHT, density,
+                                                          seed=seed, min_distance=0)
+    delaunay_triangles = DelaunayTriangles(RENDER_WIDTH, RENDER_HEIGHT, engine="sweep_hull")
+    delaunay_triangles.triangulation(points)
+    mesh = delaunay_triangles.mesh
+    mesh.assign_random_colors(seed=seed)
+    renderer = RasterRenderer(RENDER_WIDTH, RENDER_HEIGHT)
+    counters = {"num_triangles": mesh.num_triangles,
+                "width": RENDER_WIDTH, "height": RENDER_HEIGHT}
+
+    def run():
+        renderer.draw(mesh)
+    return run, counters
+
+
+"""
+name -> (setup, maximum number of points)
+"""
+CASES = {
+    "create_points_randomly": (setup_points, None),
+    "triangulation[incremental]": (create_triangulation_setup("incremental"), None),
+    "triangulation[divide_and_conquer]": (create_triangulation_setup("divide_and_conquer"), None),
+    "triangulation[sweep_hull]": (create_triangulation_setup("sweep_hull"), None),
+    "triangulation[tiled]": (setup_tiled_triangulation, None),
+    "create_triangle_adjacency_map": (setup_adjacency, None),
+    "find_triangle_has_in_edge": (setup_find_triangle, None),
+    "spatial_index": (setup_spatial_index, None),
+    "locate_many": (setup_locate_many, None),
+    "increase_tick": (create_tick_setup("increase"), None),
+    "move_tick": (create_tick_setup("move"), None),
+    "kinetic_step": (setup_kinetic_step, None),
+    "insert_remove_point": (setup_insert_remove_point, None),
+    "raster_draw": (setup_raster_draw, None),
+}
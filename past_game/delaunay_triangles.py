@@ -9,20 +9,33 @@ from libs import *
 class DelaunayTriangles:
     """
     From http://tercel-sakuragaoka.blogspot.com/2011/06/processingdelaunay.html
+
+    Each instance has its own triangle set, so several instances can be
+    used at once, also from separate threads.
     """
 
-    triangle_set: set = set()
+    triangle_set: set
     width: int
     height: int
 
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
+        self.triangle_set = set()
+
+    def reset(self):
+        """
+        Remove the triangles, keeping the set for the next triangulation.
+        """
+        self.triangle_set.clear()
 
     def triangulation(self, point_list: list) -> list:
         """
         Perform a Delaunay split based on "point_list".
+        The triangles of the previous triangulation are removed first.
         """
+        self.reset()
+
         # Add huge triangle to set
         huge_triangle = self.get_huge_triangle()
         self.triangle_set.add(huge_triangle)
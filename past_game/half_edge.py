@@ -0,0 +1,243 @@
+"""
+Half-edge representation of a partition of the canvas into polygons.
+"""
+
+from tkinter import Canvas
+from libs import *
+
+
+class HalfEdge:
+    """
+    One side of a face, directed so that the face is on its left.
+    "twin" is the same side seen from the neighboring face, or None on the
+    border of the mesh.
+    """
+    __origin: Point
+    twin = None
+    next = None
+    prev = None
+    face = None
+
+    @property
+    def origin(self):
+        return self.__origin
+
+    @property
+    def destination(self):
+        return self.next.origin
+
+    @property
+    def side(self):
+        return UndirectedLineSegment(self.origin, self.destination)
+
+    @property
+    def length(self):
+        return self.origin.distance(self.destination)
+
+    def __init__(self, origin: Point):
+        self.__origin = origin
+
+
+class Face:
+    """
+    A polygon of "HalfEdgeMesh". Its half-edges form a ring in which the
+    face has a positive signed area (x to the right, y downwards).
+    It has the same properties as "Polygon", and can be used in its place.
+    Faces are compared by identity, since they change when merged.
+    """
+    edge: HalfEdge = None
+    __vertex_quantity: int
+    __area: float
+    __contains_point: Point
+
+    @property
+    def half_edges(self) -> list:
+        """ The ring starting at "edge". """
+        half_edges = [self.edge]
+        edge = self.edge.next
+        while edge is not self.edge:
+            half_edges.append(edge)
+            edge = edge.next
+        return half_edges
+
+    @property
+    def vertices(self):
+        return tuple(edge.origin for edge in self.half_edges)
+
+    @property
+    def sides(self):
+        return tuple(edge.side for edge in self.half_edges)
+
+    @property
+    def neighbors(self) -> list:
+        """ The faces sharing a side with this one, once each. """
+        neighbors = dict()
+        for edge in self.half_edges:
+            if edge.twin is not None:
+                neighbors[edge.twin.face] = None
+        return list(neighbors)
+
+    @property
+    def vertex_quantity(self):
+        return self.__vertex_quantity
+
+    @property
+    def area(self):
+        return self.__area
+
+    @property
+    def contains_point(self):
+        return self.__contains_point
+
+    def __init__(self, vertex_quantity: int, area: float, contains_point: Point):
+        self.__vertex_quantity = vertex_quantity
+        self.__area = area
+        self.__contains_point = contains_point
+
+    def get_sorted_vertices(self) -> list:
+        """ Flat [x1, y1, x2, y2, ...] of the vertices in the order of the ring. """
+        vertices = list()
+        for edge in self.half_edges:
+            vertices.append(edge.origin.x)
+            vertices.append(edge.origin.y)
+        return vertices
+
+    def absorb(self, other, num_removed_edges: int, contains_point: Point):
+        """ Take over the area of a face merged into this one. Called by "HalfEdgeMesh.merge". """
+        self.__vertex_quantity += other.vertex_quantity - num_removed_edges
+        self.__area += other.area
+        self.__contains_point = contains_point
+
+    def draw(self, canvas: Canvas):
+        for edge in self.half_edges:
+            begin = edge.origin
+            end = edge.destination
+            canvas.create_line(begin.x, begin.y, end.x, end.y)
+
+
+class HalfEdgeMesh:
+    """
+    Half-edge structure (doubly connected edge list) over polygons sharing
+    sides, such as the triangles of "DelaunayTriangles".
+
+    The half-edge from point1 to point2 and the face sharing a side are
+    found in constant time, the vertices of a face are read off its ring in
+    order, and merging two faces splices their rings in time proportional
+    to the smaller one.
+    The outer face is not represented: half-edges on the border have no twin.
+    """
+    # (origin, destination) -> half-edge
+    __half_edges: dict
+    # face -> None, in order of creation
+    __faces: dict
+
+    @property
+    def faces(self) -> list:
+        return list(self.__faces)
+
+    @property
+    def num_faces(self):
+        return len(self.__faces)
+
+    def __init__(self, polygons: list):
+        """ "polygons" are "Polygon"s or "Face"s, which must not overlap. """
+        self.__half_edges = dict()
+        self.__faces = dict()
+        for polygon in polygons:
+            self.add_face(polygon)
+
+    def add_face(self, polygon) -> Face:
+        sorted_vertices = polygon.get_sorted_vertices()
+        points = [Point(sorted_vertices[i], sorted_vertices[i + 1]) for i in range(0, len(sorted_vertices), 2)]
+        if self.compute_signed_area(points) < 0:
+            points.reverse()
+
+        face = Face(len(points), polygon.area, polygon.contains_point)
+        half_edges = [HalfEdge(point) for point in points]
+        for i, edge in enumerate(half_edges):
+            edge.face = face
+            edge.next = half_edges[(i + 1) % len(half_edges)]
+            edge.prev = half_edges[i - 1]
+        for edge in half_edges:
+            twin = self.__half_edges.get((edge.destination, edge.origin))
+            if twin is not None:
+                edge.twin = twin
+                twin.twin = edge
+            self.__half_edges[(edge.origin, edge.destination)] = edge
+        face.edge = half_edges[0]
+        self.__faces[face] = None
+        return face
+
+    def get_half_edge(self, origin: Point, destination: Point):
+        """ The half-edge from "origin" to "destination", or None. """
+        return self.__half_edges.get((origin, destination))
+
+    def get_shared_half_edges(self, face: Face, other: Face) -> list:
+        """ The half-edges of "face" whose twins belong to "other". """
+        return [edge for edge in face.half_edges if edge.twin is not None and edge.twin.face is other]
+
+    def can_merge(self, face: Face, other: Face) -> bool:
+        """
+        Whether the sides shared by two faces form one chain, so that the
+        merged face is still a simple polygon without a hole or a vertex
+        touching itself.
+        """
+        shared_half_edges = self.get_shared_half_edges(face, other)
+        if len(shared_half_edges) == 0:
+            return False
+        common_vertices = set(face.vertices) & set(other.vertices)
+        return len(common_vertices) == len(shared_half_edges) + 1
+
+    def merge(self, face: Face, other: Face) -> Face:
+        """
+        Merge "other" into "face", which must satisfy "can_merge".
+        The larger of the two faces is kept and the smaller one removed;
+        the kept face has the "contains_point" of "face".
+        Returns the kept face.
+        """
+        contains_point = face.contains_point
+        if face.vertex_quantity < other.vertex_quantity:
+            face, other = other, face
+
+        # The chain of half-edges of "other" shared with "face"
+        first = next(edge for edge in other.half_edges
+                     if edge.twin is not None and edge.twin.face is face
+                     and (edge.prev.twin is None or edge.prev.twin.face is not face))
+        shared_half_edges = [first]
+        while shared_half_edges[-1].next.twin is not None and shared_half_edges[-1].next.twin.face is face:
+            shared_half_edges.append(shared_half_edges[-1].next)
+        last = shared_half_edges[-1]
+
+        # Splice the rest of the ring of "other" into the ring of "face"
+        other_prev = first.prev
+        other_next = last.next
+        face_prev = last.twin.prev
+        face_next = first.twin.next
+        face_prev.next = other_next
+        other_next.prev = face_prev
+        other_prev.next = face_next
+        face_next.prev = other_prev
+
+        edge = other_next
+        while edge is not face_next:
+            edge.face = face
+            edge = edge.next
+
+        for edge in shared_half_edges:
+            del self.__half_edges[(edge.origin, edge.twin.origin)]
+            del self.__half_edges[(edge.twin.origin, edge.origin)]
+
+        face.edge = face_next
+        face.absorb(other, 2 * len(shared_half_edges), contains_point)
+        del self.__faces[other]
+        return face
+
+    @staticmethod
+    def compute_signed_area(points: list) -> float:
+        """ Shoelace formula. """
+        area = 0.0
+        for i in range(len(points)):
+            p1 = points[i - 1]
+            p2 = points[i]
+            area += p1.x * p2.y - p2.x * p1.y
+        return area / 2
@@ -198,6 +198,28 @@ class Polygon:
 
         return new_polygon
 
+    def get_sorted_vertices(self) -> list:
+        """ Flat [x1, y1, x2, y2, ...] of the vertices in the order of the outline. """
+        outline = dict()
+        for side in self.sides:
+            outline.setdefault(side.point1, []).append(side)
+            outline.setdefault(side.point2, []).append(side)
+
+        # Walk along the sides, leaving each vertex by a side not walked yet
+        vertices = list()
+        walked = set()
+        side = self.sides[0]
+        point = side.point1
+        for i in range(len(self.sides)):
+            vertices.append(point.x)
+            vertices.append(point.y)
+            walked.add(side)
+            point = side.point2 if side.point1 == point else side.point1
+            side = next((other for other in outline[point] if other not in walked), None)
+            if side is None:
+                break
+        return vertices
+
     def draw(self, canvas: Canvas):
         for side in self.sides:
             begin = side.point1
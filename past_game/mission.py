@@ -12,10 +12,13 @@ class Mission:
     width: int
     height: int
 
-    polygon_map: list
+    polygon_map: np.ndarray
     polygons: list
+    polygon_mapper: PolygonMapper
+    selected_polygon: Polygon = None
 
     polygon_color_table: dict
+    hex_table: dict
 
     time: int = 0
 
@@ -30,85 +33,54 @@ class Mission:
         self.width = width
         self.height = height
 
-        # self.polygon_map = self.create_polygon_map(polygons, width, height)
+        self.polygon_mapper = PolygonMapper(width, height)
+        self.polygon_map = self.polygon_mapper.map(polygons)
 
         colors = self.create_color_list(self.COLOR_BEGIN, self.COLOR_DELTA)
         self.polygon_color_table = self.create_polygon_color_table(self.polygons, colors)
+        self.hex_table = self.create_hex_table(colors)
 
     def initialize_canvas(self):
         self.canvas.bind("<ButtonRelease-1>", self.on_left_button_click)
 
     def on_left_button_click(self, event):
-        # debug
-        print(event.x, event.y)
+        self.selected_polygon = self.get_polygon_at(event.x, event.y)
         # TODO: Implement
 
-    def create_polygon_map(self, polygons: list, width: int, height: int) -> list:
+    def get_polygon_at(self, x: int, y: int):
+        """ The polygon under (x, y) or None, in constant time. """
+        return self.polygon_mapper.get_polygon(x, y)
+
+    def create_polygon_map(self, polygons: list, width: int, height: int) -> np.ndarray:
         mapper = PolygonMapper(width, height)
         polygon_map = mapper.map(polygons)
         return polygon_map
 
-    def create_polygon_color_table(self, polygons: list, colors: set) -> dict:
-        table = dict()
-        for polygon in polygons:
-            color = random.choice(list(colors))
-            # colors.remove(color)
-            table[polygon] = color
-        return table
+    def create_polygon_color_table(self, polygons: list, colors: list) -> dict:
+        # Draw the colors of all polygons at once
+        return dict(zip(polygons, random.choices(colors, k=len(polygons))))
 
-    def create_color_list(self, begin: tuple, delta: int) -> set:
-        colors = set()
+    def create_color_list(self, begin: tuple, delta: int) -> list:
+        colors = list()
         for r in range(begin[0], 256, delta):
             for g in range(begin[1], 256, delta):
                 for b in range(begin[2], 256, delta):
                     color = (r, g, b)
-                    colors.add(color)
+                    colors.append(color)
         return colors
 
+    def create_hex_table(self, colors: list) -> dict:
+        return {color: f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}" for color in colors}
+
     def start(self):
         self.draw()
         # TODO: Implement
 
     def draw(self):
         for polygon in self.polygons:
-            color = self.polygon_color_table[polygon]
-            hex_color = f"#{format(color[0], 'x')}{format(color[1], 'x')}{format(color[2], 'x')}"
+            hex_color = self.hex_table[self.polygon_color_table[polygon]]
             vertices = self.get_sorted_vertices(polygon)
             self.canvas.create_polygon(*vertices, fill=hex_color)
 
     def get_sorted_vertices(self, polygon: Polygon) -> list:
-        sides = polygon.sides
-        point_map = dict()
-        for side in sides:
-            if side.point1 in point_map:
-                point_map[side.point1].append(side)
-            else:
-                point_map[side.point1] = [side]
-            if side.point2 in point_map:
-                point_map[side.point2].append(side)
-            else:
-                point_map[side.point2] = [side]
-
-        vertices = list()
-        vertices_set = set(polygon.vertices)
-        side = sides[0]
-        while True:
-            if side.point1 in vertices_set:
-                vertices.append(side.point1.x)
-                vertices.append(side.point1.y)
-                vertices_set.remove(side.point1)
-            if side.point2 in vertices_set:
-                vertices.append(side.point2.x)
-                vertices.append(side.point2.y)
-                vertices_set.remove(side.point2)
-
-            point_map[side.point1].remove(side)
-            point_map[side.point2].remove(side)
-
-            if len(point_map[side.point2]) > 0:
-                side = point_map[side.point2][0]
-            else:
-                break
-
-        return vertices
-
+        return polygon.get_sorted_vertices()
@@ -27,9 +27,13 @@ class DelaunayMissionCreator(MissionCreator):
     # For the time being ...
     NUM_OF_REDUCE: int = 2
 
-    def create(self, canvas: Canvas, width: int, height: int, num_points) -> Mission:
+    def create(self, canvas: Canvas, width: int, height: int, num_points, num_polygons: int = None) -> Mission:
+        """ With "num_polygons", the triangles are combined until exactly that many polygons remain. """
         polygons = self.create_delaunay_triangles(width, height, num_points)
-        # self.reduce_sides_randomly(polygons, self.NUM_OF_REDUCE)
+        if num_polygons is None:
+            self.reduce_sides_randomly(polygons, self.NUM_OF_REDUCE)
+        else:
+            self.reduce_to_polygons(polygons, num_polygons)
         mission = Mission(canvas, polygons, width, height)
         return mission
 
@@ -43,4 +47,8 @@ class DelaunayMissionCreator(MissionCreator):
         side_reducer = SideReducer()
         side_reducer.reduce_randomly(polygons, times)
 
+    def reduce_to_polygons(self, polygons: list, num_polygons: int):
+        side_reducer = SideReducer()
+        side_reducer.reduce_to(polygons, num_polygons)
+
 
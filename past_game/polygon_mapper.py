@@ -1,91 +1,45 @@
+import cv2
 import numpy as np
 from libs import *
-import sys
 
-sys.setrecursionlimit(10 ** 9)
 
 class PolygonMapper:
-    polygon_map: list
+    """
+    Maps every pixel of the canvas to the polygon covering it.
+
+    "map" fills a (height, width) int32 label image in which a pixel holds
+    the index of its polygon in "polygons", or NO_POLYGON. Each polygon is
+    filled by OpenCV's scanline polygon fill, so a click is resolved by
+    reading one pixel.
+    """
+    polygon_map: np.ndarray
     polygons: list
-    SEPARATE_IDENTIFIER = 1
+    NO_POLYGON = -1
+    # Fractional bits of the vertex coordinates given to OpenCV
+    SHIFT = 4
     width: int
     height: int
 
     def __init__(self, width: int, height: int):
         self.width = width
         self.height = height
-
-    def map(self, polygons: list) -> list:
-        self.polygons = polygons
-        self.polygon_map = [[None] * self.width for i in range(self.height)]
-
-        self.create_separator()
-        # TODO: I can't understand why it doesn't work.
-        self.fill_polygons()
-
+        self.polygons = list()
+        self.polygon_map = np.full((height, width), self.NO_POLYGON, dtype=np.int32)
+
+    def map(self, polygons: list) -> np.ndarray:
+        self.polygons = list(polygons)
+        self.polygon_map = np.full((self.height, self.width), self.NO_POLYGON, dtype=np.int32)
+        for label, polygon in enumerate(self.polygons):
+            vertices = np.array(polygon.get_sorted_vertices(), dtype=np.float64).reshape(1, -1, 2)
+            vertices = np.rint(vertices * (1 << self.SHIFT)).astype(np.int32)
+            cv2.fillPoly(self.polygon_map, vertices, label, cv2.LINE_8, self.SHIFT)
         return self.polygon_map
 
-    def fill_polygons(self):
-        for polygon in self.polygons:
-            point = polygon.contains_point
-            self.fill_polygons_helper(int(point.y), int(point.x), polygon)
-
-    counter = 0
-
-    def fill_polygons_helper(self, row: int, column: int, polygon: Polygon):
-        self.counter += 1
-        print(self.counter)
-        self.polygon_map[row][column] = polygon
-        next_rows = [1, 0, -1, 0]
-        next_columns = [0, 1, 0, -1]
-        for i in range(4):
-            next_row = row + next_rows[i]
-            next_column = column + next_columns[i]
-
-            is_range_out = next_row < 0 or next_row >= self.height or next_column < 0 or next_column >= self.width
-            if is_range_out or isinstance(self.polygon_map[next_row][next_column], int) or isinstance(self.polygon_map[next_row][next_column], Polygon):
-                continue
-
-            self.fill_polygons_helper(next_row, next_column, polygon)
-
-    def create_separator(self):
-        for polygon in self.polygons:
-            sides = polygon.sides
-            for side in sides:
-                v1 = side.point1
-                v2 = side.point2
-
-                dx = abs(v1.x - v2.x)
-                dy = abs(v1.y - v2.y)
-
-                f = self.function_creator(dx, dy, v1.x, v1.y)
-
-                sx = min(v1.x, v2.x)
-                gx = min(v1.x, v2.x)
-
-                for x in range(sx, gx + 1):
-                    y = f(x)
-                    if y < 0 or y >= self.height:
-                        continue
-                    self.polygon_map[int(y)][int(x)] = self.SEPARATE_IDENTIFIER
-
-                f = self.function_creator(dx, dy, v1.x, v1.y, inverse=True)
-
-                sy = min(v1.y, v2.y)
-                gy = max(v1.y, v2.y)
-
-                for y in range(sy, gy + 1):
-                    x = f(y)
-                    if x < 0 or x >= self.width:
-                        continue
-                    self.polygon_map[int(y)][int(x)] = self.SEPARATE_IDENTIFIER
-
-    def function_creator(self, dx: int, dy: int, x1: int, y1: int, inverse=False):
-        if inverse:
-            if dy == 0:
-                return lambda y: -1
-            return lambda y: (dx / dy) * (y - y1) + x1
-        if dx == 0:
-            return lambda x: -1
-        return lambda x: (dy / dx) * (x - x1) + y1
-
+    def get_polygon(self, x: int, y: int):
+        """ The polygon covering pixel (x, y), or None. """
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return None
+        label = self.polygon_map[int(y), int(x)]
+        if label == self.NO_POLYGON:
+            return None
+        return self.polygons[label]
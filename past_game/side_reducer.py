@@ -1,70 +1,177 @@
+import heapq
 import random
-from libs import *
+from half_edge import *
 
 
 class SideReducer:
+    """
+    Reduces the number of polygons by combining neighbors sharing sides.
+
+    The polygons are put in a "HalfEdgeMesh", which gives the neighbor
+    across a side and combines two polygons by splicing their rings, and
+    the list is replaced by its faces.
+    Each face gets a serial number, and a new one when it is combined.
+    The reducer keeps a min-heap of (area, serial) over all faces and one
+    per vertex quantity, and buckets of the serials by vertex quantity,
+    all updated on every combination, so no step scans all polygons.
+    Entries of combined faces are left in the heaps and skipped when
+    they come to the top.
+    The sides of each face are tried in the order "Polygon.sides" and
+    "Polygon.combine" would give them, so the results do not depend on
+    where the ring of a merged face starts.
+    """
+    __mesh: HalfEdgeMesh
+    # serial -> face, in the order of the polygon list
+    __polygons: dict
+    # face -> serial
+    __serials: dict
+    # face -> its sides, in the order of "Polygon.sides"
+    __side_orders: dict
+    __heap: list
+    # vertex quantity -> heap
+    __heaps: dict
+    # vertex quantity -> {serial: None}
+    __buckets: dict
+    __next_serial: int
+
+    def __init__(self):
+        self.build_index(list())
+
     def reduce_randomly(self, polygons: list, reduce_times: int):
-        #self.reduce_randomly_helper2(polygons)
+        self.build_index(polygons)
+        #self.reduce_randomly_helper2()
         for i in range(reduce_times):
-            self.reduce_randomly_helper(polygons, 3 + i, )
-
-    def reduce_randomly_helper2(self, polygons: list):
-        num_reduce = random.randint(len(polygons) // 2, len(polygons) + 1)
-        counter = 0
-        while num_reduce > counter and len(polygons) > 0:
-            polygons.sort(key=lambda polygon: polygon.area)
-            target = polygons[0]
+            self.reduce_randomly_helper(3 + i, )
+        polygons[:] = self.__polygons.values()
 
-            flag = False
-            reduce_side_num = 0
-            while not flag and reduce_side_num < len(target.sides):
-                reduce_side = target.sides[reduce_side_num]
-                flag = self.try_reduce_side(polygons, reduce_side)
-                reduce_side_num += 1
+    def reduce_to(self, polygons: list, num_polygons: int):
+        """
+        Combine polygons until "num_polygons" remain, or no more can be combined.
+        The smallest polygon is combined with the neighbor it shares the
+        longest boundary with.
+        """
+        self.build_index(polygons)
+        while len(self.__polygons) > num_polygons and len(self.__heap) > 0:
+            area, serial = heapq.heappop(self.__heap)
+            if serial not in self.__polygons:
+                continue
+            neighbor = self.select_neighbor(serial)
+            # Without a neighbor it stays, but can still be combined into another polygon
+            if neighbor is not None:
+                self.combine(serial, neighbor)
+        polygons[:] = self.__polygons.values()
 
+    def reduce_randomly_helper2(self):
+        num_reduce = random.randint(len(self.__polygons) // 2, len(self.__polygons) + 1)
+        counter = 0
+        while num_reduce > counter and len(self.__polygons) > 0:
+            # Nothing changes when the smallest one cannot be reduced, so stop there
+            if not self.try_reduce_polygon(self.get_smallest(self.__heap)):
+                break
             counter += 1
 
-
-    def reduce_randomly_helper(self, polygons: list, target: int):
-        """ Brute force reduction is computationally expensive. """
-        # TODO: Reduce computational effort
-        target_polygons = self.select_target_polygons(polygons, target)
-        num_reduce = random.randint(len(target_polygons) // 3, len(target_polygons) + 1)
+    def reduce_randomly_helper(self, target: int):
+        num_target_polygons = self.count_target_polygons(target)
+        num_reduce = random.randint(num_target_polygons // 3, num_target_polygons + 1)
         counter = 0
-        while num_reduce > counter and len(target_polygons) > 0:
-            target_polygons.sort(key=lambda polygon: polygon.area)
-            target_polygon = target_polygons[0]
-
-            flag = False
-            reduce_side_num = 0
-            while not flag and reduce_side_num < target:
-                reduce_side = target_polygon.sides[reduce_side_num]
-                flag = self.try_reduce_side(polygons, reduce_side)
-                reduce_side_num += 1
-
-            target_polygons = self.select_target_polygons(polygons, target)
+        while num_reduce > counter and self.count_target_polygons(target) > 0:
+            # Nothing changes when the smallest one cannot be reduced, so stop there
+            if not self.try_reduce_polygon(self.get_smallest(self.__heaps[target])):
+                break
             counter += 1
 
-    def try_reduce_side(self, polygons: list, reduce_side: UndirectedLineSegment) -> bool:
-        reduce_polygons = list()
-        for polygon in polygons:
-            if reduce_side in polygon.sides:
-                reduce_polygons.append(polygon)
+    def try_reduce_polygon(self, serial: int) -> bool:
+        """ Combine the polygon with the neighbor across the first of its sides that can be reduced. """
+        polygon = self.__polygons[serial]
+        for side in self.__side_orders[polygon]:
+            if self.try_reduce_side(self.get_half_edge(polygon, side)):
+                return True
+        return False
 
-        if len(reduce_polygons) <= 1:
+    def try_reduce_side(self, reduce_side: HalfEdge) -> bool:
+        if reduce_side.twin is None:
+            return False
+        if not self.__mesh.can_merge(reduce_side.face, reduce_side.twin.face):
             return False
 
-        new_polygon = reduce_polygons[0].combine(reduce_polygons[1])
-        polygons.remove(reduce_polygons[0])
-        polygons.remove(reduce_polygons[1])
-        polygons.append(new_polygon)
-
+        self.combine(self.__serials[reduce_side.face], self.__serials[reduce_side.twin.face])
         return True
 
-    def select_target_polygons(self, polygons: list, target: int) -> list:
-        target_polygons = list()
-        for polygon in polygons:
-            if polygon.vertex_quantity == target:
-                target_polygons.append(polygon)
-        return target_polygons
+    def count_target_polygons(self, target: int) -> int:
+        return len(self.__buckets.get(target, ()))
+
+    def select_target_polygons(self, target: int) -> list:
+        return [self.__polygons[serial] for serial in self.__buckets.get(target, ())]
+
+    def select_neighbor(self, serial: int):
+        """ Serial of the neighbor sharing the longest boundary that can be combined, or None. """
+        polygon = self.__polygons[serial]
+        shared_lengths = dict()
+        for side in self.__side_orders[polygon]:
+            side = self.get_half_edge(polygon, side)
+            if side.twin is not None:
+                shared_lengths[side.twin.face] = shared_lengths.get(side.twin.face, 0) + side.length
+
+        for neighbor in sorted(shared_lengths, key=lambda neighbor: -shared_lengths[neighbor]):
+            if self.__mesh.can_merge(polygon, neighbor):
+                return self.__serials[neighbor]
+        return None
+
+    def get_half_edge(self, polygon: Face, side: UndirectedLineSegment) -> HalfEdge:
+        """ The half-edge of "side" belonging to "polygon". """
+        half_edge = self.__mesh.get_half_edge(side.point1, side.point2)
+        if half_edge is None or half_edge.face is not polygon:
+            half_edge = self.__mesh.get_half_edge(side.point2, side.point1)
+        return half_edge
+
+    def get_smallest(self, heap: list) -> int:
+        """ Serial of the smallest polygon in "heap", dropping the entries of combined polygons. """
+        while heap[0][1] not in self.__polygons:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+    def build_index(self, polygons: list):
+        self.__mesh = HalfEdgeMesh(polygons)
+        self.__polygons = dict()
+        self.__serials = dict()
+        self.__side_orders = dict()
+        self.__heap = list()
+        self.__heaps = dict()
+        self.__buckets = dict()
+        self.__next_serial = 0
+        for polygon, face in zip(polygons, self.__mesh.faces):
+            self.add(face, tuple(polygon.sides))
+
+    def combine(self, serial: int, other: int) -> int:
+        """ Replace two polygons by their combination, which is put last. Returns its serial. """
+        polygon = self.__polygons[serial]
+        other_polygon = self.__polygons[other]
+        # The polygon coming first in the list is combined with the other, as before
+        if other < serial:
+            polygon, other_polygon = other_polygon, polygon
+        # The sides in the order "Polygon.combine" gives them
+        sides = self.__side_orders[polygon]
+        other_sides = self.__side_orders[other_polygon]
+        combined_sides = set(sides + other_sides)
+        for common_side in set(sides) & set(other_sides):
+            combined_sides.remove(common_side)
+        self.remove(serial)
+        self.remove(other)
+        return self.add(self.__mesh.merge(polygon, other_polygon), tuple(combined_sides))
+
+    def add(self, polygon: Face, sides: tuple) -> int:
+        serial = self.__next_serial
+        self.__next_serial += 1
+        self.__polygons[serial] = polygon
+        self.__serials[polygon] = serial
+        self.__side_orders[polygon] = sides
+        self.__buckets.setdefault(polygon.vertex_quantity, dict())[serial] = None
+        heapq.heappush(self.__heap, (polygon.area, serial))
+        heapq.heappush(self.__heaps.setdefault(polygon.vertex_quantity, list()), (polygon.area, serial))
+        return serial
 
+    def remove(self, serial: int):
+        polygon = self.__polygons.pop(serial)
+        del self.__serials[polygon]
+        del self.__side_orders[polygon]
+        del self.__buckets[polygon.vertex_quantity][serial]
@@ -0,0 +1,132 @@
+"""
+Module for generating meshes in batches without a window.
+"""
+
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from delaunay_triangles import DelaunayTriangles
+from mesh import TriangleMesh
+from mesh_cache import MeshCache
+
+
+class BatchGenerator:
+    """
+    Generates a mesh for every combination of size, density and seed on a
+    pool of worker processes and writes each of them to "output_directory".
+
+    A mesh is written by "TriangleMesh.save" with its points, triangles,
+    neighbors and adjacency, under the file name of "MeshCache", so the
+    directory can be used as a mesh cache afterwards.
+    The same size, density and seed always give the same mesh.
+    """
+
+    # Engine of the meshes, also used by the moderators so that they build the same ones
+    DEFAULT_ENGINE = "sweep_hull"
+
+    __output_directory: str
+    __sizes: list
+    __densities: list
+    __seeds: list
+    __engine: str
+    __num_workers: int
+
+    @property
+    def output_directory(self):
+        return self.__output_directory
+
+    @property
+    def num_workers(self):
+        return self.__num_workers
+
+    @property
+    def jobs(self) -> list:
+        """ (width, height, density, seed) of every mesh. """
+        return [(width, height, density, seed) for (width, height), density, seed
+                in itertools.product(self.__sizes, self.__densities, self.__seeds)]
+
+    def __init__(self, output_directory: str, sizes: list, densities: list, seeds,
+                 engine: str = DEFAULT_ENGINE, num_workers: int = None):
+        """
+        "sizes" is a list of (width, height), "densities" the numbers of
+        points per unit area and "seeds" any iterable of integers.
+        "num_workers" defaults to the number of CPUs.
+        """
+        if engine not in DelaunayTriangles.ENGINES:
+            raise ValueError(f"Unknown triangulation engine: {engine}")
+        self.__output_directory = output_directory
+        self.__sizes = list(sizes)
+        self.__densities = list(densities)
+        self.__seeds = list(seeds)
+        self.__engine = engine
+        self.__num_workers = num_workers or os.cpu_count() or 1
+
+    def run(self) -> dict:
+        """
+        Generate and write all meshes. Returns the throughput as a dict of
+        "meshes", "triangles", "bytes", "seconds", "meshes_per_second" and
+        "triangles_per_second".
+        """
+        os.makedirs(self.__output_directory, exist_ok=True)
+        jobs = [(self.__output_directory, width, height, density, seed, self.__engine)
+                for width, height, density, seed in self.jobs]
+
+        begin = time.perf_counter()
+        num_triangles = 0
+        num_bytes = 0
+        with ProcessPoolExecutor(max_workers=self.__num_workers) as executor:
+            chunk_size = max(len(jobs) // (self.__num_workers * 4), 1)
+            for path, triangles in executor.map(generate_mesh_file, jobs, chunksize=chunk_size):
+                num_triangles += triangles
+                num_bytes += os.path.getsize(path)
+        seconds = time.perf_counter() - begin
+
+        return {
+            "meshes": len(jobs),
+            "triangles": num_triangles,
+            "bytes": num_bytes,
+            "seconds": seconds,
+            "meshes_per_second": len(jobs) / seconds if seconds > 0 else 0.0,
+            "triangles_per_second": num_triangles / seconds if seconds > 0 else 0.0,
+        }
+
+    @staticmethod
+    def generate_mesh(width: int, height: int, density: float, seed: int,
+                      engine: str = DEFAULT_ENGINE, delaunay_triangles: DelaunayTriangles = None) -> TriangleMesh:
+        """
+        With "delaunay_triangles" of the same size and engine, it is reset and
+        the mesh is written into the arrays of its previous mesh.
+        """
+        points = DelaunayTriangles.create_points_poisson_disk(width, height, density, seed=seed)
+        if delaunay_triangles is None:
+            delaunay_triangles = DelaunayTriangles(width, height, engine=engine)
+        else:
+            delaunay_triangles.reset()
+        # The incremental engine shuffles the points with "seed" too
+        delaunay_triangles.triangulation(points, seed=seed)
+        return delaunay_triangles.mesh
+
+
+"""
+DelaunayTriangles of a worker process by (width, height, engine), reused for
+every job of that size so that the mesh arrays are not allocated again.
+"""
+_worker_triangulations = dict()
+
+
+def generate_mesh_file(job: tuple) -> tuple:
+    """
+    Worker of "BatchGenerator". Generate and write the mesh of
+    job = (output_directory, width, height, density, seed, engine).
+    Returns the path and the number of triangles.
+    """
+    output_directory, width, height, density, seed, engine = job
+    delaunay_triangles = _worker_triangulations.get((width, height, engine))
+    if delaunay_triangles is None:
+        delaunay_triangles = DelaunayTriangles(width, height, engine=engine)
+        _worker_triangulations[(width, height, engine)] = delaunay_triangles
+    mesh = BatchGenerator.generate_mesh(width, height, density, seed, engine, delaunay_triangles)
+    path = os.path.join(output_directory, MeshCache.get_file_name(width, height, density, seed))
+    mesh.save(path)
+    return path, mesh.num_triangles
@@ -4,8 +4,14 @@ Module for delaunay triangle generation.
 
 import random
 import math
+import numpy as np
 from tkinter import Canvas
 from libs import Point, Triangle, Circle, Drawable
+from mesh import TriangleMesh
+from palette import Palette
+from stats import STATS
+from triangulation_engines import TriangulationEngine, DivideAndConquerEngine, SweepHullEngine, \
+    TiledEngine
 
 
 class DelaunayTriangles(Drawable):
@@ -13,14 +19,95 @@ class DelaunayTriangles(Drawable):
     From http://tercel-sakuragaoka.blogspot.com/2011/06/processingdelaunay.html
     """
 
-    __triangle_set: set = set()
-    __triangle_adjacency_map: dict
+    """
+    Triangulation engines
+     -incremental        : Bowyer-Watson insertion into the working triangulation.
+     -divide_and_conquer : Guibas and Stolfi divide and conquer.
+     -sweep_hull         : Radial sweep-hull (S-hull).
+     -tiled              : Sweep-hull on overlapping tiles in worker processes,
+                           stitched at the seams.
+    """
+    ENGINES = {
+        "incremental": None,
+        "divide_and_conquer": DivideAndConquerEngine,
+        "sweep_hull": SweepHullEngine,
+        "tiled": TiledEngine,
+    }
+
+    __mesh: TriangleMesh
+    # Whether the next triangulation writes into the arrays of __mesh (see "reset")
+    __reuse_mesh: bool
     __width: int
     __height: int
+    __engine: str
+
+    """
+    Working triangulation used while inserting points.
+
+    Vertices 0, 1 and 2 are the vertices of the huge triangle.
+    Triangle t is stored at [3 * t, 3 * t + 3) of the flat lists.
+    Its vertices are in counterclockwise order, and the neighbor
+    stored at 3 * t + i is the one across the side opposite to vertex i.
+    Removed triangles have -1 as their first vertex and their slots are reused.
+    The circumscribed circle of each triangle is computed once when the
+    triangle is created and kept as its center and squared radius.
+    """
+    __xs: list
+    __ys: list
+    __triangle_vertices: list
+    __triangle_neighbors: list
+    __circumcenter_xs: list
+    __circumcenter_ys: list
+    __squared_radii: list
+    __free_triangles: list
+    __last_triangle: int
+
+    """
+    Link between the working triangulation and the mesh, kept up to date by
+    "insert_point" and "remove_point": triangle m of the mesh is working
+    triangle __slots[m], and working triangle t is triangle __mesh_indices[t]
+    of the mesh, or -1 when it is not in the mesh.
+    __mesh_version is the "geometry_version" of the mesh when they were last
+    in step, so that changes made to the mesh by others, e.g. "KineticMesh",
+    are noticed.
+    """
+    __slots: list
+    __mesh_indices: list
+    __mesh_version: int
+    __created_triangles: list
+    __moved_triangles: list
+
+    # Counted by the incremental engine and added to STATS at the end
+    __num_in_circle_tests: int
+    __num_created_triangles: int
+    __num_removed_triangles: int
+
+    @property
+    def mesh(self):
+        return self.__mesh
 
     @property
     def triangles(self):
-        return list(self.__triangle_set)
+        """ Copies of the triangles as "Triangle" objects. """
+        return [self.__mesh.get_triangle(t) for t in range(self.__mesh.num_triangles)]
+
+    @property
+    def created_triangles(self):
+        """ Triangles of the mesh created by the last "insert_point" or "remove_point". """
+        return self.__created_triangles
+
+    @property
+    def moved_triangles(self):
+        """
+        Triangles of the mesh moved to another index by the last "remove_point",
+        with their vertices and color unchanged.
+        """
+        return self.__moved_triangles
+
+    @property
+    def changed_triangles(self):
+        """ "created_triangles" and "moved_triangles" in order. """
+        return sorted(self.__created_triangles + self.__moved_triangles)
 
     @property
     def width(self):
@@ -30,74 +117,575 @@ class DelaunayTriangles(Drawable):
     def height(self):
         return self.__height
 
-    def __init__(self, width: int, height: int):
+    @property
+    def engine(self):
+        return self.__engine
+
+    def __init__(self, width: int, height: int, engine: str = "incremental"):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown triangulation engine: {engine}")
         self.__width = width
         self.__height = height
+        self.__engine = engine
+        self.__mesh = TriangleMesh(np.empty((0, 2)), np.empty((0, 3)))
+        self.__reuse_mesh = False
+        self.__xs = None
+        self.__created_triangles = list()
+        self.__moved_triangles = list()
+
+    def reset(self):
+        """
+        Forget the points and the mesh. The mesh object is emptied and kept
+        with its arrays, and the next "triangulation" writes into them, so
+        meshes of about the same size are regenerated without allocating
+        them again. Copy the mesh first to keep it.
+        """
+        self.__mesh.resize(0, 0)
+        self.__reuse_mesh = True
+        self.__xs = None
+        self.__created_triangles = list()
+        self.__moved_triangles = list()
 
-    def triangulation(self, point_list: list):
+    def triangulation(self, point_list: list, engine=None, seed: int = None):
         """
         Perform a Delaunay split based on "point_list".
+        "point_list" is a list of "Point" or a float (N, 2) array.
+
+        "engine" is one of "ENGINES" and defaults to the engine given to the
+        constructor. It can also be a "TriangulationEngine", such as
+        a "TiledEngine" with a given number of tiles. Every engine triangulates the points together with the
+        vertices of the huge triangle, so all of them build the same mesh.
+
+        The incremental engine locates every point by walking from the last
+        created triangle, and only the triangles connected to it whose
+        circumscribed circle contains the point are divided again (Bowyer-Watson).
+        Points are inserted in a biased randomized order sorted along
+        a Hilbert curve, so that each walk is short. "seed" fixes that order,
+        and defaults to one drawn from "random".
         """
+        engine = self.__engine if engine is None else engine
+        if not isinstance(engine, TriangulationEngine) and engine not in self.ENGINES:
+            raise ValueError(f"Unknown triangulation engine: {engine}")
+        with STATS.phase("triangulation"):
+            self.__triangulate(self.to_point_array(point_list), engine, seed)
+
+    def __triangulate(self, points: np.ndarray, engine, seed: int = None):
+
         # Add huge triangle to set
         huge_triangle = self.get_huge_triangle()
-        self.__triangle_set.add(huge_triangle)
-
-        # Add points sequentially and repeat triangulation
-        for point in point_list:
-            """
-            Temporary hash holding additional candidate triangles.
-
-            Of the triangles that can be added, "only those that do
-            not overlap" are newly added to the triangle list.
-
-            tmp_triangle_set
-             -key   : Triangles(Polygon)
-             -value : Whether it is duplicated.
-                      - Non-duplicate : True
-                      - Duplicate     : False
-            """
-            tmp_triangle_map = dict()
-
-            """
-            Take elements one by one from the current triangle list and
-            determine if a given point is included in the circumscribed
-            circle of each triangle.
-            """
-            iterator = set(self.__triangle_set)
-            for triangle in iterator:
-                circumscribed_circle = self.get_circumscribed_circle_of_triangle(triangle)
-
-                """
-                If the added point exists inside the circumscribed circle,
-                remove the triangle with the circumscribed circle from the
-                list and divide it again.
-                """
-                if circumscribed_circle.center.distance(point) <= circumscribed_circle.radius:
-                    # Divide the triangle into three around point
-                    points = triangle.points
-                    point1 = points[0]
-                    point2 = points[1]
-                    point3 = points[2]
-
-                    self.add_element_to_redundancies_map(tmp_triangle_map,
-                                                         Triangle(point, point1, point2))
-                    self.add_element_to_redundancies_map(tmp_triangle_map,
-                                                         Triangle(point, point2, point3))
-                    self.add_element_to_redundancies_map(tmp_triangle_map,
-                                                         Triangle(point, point3, point1))
-
-                    self.__triangle_set.remove(triangle)
-
-            # Add unique temporary hashes to the triangle list
-            for triangle, is_unique in tmp_triangle_map.items():
-                if is_unique:
-                    self.__triangle_set.add(triangle)
-
-        # Remove the vertices of the outer triangle
-        iterator = set(self.__triangle_set)
-        for triangle in iterator:
-            if huge_triangle.has_common_points(triangle):
-                self.__triangle_set.remove(triangle)
+        self.__xs = [point.x for point in huge_triangle.points] + points[:, 0].tolist()
+        self.__ys = [point.y for point in huge_triangle.points] + points[:, 1].tolist()
+        self.__triangle_vertices = [0, 1, 2]
+        self.__triangle_neighbors = [-1, -1, -1]
+        self.__circumcenter_xs = [0.0]
+        self.__circumcenter_ys = [0.0]
+        self.__squared_radii = [0.0]
+        self.__free_triangles = list()
+        self.__last_triangle = 0
+        self.__cache_circumscribed_circle(0)
+
+        if engine == "incremental":
+            # Add points sequentially and repeat triangulation
+            self.__num_in_circle_tests = 0
+            self.__num_created_triangles = 0
+            self.__num_removed_triangles = 0
+            if seed is None:
+                seed = random.getrandbits(32)
+            order = self.get_insertion_order(points, seed=seed)
+            for index in order.tolist():
+                self.__insert_vertex(index + 3)
+            STATS.count("in_circle_tests", self.__num_in_circle_tests)
+            STATS.count("triangles_created", self.__num_created_triangles)
+            STATS.count("triangles_removed", self.__num_removed_triangles)
+        else:
+            if not isinstance(engine, TriangulationEngine):
+                engine = self.ENGINES[engine]()
+            self.__triangulate_with_engine(engine)
+            STATS.count("triangles_created", len(self.__triangle_vertices) // 3)
+
+        STATS.count("points_inserted", len(points))
+        self.__mesh = self.__export_mesh(self.__mesh if self.__reuse_mesh else None)
+        self.__mesh_version = self.__mesh.geometry_version
+        self.__reuse_mesh = False
+
+    def __triangulate_with_engine(self, engine: TriangulationEngine, used: np.ndarray = None):
+        """
+        Replace the working triangulation with the one built by "engine"
+        from the "used" vertices, all of them by default.
+        """
+        vertices = np.column_stack((self.__xs, self.__ys))
+        if used is None:
+            used = np.arange(len(vertices))
+
+        # Engines need distinct points
+        _, unique = np.unique(vertices[used], axis=0, return_index=True)
+        unique = used[unique]
+        triangles = unique[engine.triangulate(vertices[unique])]
+
+        xs = vertices[:, 0]
+        ys = vertices[:, 1]
+        v1, v2, v3 = triangles.T
+        center_x, center_y = self.compute_circumcenter(xs[v1], ys[v1], xs[v2], ys[v2],
+                                                       xs[v3], ys[v3])
+        self.__triangle_vertices = triangles.ravel().tolist()
+        self.__triangle_neighbors = TriangleMesh.compute_neighbors(triangles).ravel().tolist()
+        self.__circumcenter_xs = center_x.tolist()
+        self.__circumcenter_ys = center_y.tolist()
+        self.__squared_radii = ((center_x - xs[v1]) ** 2 + (center_y - ys[v1]) ** 2).tolist()
+        self.__free_triangles = list()
+        self.__last_triangle = 0
+
+    def __insert_vertex(self, vertex: int):
+        """
+        Insert a vertex of the working triangulation.
+        Returns the removed and the created triangles, which share slots,
+        or None when the same point has already been inserted.
+        """
+        xs = self.__xs
+        ys = self.__ys
+        triangle_vertices = self.__triangle_vertices
+        triangle_neighbors = self.__triangle_neighbors
+        circumcenter_xs = self.__circumcenter_xs
+        circumcenter_ys = self.__circumcenter_ys
+        squared_radii = self.__squared_radii
+        x = xs[vertex]
+        y = ys[vertex]
+
+        triangle = self.__locate(x, y)
+        for other in triangle_vertices[3 * triangle:3 * triangle + 3]:
+            if math.isclose(xs[other], x) and math.isclose(ys[other], y):
+                return None
+
+        """
+        Grow the cavity from the triangle containing the point.
+        A neighbor joins the cavity when its circumscribed circle contains
+        the point, or when the point does not see the shared side
+        (the cavity must be star-shaped from the point).
+
+        boundary
+         -(v1, v2, outside, back) : Side v1 -> v2 of the cavity, the triangle
+                                    outside of it and the position of the side
+                                    in that triangle.
+        """
+        cavity = {triangle}
+        stack = [triangle]
+        boundary = list()
+        num_hull_sides = 0
+        while stack:
+            current = stack.pop()
+            base = 3 * current
+            for i in range(3):
+                outside = triangle_neighbors[base + i]
+                if outside in cavity:
+                    continue
+                v1 = triangle_vertices[base + (i + 1) % 3]
+                v2 = triangle_vertices[base + (i + 2) % 3]
+                if outside >= 0:
+                    sees_side = (xs[v2] - xs[v1]) * (y - ys[v1]) - (ys[v2] - ys[v1]) * (x - xs[v1]) > 0
+                    dx = circumcenter_xs[outside] - x
+                    dy = circumcenter_ys[outside] - y
+                    if not sees_side or dx * dx + dy * dy <= squared_radii[outside]:
+                        cavity.add(outside)
+                        stack.append(outside)
+                        continue
+                    back = triangle_neighbors.index(current, 3 * outside, 3 * outside + 3) - 3 * outside
+                else:
+                    back = -1
+                    num_hull_sides += 1
+                boundary.append((v1, v2, outside, back))
+
+        # Divide the cavity into triangles around the point
+        reusable = list(cavity)
+        by_first = dict()
+        by_second = dict()
+        for v1, v2, outside, back in boundary:
+            if outside in cavity:
+                continue
+            created = reusable.pop() if reusable else self.__allocate_triangle()
+            base = 3 * created
+            triangle_vertices[base] = vertex
+            triangle_vertices[base + 1] = v1
+            triangle_vertices[base + 2] = v2
+            triangle_neighbors[base] = outside
+            if outside >= 0:
+                triangle_neighbors[3 * outside + back] = created
+
+            # Circumscribed circle relative to the point
+            x1 = xs[v1] - x
+            y1 = ys[v1] - y
+            x2 = xs[v2] - x
+            y2 = ys[v2] - y
+            c = 2 * (x1 * y2 - y1 * x2)
+            mul1 = x1 * x1 + y1 * y1
+            mul2 = x2 * x2 + y2 * y2
+            center_x = (y2 * mul1 - y1 * mul2) / c
+            center_y = (x1 * mul2 - x2 * mul1) / c
+            circumcenter_xs[created] = x + center_x
+            circumcenter_ys[created] = y + center_y
+            squared_radii[created] = center_x * center_x + center_y * center_y
+
+            by_first[v1] = created
+            by_second[v2] = created
+
+        # Connect the new triangles to each other
+        for created in by_first.values():
+            base = 3 * created
+            triangle_neighbors[base + 1] = by_first[triangle_vertices[base + 2]]
+            triangle_neighbors[base + 2] = by_second[triangle_vertices[base + 1]]
+            self.__last_triangle = created
+
+        for removed in reusable:
+            triangle_vertices[3 * removed] = -1
+            self.__free_triangles.append(removed)
+
+        # Every triangle joining the cavity and every side left on its boundary took a test
+        self.__num_in_circle_tests += len(cavity) - 1 + len(boundary) - num_hull_sides
+        self.__num_created_triangles += len(by_first)
+        self.__num_removed_triangles += len(cavity)
+        return list(cavity), list(by_first.values())
+
+    def __remove_vertex(self, vertex: int, triangle: int) -> tuple:
+        """
+        Remove a vertex of the working triangulation, "triangle" being one
+        of the triangles around it. Returns the removed and the created
+        triangles, which share slots.
+
+        The polygon formed by the triangles around the vertex is divided
+        again by cutting off ears one at a time, taking an ear whose
+        circumscribed circle contains no other vertex of the polygon.
+        Such a triangle is a Delaunay triangle of the polygon's vertices,
+        so the result is the Delaunay triangulation without the vertex.
+        """
+        triangle_vertices = self.__triangle_vertices
+        triangle_neighbors = self.__triangle_neighbors
+
+        """
+        The triangles around the vertex in counterclockwise order.
+
+        polygon : The other vertices of the triangles in the same order.
+        sides   : (outside, back) of side polygon[i] -> polygon[i + 1], as
+                  in the boundary of "__insert_vertex".
+        """
+        star = list()
+        polygon = list()
+        sides = list()
+        current = triangle
+        while True:
+            base = 3 * current
+            k = triangle_vertices.index(vertex, base, base + 3) - base
+            star.append(current)
+            polygon.append(triangle_vertices[base + (k + 1) % 3])
+            outside = triangle_neighbors[base + k]
+            back = triangle_neighbors.index(current, 3 * outside, 3 * outside + 3) - 3 * outside \
+                if outside >= 0 else -1
+            sides.append((outside, back))
+            current = triangle_neighbors[base + (k + 1) % 3]
+            if current == triangle:
+                break
+
+        reusable = list(star)
+        created = list()
+        while len(polygon) > 3:
+            ear = self.__find_ear(polygon)
+            p0, p1, p2 = polygon[ear - 1], polygon[ear], polygon[(ear + 1) % len(polygon)]
+            new = reusable.pop()
+            self.__create_triangle(new, (p0, p1, p2), (sides[ear], None, sides[ear - 1]))
+            created.append(new)
+            # The side p0 -> p2 of the rest is the side opposite to p1 of the ear
+            sides[ear - 1] = (new, 1)
+            del polygon[ear]
+            del sides[ear]
+        new = reusable.pop()
+        self.__create_triangle(new, tuple(polygon), (sides[1], sides[2], sides[0]))
+        created.append(new)
+
+        for removed in reusable:
+            triangle_vertices[3 * removed] = -1
+            self.__free_triangles.append(removed)
+        self.__last_triangle = new
+        return star, created
+
+    def __find_ear(self, polygon: list) -> int:
+        """
+        Index of a vertex of the counterclockwise "polygon" whose ear has no
+        other vertex in its circumscribed circle, or only none in the
+        triangle if rounding errors leave no such ear.
+        """
+        xs = self.__xs
+        ys = self.__ys
+        fallback = -1
+        for i in range(len(polygon)):
+            p0, p1, p2 = polygon[i - 1], polygon[i], polygon[(i + 1) % len(polygon)]
+            if TriangulationEngine.orient(xs[p0], ys[p0], xs[p1], ys[p1], xs[p2], ys[p2]) <= 0:
+                continue
+            others = [other for other in polygon if other not in (p0, p1, p2)]
+            if not any(TriangulationEngine.in_circle(xs[p0], ys[p0], xs[p1], ys[p1], xs[p2], ys[p2],
+                                                     xs[other], ys[other]) for other in others):
+                return i
+            if fallback < 0 and not any(
+                    TriangulationEngine.orient(xs[p0], ys[p0], xs[p1], ys[p1], xs[other], ys[other]) > 0
+                    and TriangulationEngine.orient(xs[p1], ys[p1], xs[p2], ys[p2], xs[other], ys[other]) > 0
+                    and TriangulationEngine.orient(xs[p2], ys[p2], xs[p0], ys[p0], xs[other], ys[other]) > 0
+                    for other in others):
+                fallback = i
+        return max(fallback, 0)
+
+    def __create_triangle(self, triangle: int, vertices: tuple, sides: tuple):
+        """
+        Set the vertices of "triangle" and link each side to (outside, back)
+        of "sides", the one at i being opposite to vertex i. A side given as
+        None is linked later from the other side.
+        """
+        base = 3 * triangle
+        self.__triangle_vertices[base:base + 3] = vertices
+        for i, side in enumerate(sides):
+            if side is None:
+                continue
+            outside, back = side
+            self.__triangle_neighbors[base + i] = outside
+            if outside >= 0:
+                self.__triangle_neighbors[3 * outside + back] = triangle
+        self.__cache_circumscribed_circle(triangle)
+
+    def __allocate_triangle(self) -> int:
+        if self.__free_triangles:
+            return self.__free_triangles.pop()
+        self.__triangle_vertices.extend((-1, -1, -1))
+        self.__triangle_neighbors.extend((-1, -1, -1))
+        self.__circumcenter_xs.append(0.0)
+        self.__circumcenter_ys.append(0.0)
+        self.__squared_radii.append(0.0)
+        return len(self.__triangle_vertices) // 3 - 1
+
+    def __cache_circumscribed_circle(self, triangle: int):
+        xs = self.__xs
+        ys = self.__ys
+        v1, v2, v3 = self.__triangle_vertices[3 * triangle:3 * triangle + 3]
+        center_x, center_y = self.compute_circumcenter(xs[v1], ys[v1], xs[v2], ys[v2],
+                                                       xs[v3], ys[v3])
+        self.__circumcenter_xs[triangle] = center_x
+        self.__circumcenter_ys[triangle] = center_y
+        self.__squared_radii[triangle] = (center_x - xs[v1]) ** 2 + (center_y - ys[v1]) ** 2
+
+    def __locate(self, x: float, y: float) -> int:
+        """
+        Find the triangle containing (x, y) by walking from the last
+        created triangle towards the point across the neighbors.
+        The first side checked rotates so that the walk never cycles.
+        """
+        xs = self.__xs
+        ys = self.__ys
+        triangle_vertices = self.__triangle_vertices
+        triangle_neighbors = self.__triangle_neighbors
+        triangle = self.__last_triangle
+        step = 0
+        while True:
+            base = 3 * triangle
+            for k in range(3):
+                i = (k + step) % 3
+                v1 = triangle_vertices[base + (i + 1) % 3]
+                v2 = triangle_vertices[base + (i + 2) % 3]
+                if (xs[v2] - xs[v1]) * (y - ys[v1]) - (ys[v2] - ys[v1]) * (x - xs[v1]) < 0:
+                    triangle = triangle_neighbors[base + i]
+                    if triangle < 0:
+                        raise ValueError(f"({x}, {y}) is out of the huge triangle.")
+                    break
+            else:
+                return triangle
+            step += 1
+
+    def __export_mesh(self, mesh: TriangleMesh = None) -> TriangleMesh:
+        """
+        Build the mesh from the working triangulation, without the
+        triangles sharing vertices with the huge triangle.
+        With "mesh" it is written into "mesh" instead, whose colors become
+        the default one.
+        """
+        triangle_vertices = np.array(self.__triangle_vertices, dtype=np.int32).reshape(-1, 3)
+        triangle_neighbors = np.array(self.__triangle_neighbors, dtype=np.int32).reshape(-1, 3)
+        keep = triangle_vertices.min(axis=1) >= 3
+
+        # The extra last element maps the missing neighbor -1 to itself.
+        index_map = np.full(len(triangle_vertices) + 1, -1, dtype=np.int32)
+        index_map[np.flatnonzero(keep)] = np.arange(np.count_nonzero(keep), dtype=np.int32)
+        self.__slots = np.flatnonzero(keep).tolist()
+        self.__mesh_indices = index_map[:-1].tolist()
+
+        vertices = np.column_stack((self.__xs[3:], self.__ys[3:]))
+        if mesh is None:
+            return TriangleMesh(vertices, triangle_vertices[keep] - 3,
+                                index_map[triangle_neighbors[keep]])
+        mesh.resize(0, 0)
+        mesh.resize(len(vertices), len(self.__slots))
+        mesh.vertices[:] = vertices
+        mesh.triangles[:] = triangle_vertices[keep] - 3
+        mesh.neighbors[:] = index_map[triangle_neighbors[keep]]
+        return mesh
+
+    def insert_point(self, point: Point) -> int:
+        """
+        Add a point to the current mesh. Only the triangles whose
+        circumscribed circle contains the point are divided again.
+        Returns the index of the new vertex of the mesh, or -1 when the
+        point is already there.
+
+        The other triangles keep their indices and colors. The new ones
+        take the indices of the divided ones first and then new indices at
+        the end, and they are listed in "created_triangles".
+        """
+        if not (0 <= point.x <= self.width and 0 <= point.y <= self.height):
+            raise ValueError(f"({point.x}, {point.y}) is out of the canvas.")
+        self.__prepare_editing()
+        with STATS.phase("insert_point"):
+            self.__num_in_circle_tests = 0
+            self.__num_created_triangles = 0
+            self.__num_removed_triangles = 0
+            vertex = len(self.__xs)
+            self.__xs.append(float(point.x))
+            self.__ys.append(float(point.y))
+            changed = self.__insert_vertex(vertex)
+            if changed is None:
+                self.__xs.pop()
+                self.__ys.pop()
+                self.__created_triangles = list()
+                self.__moved_triangles = list()
+                return -1
+            self.__update_mesh(*changed)
+        STATS.count("points_inserted")
+        STATS.count("in_circle_tests", self.__num_in_circle_tests)
+        return vertex - 3
+
+    def remove_point(self, point: Point) -> int:
+        """
+        Remove the vertex of the mesh nearest to "point" among those of
+        the triangle containing it (see "remove_vertex").
+        Returns the index of the removed vertex, or -1 when there is none.
+        """
+        self.__prepare_editing()
+        triangle = self.__locate(point.x, point.y)
+        base = 3 * triangle
+        vertices = [vertex for vertex in self.__triangle_vertices[base:base + 3] if vertex >= 3]
+        if not vertices:
+            return -1
+        vertex = min(vertices, key=lambda vertex: math.hypot(self.__xs[vertex] - point.x,
+                                                              self.__ys[vertex] - point.y))
+        self.remove_vertex(vertex - 3)
+        return vertex - 3
+
+    def remove_vertex(self, vertex: int):
+        """
+        Remove a vertex from the current mesh. Only the triangles around it
+        are divided again, and the vertex stays in the vertex array without
+        triangles, so the other vertices keep their indices.
+        The triangles keep their indices and colors as with "insert_point",
+        except that the last ones are moved into the indices left over.
+        """
+        self.__prepare_editing()
+        x = self.__xs[vertex + 3]
+        y = self.__ys[vertex + 3]
+        triangle = self.__locate(x, y)
+        if vertex + 3 not in self.__triangle_vertices[3 * triangle:3 * triangle + 3]:
+            raise ValueError(f"Vertex {vertex} is not in the mesh.")
+        with STATS.phase("remove_point"):
+            self.__update_mesh(*self.__remove_vertex(vertex + 3, triangle))
+        STATS.count("points_removed")
+
+    def __prepare_editing(self):
+        """
+        A loaded mesh has no working triangulation, and that of a mesh changed
+        in place since is out of date, so build it from the vertices of the
+        mesh used by triangles. The mesh is then rewritten in place from it:
+        the vertices keep their indices and the triangles found in the mesh
+        keep their colors.
+        """
+        if self.__xs is not None and self.__mesh.geometry_version == self.__mesh_version:
+            return
+        mesh = self.__mesh
+        huge_triangle = self.get_huge_triangle()
+        self.__xs = [point.x for point in huge_triangle.points] + mesh.vertices[:, 0].tolist()
+        self.__ys = [point.y for point in huge_triangle.points] + mesh.vertices[:, 1].tolist()
+        used = np.r_[0:3, np.flatnonzero(mesh.vertex_triangles >= 0) + 3]
+        self.__triangulate_with_engine(SweepHullEngine(), used)
+
+        colors = dict(zip(map(tuple, np.sort(mesh.triangles, axis=1).tolist()), mesh.color_indices.tolist()))
+        self.__export_mesh(mesh)
+        mesh.assign_colors([colors.get(key, Palette.DEFAULT_INDEX)
+                            for key in map(tuple, np.sort(mesh.triangles, axis=1).tolist())])
+        self.__mesh_version = mesh.geometry_version
+
+    def __update_mesh(self, removed: list, created: list):
+        """
+        Bring the mesh up to date after working triangles "removed" were
+        replaced by "created", only rewriting the triangles whose vertices
+        or neighbors changed, and set "created_triangles" and "moved_triangles".
+        """
+        mesh = self.__mesh
+        triangle_vertices = self.__triangle_vertices
+        triangle_neighbors = self.__triangle_neighbors
+        slots = self.__slots
+        mesh_indices = self.__mesh_indices
+        mesh_indices.extend([-1] * (len(triangle_vertices) // 3 - len(mesh_indices)))
+
+        # Indices of the removed triangles, the smallest last
+        free = list()
+        for slot in removed:
+            if mesh_indices[slot] >= 0:
+                free.append(mesh_indices[slot])
+                mesh_indices[slot] = -1
+        free.sort(reverse=True)
+
+        new = set()
+        for slot in created:
+            if min(triangle_vertices[3 * slot:3 * slot + 3]) < 3:
+                continue
+            if free:
+                index = free.pop()
+                slots[index] = slot
+            else:
+                index = len(slots)
+                slots.append(slot)
+            mesh_indices[slot] = index
+            new.add(index)
+
+        # Move the last triangles into the indices left over, the largest first
+        color_indices = mesh.color_indices
+        moved = set()
+        for hole in free:
+            last = len(slots) - 1
+            if hole != last:
+                slots[hole] = slots[last]
+                mesh_indices[slots[hole]] = hole
+                color_indices[hole] = color_indices[last]
+                if last in new:
+                    new.add(hole)
+                else:
+                    moved.add(hole)
+            new.discard(last)
+            moved.discard(last)
+            slots.pop()
+        changed = new | moved
+
+        num_vertices = mesh.num_vertices
+        mesh.resize(len(self.__xs) - 3, len(slots))
+        mesh.vertices[num_vertices:] = np.column_stack((self.__xs[3 + num_vertices:],
+                                                        self.__ys[3 + num_vertices:]))
+
+        # The changed triangles and the neighbors of the changed slots
+        rewritten = set(changed)
+        for slot in created + [slots[index] for index in moved]:
+            for neighbor in triangle_neighbors[3 * slot:3 * slot + 3]:
+                if neighbor >= 0 and mesh_indices[neighbor] >= 0:
+                    rewritten.add(mesh_indices[neighbor])
+        triangles = mesh.triangles
+        neighbors = mesh.neighbors
+        for index in rewritten:
+            base = 3 * slots[index]
+            triangles[index] = [vertex - 3 for vertex in triangle_vertices[base:base + 3]]
+            neighbors[index] = [mesh_indices[neighbor] if neighbor >= 0 else -1
+                                for neighbor in triangle_neighbors[base:base + 3]]
+        self.__created_triangles = sorted(new)
+        self.__moved_triangles = sorted(moved)
+        self.__mesh_version = mesh.geometry_version
 
     def get_huge_triangle(self) -> Triangle:
         """
@@ -107,37 +695,51 @@ class DelaunayTriangles(Drawable):
         end = Point(self.width, self.height)
         return self.get_equilateral_triangle_contains_rectangle(begin, end)
 
-    def find_triangle_has_in_edge(self, compare_vector: Point) -> Triangle:
+    def save(self, path: str):
+        """ Write the current mesh to "path" (see "TriangleMesh.save"). """
+        self.__mesh.save(path)
+
+    def load(self, path: str, mmap: bool = True):
+        """ Replace the current mesh with the one saved in "path". """
+        self.__mesh = TriangleMesh.load(path, mmap=mmap)
+        self.__reuse_mesh = False
+        self.__xs = None
+
+    def find_triangle_has_in_edge(self, compare_vector: Point) -> int:
+        """
+        Find a triangle having the vertex with the lowest cosine similarity
+        to "compare_vector".
+        """
         # This algorithm is using cosine adjacency
-        point_dict = dict()
-        point_list = list()
-        for triangle in self.triangles:
-            for point in triangle.points:
-                point_dict[point] = triangle
-                point_list.append(point)
-        point_list.sort(key=lambda p: (p.x * compare_vector.x + p.y * compare_vector.y) / (math.sqrt(p.x ** 2 + p.y ** 2) * math.sqrt(compare_vector.x ** 2 + compare_vector.y ** 2)))
-        point = point_list[0]
-        return point_dict[point]
+        vertex_triangles = self.__mesh.vertex_triangles
+        used = np.flatnonzero(vertex_triangles >= 0)
+        points = self.__mesh.vertices[used]
+        compare = np.array([compare_vector.x, compare_vector.y], dtype=np.float64)
+        similarities = (points @ compare) \
+            / (np.hypot(points[:, 0], points[:, 1]) * np.hypot(*compare))
+        return int(vertex_triangles[used[np.argmin(similarities)]])
+
+    def locate(self, point: Point) -> int:
+        """ Index of the triangle of the mesh containing "point", or -1. """
+        return self.__mesh.locate(point.x, point.y)
+
+    def locate_many(self, points) -> np.ndarray:
+        """ "locate" for every point of a list of "Point" or a float (N, 2) array. """
+        return self.__mesh.locate_many(self.to_point_array(points))
 
     def create_triangle_adjacency_map(self):
-        # Warning: Very heavy
-        self.__triangle_adjacency_map = dict()
-        for triangle in self.triangles:
-            adjacent_triangles = self.find_adjacent_triangles(triangle)
-            self.__triangle_adjacency_map[triangle] = adjacent_triangles
-
-    def find_adjacent_triangles(self, triangle: Triangle) -> list:
-        adjacent_triangles = list()
-        for compare_triangle in self.triangles:
-            if compare_triangle == triangle:
-                continue
-            if triangle.has_common_sides(compare_triangle):
-                adjacent_triangles.append(compare_triangle)
-        return adjacent_triangles
+        """
+        Build the adjacency of the current mesh ahead of time.
+        The mesh keeps it, so a new triangulation always has its own one.
+        """
+        return self.__mesh.adjacency
+
+    def find_adjacent_triangles(self, triangle: int) -> list:
+        return self.__mesh.get_adjacent_triangles(triangle)
 
-    def get_adjacent_triangles(self, triangle: Triangle) -> list:
-        " This method must be O(1). """
-        return self.__triangle_adjacency_map[triangle]
+    def get_adjacent_triangles(self, triangle: int) -> list:
+        """ This method must be O(1). """
+        return self.__mesh.get_adjacent_triangles(triangle)
 
     @staticmethod
     def get_equilateral_triangle_contains_rectangle(p1: Point, p2: Point) -> Triangle:
@@ -185,6 +787,23 @@ class DelaunayTriangles(Drawable):
         """
         Give a triangle and compute its circumscribed circle.
         """
+        p1 = triangle.points[0]
+        p2 = triangle.points[1]
+        p3 = triangle.points[2]
+
+        x, y = DelaunayTriangles.compute_circumcenter(p1.x, p1.y, p2.x, p2.y, p3.x, p3.y)
+
+        center = Point(x, y)
+        radius = center.distance(p1)
+
+        return Circle(center, radius)
+
+    @staticmethod
+    def compute_circumcenter(x1: float, y1: float, x2: float, y2: float,
+                             x3: float, y3: float) -> tuple:
+        """
+        Compute the center of the circumscribed circle of a triangle.
+        """
         """
         Let the coordinates of each vertex of the triangle be (x1, y1), (x2, y2), (x3, y3) and
         the center coordinates of the circumscribed circle be (x, y).
@@ -202,17 +821,6 @@ class DelaunayTriangles(Drawable):
         However
         c = 2 * { (x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1) }
         """
-        p1 = triangle.points[0]
-        p2 = triangle.points[1]
-        p3 = triangle.points[2]
-
-        x1 = p1.x
-        y1 = p1.y
-        x2 = p2.x
-        y2 = p2.y
-        x3 = p3.x
-        y3 = p3.y
-
         c = 2 * ((x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1))
         mul1 = (x2 ** 2 - x1 ** 2 + y2 ** 2 - y1 ** 2)
         mul2 = (x3 ** 2 - x1 ** 2 + y3 ** 2 - y1 ** 2)
@@ -220,44 +828,211 @@ class DelaunayTriangles(Drawable):
            + (y1 - y2) * mul2) / c
         y = ((x1 - x3) * mul1
            + (x2 - x1) * mul2) / c
+        return x, y
 
-        center = Point(x, y)
-        radius = center.distance(p1)
+    @staticmethod
+    def get_insertion_order(points: np.ndarray, seed: int = None) -> np.ndarray:
+        """
+        Biased randomized insertion order (BRIO).
 
-        return Circle(center, radius)
+        Each point goes to the last round with probability 1/2, to the one
+        before it with probability 1/4 and so on. Rounds are inserted from the
+        first one and the points of each round are sorted along a Hilbert curve.
+        """
+        rng = np.random.default_rng(seed)
+        rounds = rng.geometric(0.5, size=len(points))
+        hilbert_indices = DelaunayTriangles.compute_hilbert_indices(points)
+        return np.lexsort((hilbert_indices, -rounds))
 
     @staticmethod
-    def add_element_to_redundancies_map(hash_map: dict, triangle: Triangle):
+    def compute_hilbert_indices(points: np.ndarray, order: int = 16) -> np.ndarray:
         """
-        Add triangle to temporary hash.
+        Compute the position of each point along a Hilbert curve
+        covering the bounding box of the points with 2 ^ order cells per side.
         """
-        if triangle in hash_map:
-            hash_map[triangle] = False
-        else:
-            hash_map[triangle] = True
+        if len(points) == 0:
+            return np.empty(0, dtype=np.int64)
+        side = 1 << order
+        begin = points.min(axis=0)
+        extent = np.maximum(points.max(axis=0) - begin, 1e-12)
+        cells = ((points - begin) / extent * (side - 1)).astype(np.int64)
+        x = cells[:, 0]
+        y = cells[:, 1]
+
+        indices = np.zeros(len(points), dtype=np.int64)
+        s = side >> 1
+        while s > 0:
+            rx = (x & s) > 0
+            ry = (y & s) > 0
+            indices += s * s * ((3 * rx) ^ ry)
+
+            # Rotate the quadrant
+            flip = ~ry & rx
+            x = np.where(flip, side - 1 - x, x)
+            y = np.where(flip, side - 1 - y, y)
+            x, y = np.where(ry, x, y), np.where(ry, y, x)
+            s >>= 1
+        return indices
 
     def draw(self, canvas: Canvas):
         """
         For debugging
         """
-        for triangle in self.triangles:
-            triangle.draw(canvas)
+        self.__mesh.draw(canvas)
 
     MIN_DISTANCE = 30
+    MARGIN = 10
+
+    """
+    A full Poisson-disk sampling with distance r has about
+    POISSON_DISK_DENSITY / r ^ 2 points per unit area.
+    The value is slightly lower than the measured one, so that the
+    sampling overshoots the requested density a little.
+    """
+    POISSON_DISK_DENSITY = 0.6
+    POISSON_DISK_ATTEMPTS = 30
+
+    @staticmethod
+    def create_points_randomly(width: int, height: int, num_points: int,
+                               seed: int = None) -> np.ndarray:
+        """
+        Create "num_points" points at least MIN_DISTANCE apart.
+        Fewer points are returned when the canvas cannot hold them.
+        """
+        density = DelaunayTriangles.get_density(width, height, num_points)
+        return DelaunayTriangles.create_points_poisson_disk(width, height, density, seed=seed)
 
     @staticmethod
-    def create_points_randomly(width: int, height: int, num_points: int) -> list:
-        points = list()
-        for i in range(num_points):
-            flag = True
-            point: Point
-            while flag:
-                flag = False
-                x = random.randint(10, width - 10)
-                y = random.randint(10, height - 10)
-                point = Point(x, y)
-                for other in points:
-                    flag = flag or point.distance(other) < DelaunayTriangles.MIN_DISTANCE
-            points.append(point)
+    def get_density(width: int, height: int, num_points: int) -> float:
+        """ Points per unit area of "num_points" points inside the margins. """
+        area = (width - 2 * DelaunayTriangles.MARGIN) * (height - 2 * DelaunayTriangles.MARGIN)
+        return num_points / area if area > 0 else 0
+
+    @staticmethod
+    def get_num_points(width: int, height: int, density: float) -> int:
+        """ Number of points inside the margins at "density", the inverse of "get_density". """
+        inner_width = width - 2 * DelaunayTriangles.MARGIN
+        inner_height = height - 2 * DelaunayTriangles.MARGIN
+        if inner_width <= 0 or inner_height <= 0:
+            return 0
+        return int(round(density * inner_width * inner_height))
+
+    @staticmethod
+    def create_points_poisson_disk(width: int, height: int, density: float, seed: int = None,
+                                   min_distance: float = MIN_DISTANCE) -> np.ndarray:
+        """
+        Bridson's Poisson-disk sampling on a background grid.
+
+        "density" is the number of points per unit area, and the points are
+        returned as a float64 (N, 2) array. The sampling distance is chosen
+        from the density, but it is never shorter than "min_distance".
+        A full sampling is drawn and the points over the requested density
+        are dropped at random, so the points cover the whole canvas.
+
+        Every active point proposes one candidate in the annulus [r, 2r) around
+        it per round, and all candidates of a round are checked together.
+        The grid cells are r / sqrt(2) wide, so a cell holds at most one
+        point and only the 5x5 cells around a candidate can be too close.
+        Candidates of the same round are checked against each other in a random
+        priority order. A point stays active until it fails
+        POISSON_DISK_ATTEMPTS times in a row.
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        rng = np.random.default_rng(seed)
+        x0 = y0 = DelaunayTriangles.MARGIN
+        x1 = width - DelaunayTriangles.MARGIN
+        y1 = height - DelaunayTriangles.MARGIN
+        num_points = DelaunayTriangles.get_num_points(width, height, density)
+        if num_points <= 0:
+            return np.empty((0, 2), dtype=np.float64)
+
+        radius = max(min_distance, math.sqrt(DelaunayTriangles.POISSON_DISK_DENSITY / density))
+        squared_radius = radius * radius
+        cell_size = radius / math.sqrt(2)
+
+        # Background grid with two padding cells on each side. Empty cells hold inf.
+        columns = int((x1 - x0) / cell_size) + 1
+        rows = int((y1 - y0) / cell_size) + 1
+        stride = columns + 4
+        grid_xs = np.full((rows + 4) * stride, np.inf)
+        grid_ys = np.full((rows + 4) * stride, np.inf)
+        ranks = np.full((rows + 4) * stride, -1, dtype=np.int64)
+        offsets = np.array([dy * stride + dx for dy in range(-2, 3) for dx in range(-2, 3)
+                            if abs(dx) + abs(dy) < 4], dtype=np.int64)
+
+        def get_cells(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+            return ((ys - y0) / cell_size).astype(np.int64) * stride \
+                + ((xs - x0) / cell_size).astype(np.int64) + 2 * stride + 2
+
+        first_x = rng.uniform(x0, x1, 1)
+        first_y = rng.uniform(y0, y1, 1)
+        grid_xs[get_cells(first_x, first_y)] = first_x
+        grid_ys[get_cells(first_x, first_y)] = first_y
+        xs = [first_x]
+        ys = [first_y]
+        active_xs = first_x
+        active_ys = first_y
+        failures = np.zeros(1, dtype=np.int64)
+
+        while len(active_xs):
+            count = len(active_xs)
+            angles = rng.uniform(0, 2 * math.pi, count)
+            distances = radius * np.sqrt(1 + 3 * rng.random(count))
+            candidate_xs = active_xs + distances * np.cos(angles)
+            candidate_ys = active_ys + distances * np.sin(angles)
+            inside = (candidate_xs >= x0) & (candidate_xs <= x1) \
+                & (candidate_ys >= y0) & (candidate_ys <= y1)
+            cells = np.where(inside, get_cells(np.clip(candidate_xs, x0, x1),
+                                               np.clip(candidate_ys, y0, y1)), 0)
+
+            # Check the candidates against the points on the grid
+            accepted = np.flatnonzero(inside & np.isinf(grid_xs[cells]))
+            around = cells[accepted, None] + offsets
+            squared_distances = (grid_xs[around] - candidate_xs[accepted, None]) ** 2 \
+                + (grid_ys[around] - candidate_ys[accepted, None]) ** 2
+            accepted = accepted[(squared_distances >= squared_radius).all(axis=1)]
+
+            # Check the candidates against each other
+            if len(accepted) > 1:
+                priorities = np.empty(count, dtype=np.int64)
+                order = accepted[rng.permutation(len(accepted))]
+                priorities[order] = np.arange(len(order))
+                ranks[cells[order[::-1]]] = order[::-1]
+                accepted = accepted[ranks[cells[accepted]] == accepted]
+                others = ranks[cells[accepted, None] + offsets]
+                others = np.where(others >= 0, others, accepted[:, None])
+                conflicts = (priorities[others] < priorities[accepted, None]) \
+                    & ((candidate_xs[others] - candidate_xs[accepted, None]) ** 2
+                       + (candidate_ys[others] - candidate_ys[accepted, None]) ** 2 < squared_radius)
+                ranks[cells[order]] = -1
+                accepted = accepted[~conflicts.any(axis=1)]
+
+            new_xs = candidate_xs[accepted]
+            new_ys = candidate_ys[accepted]
+            grid_xs[cells[accepted]] = new_xs
+            grid_ys[cells[accepted]] = new_ys
+            xs.append(new_xs)
+            ys.append(new_ys)
+
+            failures += 1
+            failures[accepted] = 0
+            alive = failures < DelaunayTriangles.POISSON_DISK_ATTEMPTS
+            active_xs = np.concatenate((active_xs[alive], new_xs))
+            active_ys = np.concatenate((active_ys[alive], new_ys))
+            failures = np.concatenate((failures[alive], np.zeros(len(accepted), dtype=np.int64)))
+
+        points = np.column_stack((np.concatenate(xs), np.concatenate(ys)))
+        if len(points) > num_points:
+            points = points[np.sort(rng.choice(len(points), num_points, replace=False))]
         return points
 
+    @staticmethod
+    def to_point_array(point_list) -> np.ndarray:
+        """
+        Convert a list of "Point" or a float (N, 2) array into a float64 (N, 2) array.
+        """
+        if isinstance(point_list, np.ndarray):
+            return np.ascontiguousarray(point_list, dtype=np.float64).reshape(-1, 2)
+        return np.array([(point.x, point.y) for point in point_list],
+                        dtype=np.float64).reshape(-1, 2)
@@ -0,0 +1,240 @@
+"""
+Module for moving the vertices of a Delaunay mesh while keeping it Delaunay.
+"""
+
+import math
+import numpy as np
+from mesh import TriangleMesh
+from stats import STATS
+from triangulation_engines import TriangulationEngine
+
+
+class KineticMesh:
+    """
+    Moves the vertices of a Delaunay triangle mesh in place at constant
+    velocities and repairs the triangulation after each step.
+
+    The vertices on the boundary of the mesh stay where they are, so the
+    meshed region never changes. A step moves the other vertices by their
+    velocities, and puts back and reflects those that would turn a triangle
+    over or flatten it, so the mesh stays valid. The sides of the triangles
+    around the moved vertices whose opposite vertex is inside the
+    circumscribed circle are then flipped (Lawson flips), and the sides
+    around each flip are checked in turn until the mesh is Delaunay again.
+
+    The moving and the first check are a few array operations over the
+    moved vertices and their triangles, and everything else is done per
+    flip, so a step is cheap as long as the points do not move far.
+    Every movable vertex moves in every step, so those array operations, and
+    the redraw of the moved triangles by a renderer, still cover the whole
+    mesh: a step is O(N) in NumPy plus O(flips) in Python, not O(flips).
+    Making it proportional to the flips would need the time of the next
+    flip of each side to be scheduled (a kinetic data structure), which the
+    reflections at the put-back vertices would invalidate every step.
+    It has the "step" and "is_finished" of a "MeshSimulation", so an
+    animation can run it in place of one.
+    """
+
+    """
+    Twice the area under which a triangle counts as flattened.
+    """
+    MIN_DOUBLE_AREA = 1e-3
+    """
+    A vertex is only taken as inside a circle when the in-circle determinant
+    exceeds this share of the sum of the absolute values of its terms, so
+    that rounding errors do not flip a side back and forth.
+    """
+    IN_CIRCLE_TOLERANCE = 1e-12
+
+    __mesh: TriangleMesh
+    __velocities: np.ndarray
+    __movable: np.ndarray
+    __time_step: float
+    __num_ticks: int
+    __num_flips: int
+
+    @property
+    def mesh(self):
+        return self.__mesh
+
+    @property
+    def velocities(self):
+        """ float64 array (N, 2) in pixels per second. """
+        return self.__velocities
+
+    @property
+    def movable(self):
+        """ bool array (N,), False for the vertices on the boundary and those of no triangle. """
+        return self.__movable
+
+    @property
+    def num_ticks(self):
+        return self.__num_ticks
+
+    @property
+    def num_flips(self):
+        """ Flips done since the start. """
+        return self.__num_flips
+
+    @property
+    def is_finished(self):
+        return False
+
+    def __init__(self, mesh: TriangleMesh, speed: float, time_step: float, seed: int = None):
+        """
+        Every movable vertex gets a random direction at "speed" pixels per second.
+        "time_step" is the number of seconds of one "step".
+        The arrays of "mesh" are copied when they are read-only.
+        """
+        mesh.make_writable()
+        self.__mesh = mesh
+        self.__time_step = time_step
+        self.__num_ticks = 0
+        self.__num_flips = 0
+
+        self.__movable = mesh.vertex_triangles >= 0
+        boundary = np.argwhere(mesh.neighbors < 0)
+        for k in (1, 2):
+            self.__movable[mesh.triangles[boundary[:, 0], (boundary[:, 1] + k) % 3]] = False
+
+        angles = np.random.default_rng(seed).uniform(0, 2 * math.pi, mesh.num_vertices)
+        self.__velocities = speed * np.column_stack((np.cos(angles), np.sin(angles)))
+        self.__velocities[~self.__movable] = 0
+
+    def step(self) -> np.ndarray:
+        """
+        Move the vertices by one time step and restore the Delaunay property.
+        Returns the vertices that moved.
+        """
+        with STATS.phase("kinetic_step"):
+            moved = self.move(self.__time_step)
+            num_flips = self.repair(moved)
+            self.__mesh.invalidate(triangles_changed=num_flips > 0)
+            self.__num_ticks += 1
+        STATS.count("vertices_moved", len(moved), per_frame=True)
+        STATS.count("edge_flips", num_flips, per_frame=True)
+        return moved
+
+    def move(self, seconds: float) -> np.ndarray:
+        """
+        Move the movable vertices, except those which would turn a triangle
+        over or flatten it, whose velocities are reflected instead.
+        Returns the vertices that moved.
+        """
+        mesh = self.__mesh
+        vertices = mesh.vertices
+        moved = np.flatnonzero(self.__movable)
+        previous = vertices[moved].copy()
+        vertices[moved] += self.__velocities[moved] * seconds
+
+        # Only the triangles around the moved vertices can change
+        is_moved = np.zeros(mesh.num_vertices, dtype=bool)
+        is_moved[moved] = True
+        triangles = np.flatnonzero(is_moved[mesh.triangles].any(axis=1))
+        while len(triangles) > 0:
+            flat = triangles[self.compute_double_areas(vertices, mesh.triangles[triangles])
+                             <= self.MIN_DOUBLE_AREA]
+            put_back = np.unique(mesh.triangles[flat].ravel())
+            put_back = put_back[is_moved[put_back]]
+            if len(put_back) == 0:
+                break
+            is_moved[put_back] = False
+            vertices[put_back] = previous[np.searchsorted(moved, put_back)]
+            self.__velocities[put_back] *= -1
+            # Putting a vertex back can only flatten the triangles around it
+            triangles = np.flatnonzero(np.isin(mesh.triangles, put_back).any(axis=1))
+        return np.flatnonzero(is_moved)
+
+    def repair(self, moved: np.ndarray) -> int:
+        """
+        Flip sides until the triangles around "moved" and those created by the
+        flips are Delaunay. Returns the number of flips.
+        """
+        mesh = self.__mesh
+        if len(moved) == 0:
+            return 0
+
+        # Check the sides of the triangles around the moved vertices at once
+        is_moved = np.zeros(mesh.num_vertices, dtype=bool)
+        is_moved[moved] = True
+        is_around = is_moved[mesh.triangles].any(axis=1)
+        triangles = np.flatnonzero(is_around)
+        sides = np.argwhere(mesh.neighbors[triangles] >= 0)
+        sides[:, 0] = triangles[sides[:, 0]]
+        # Each side once, from the triangle with the lower index when both are around
+        others = mesh.neighbors[sides[:, 0], sides[:, 1]]
+        sides = sides[(sides[:, 0] < others) | ~is_around[others]]
+        illegal = self.compute_illegal_sides(mesh.vertices, mesh.triangles, mesh.neighbors, sides)
+        stack = sides[illegal].tolist()
+
+        num_flips = 0
+        while stack:
+            triangle, i = stack.pop()
+            if not self.is_illegal(triangle, i):
+                continue
+            other = mesh.flip(triangle, i)
+            num_flips += 1
+            # The outer sides of the two new triangles
+            stack.extend(((triangle, 0), (triangle, 2), (other, 0), (other, 1)))
+        self.__num_flips += num_flips
+        return num_flips
+
+    def is_illegal(self, triangle: int, i: int) -> bool:
+        """
+        Whether the side opposite to vertex i of "triangle" has to be flipped:
+        the opposite vertex of the neighbor is inside the circumscribed circle
+        and both triangles after the flip would keep an area.
+        """
+        mesh = self.__mesh
+        other = int(mesh.neighbors[triangle, i])
+        if other < 0:
+            return False
+        vertices = mesh.triangles[triangle].tolist()
+        a, b, c = vertices[i], vertices[(i + 1) % 3], vertices[(i + 2) % 3]
+        d = int(mesh.triangles[other, mesh.neighbors[other].tolist().index(triangle)])
+        (ax, ay), (bx, by), (cx, cy), (dx, dy) = mesh.vertices[[a, b, c, d]].tolist()
+        return self.is_in_circle(ax, ay, bx, by, cx, cy, dx, dy) \
+            and TriangulationEngine.orient(ax, ay, bx, by, dx, dy) > self.MIN_DOUBLE_AREA \
+            and TriangulationEngine.orient(ax, ay, dx, dy, cx, cy) > self.MIN_DOUBLE_AREA
+
+    @staticmethod
+    def compute_double_areas(vertices: np.ndarray, triangles: np.ndarray) -> np.ndarray:
+        """ Twice the signed area of each triangle, positive in counterclockwise order. """
+        p1, p2, p3 = (vertices[triangles[:, k]] for k in range(3))
+        return (p2[:, 0] - p1[:, 0]) * (p3[:, 1] - p1[:, 1]) \
+            - (p2[:, 1] - p1[:, 1]) * (p3[:, 0] - p1[:, 0])
+
+    @staticmethod
+    def compute_illegal_sides(vertices: np.ndarray, triangles: np.ndarray, neighbors: np.ndarray,
+                              sides: np.ndarray) -> np.ndarray:
+        """
+        For each (triangle, i) of "sides", which must have a neighbor, whether
+        the vertex of the neighbor opposite to the side is inside the
+        circumscribed circle of the triangle.
+        """
+        triangle, i = sides[:, 0], sides[:, 1]
+        other = neighbors[triangle, i]
+        j = np.argmax(neighbors[other] == triangle[:, None], axis=1)
+        a = vertices[triangles[triangle, i]]
+        b = vertices[triangles[triangle, (i + 1) % 3]]
+        c = vertices[triangles[triangle, (i + 2) % 3]]
+        d = vertices[triangles[other, j]]
+        return KineticMesh.is_in_circle(a[:, 0], a[:, 1], b[:, 0], b[:, 1], c[:, 0], c[:, 1],
+                                        d[:, 0], d[:, 1])
+
+    @staticmethod
+    def is_in_circle(ax, ay, bx, by, cx, cy, dx, dy):
+        """
+        "TriangulationEngine.in_circle" with IN_CIRCLE_TOLERANCE.
+        The coordinates are floats or arrays of the same shape.
+        """
+        adx = ax - dx
+        ady = ay - dy
+        bdx = bx - dx
+        bdy = by - dy
+        cdx = cx - dx
+        cdy = cy - dy
+        term1 = (adx * adx + ady * ady) * (bdx * cdy - cdx * bdy)
+        term2 = (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy)
+        term3 = (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady)
+        return term1 + term2 + term3 > KineticMesh.IN_CIRCLE_TOLERANCE * (abs(term1) + abs(term2) + abs(term3))
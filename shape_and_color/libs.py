@@ -8,18 +8,26 @@ from tkinter import Canvas
 
 
 class Drawable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def draw(self, canvas: Canvas):
         pass
 
 
 class Color:
+    """
+    Immutable RGB color. The hex string and the hash are computed once.
+    """
     COLOR_BEGIN = (64, 64, 64)
     COLOR_DELTA = 15
 
+    __slots__ = ("__red", "__green", "__blue", "__hex", "__hash")
     __red: int
     __green: int
     __blue: int
+    __hex: str
+    __hash: int
 
     @property
     def red(self):
@@ -35,11 +43,7 @@ class Color:
 
     @property
     def hex(self):
-        color_hex = "#"
-        color_hex += hex(self.red)[2:]
-        color_hex += hex(self.green)[2:]
-        color_hex += hex(self.blue)[2:]
-        return color_hex
+        return self.__hex
 
     def __init__(self, red: int, green: int, blue: int):
         red = max(red, 0)
@@ -54,9 +58,15 @@ class Color:
         blue = min(blue, 255)
         self.__blue = blue
 
+        self.__hex = f"#{red:02x}{green:02x}{blue:02x}"
+        self.__hash = hash((red, green, blue))
+
     def __eq__(self, other):
         return self.red == other.red and self.green == other.green and self.blue == other.blue
 
+    def __hash__(self):
+        return self.__hash
+
     _all_colors: list = list()
 
     @classmethod
@@ -79,6 +89,10 @@ DEFAULT_COLOR = Color(0xff, 0xff, 0xff)
 
 
 class Point:
+    """
+    Immutable point.
+    """
+    __slots__ = ("__x", "__y")
     __x: float
     __y: float
 
@@ -105,7 +119,7 @@ class Point:
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash((round(self.x), round(self.y)))
+        return hash((round(self.__x), round(self.__y)))
 
     def distance(self, other) -> float:
         """ Compute euclidean distance between 2 points """
@@ -113,12 +127,24 @@ class Point:
 
 
 class Triangle(Drawable):
-    __points: list
+    """
+    Triangle with immutable vertices and a changeable color.
+
+    The vertices are stored in a canonical order: the smallest one by (x, y)
+    comes first and the rest follow counterclockwise, that is with a positive
+    cross product (x2 - x1) * (y3 - y1) - (y2 - y1) * (x3 - x1).
+    The same three points therefore always give the same order and hash.
+    """
+    __slots__ = ("__p1", "__p2", "__p3", "__color", "__hash")
+    __p1: Point
+    __p2: Point
+    __p3: Point
     __color: Color
+    __hash: int
 
     @property
     def points(self):
-        return self.__points
+        return self.__p1, self.__p2, self.__p3
 
     @property
     def color(self):
@@ -129,8 +155,9 @@ class Triangle(Drawable):
         self.__color = color
 
     def __init__(self, p1: Point, p2: Point, p3: Point, color: Color = DEFAULT_COLOR):
-        self.__points = [p1, p2, p3]
+        self.__p1, self.__p2, self.__p3 = self.get_canonical_order(p1, p2, p3)
         self.__color = color
+        self.__hash = hash((self.__p1.__hash__(), self.__p2.__hash__(), self.__p3.__hash__()))
 
     def __eq__(self, other):
         # "isinstance" of "type" function is very heavy.
@@ -139,27 +166,24 @@ class Triangle(Drawable):
 
         if other is None:
             return False
-
-        other_points = list(other.points)
-        for point in self.points:
-            if point in other_points:
-                other_points.remove(point)
-                continue
-            return False
-        return True
+        return self.points == other.points
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
+        return self.__hash
+
+    @staticmethod
+    def get_canonical_order(p1: Point, p2: Point, p3: Point) -> tuple:
         """
-        Sort the hash values of all points and pass them to the hash fuction.
+        Degenerate triangles have no orientation, so their vertices
+        are simply sorted by (x, y).
         """
-        hashes = list()
-        for point in self.points:
-            hashes.append(point.__hash__())
-        hashes.sort()
-        return hash(tuple(hashes))
+        p1, p2, p3 = sorted((p1, p2, p3), key=lambda point: (point.x, point.y))
+        if (p2.x - p1.x) * (p3.y - p1.y) - (p2.y - p1.y) * (p3.x - p1.x) < 0:
+            p2, p3 = p3, p2
+        return p1, p2, p3
 
     def has_common_sides(self, triangle) -> bool:
         common_point_count = 0
@@ -187,6 +211,10 @@ class Triangle(Drawable):
 
 
 class Circle(Drawable):
+    """
+    Immutable circle.
+    """
+    __slots__ = ("__center", "__radius", "__color")
     __center: Point
     __radius: float
     __color: Color
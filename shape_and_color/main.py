@@ -1,37 +1,165 @@
+import cProfile
 import sys
 from tkinter import Tk
-from moderators import Moderator, IncreaseAnimationModerator, DisplayModerator, MoveAnimationModerator
+from batch import BatchGenerator
+from mesh_cache import MeshCache
+from moderators import Moderator, IncreaseAnimationModerator, DisplayModerator, MoveAnimationModerator \
+    , DriftAnimationModerator
+from recorders import FrameRecorder
+from renderers import RasterRenderer
+from stats import STATS
 
 
 GUI_WIDTH = 1600
 GUI_HEIGHT = 800
 GUI_TITLE = "Delaunay triangles"
+RECORD_NUM_FRAMES = 300
+RECORD_FPS = 30
+BATCH_NUM_MESHES = 100
+# The density of the moderators, so the output directory can be their "--cache"
+BATCH_DENSITY = 1 / Moderator.num_points_adjuster
 
+"""
+--profile      : Print the phase timers and counters at the end.
+--profile=FILE : Also dump cProfile statistics to FILE (read them with pstats).
+--fps=N        : Frames per second of the increase, move and drift animations.
+--workers=N    : Number of worker processes of the batch generation.
+--seed=N       : Seed of the points, so that the same mesh is drawn every time.
+--cache=DIR    : With --seed, load the mesh from DIR or store it there.
+                 A batch output directory can be used.
+"""
+PROFILE_FLAG = "--profile"
+FPS_FLAG = "--fps="
+WORKERS_FLAG = "--workers="
+SEED_FLAG = "--seed="
+CACHE_FLAG = "--cache="
+
+
+def get_flag_value(flag: str):
+    """ Value of the last "--name=value" argument, or None. """
+    values = [arg[len(flag):] for arg in sys.argv if arg.startswith(flag)]
+    return values[-1] if values else None
+
+
+def run(args: list, target_fps: float = None, num_workers: int = None, seed: int = None,
+        cache: MeshCache = None):
+    # Generate meshes into a directory without a window
+    if len(args) >= 3 and args[1] == "batch":
+        run_batch(args, num_workers)
+        return
+
+    # Render to an image file without a window
+    if len(args) >= 3 and args[1] == "display":
+        renderer = RasterRenderer(GUI_WIDTH, GUI_HEIGHT, anti_aliased=True)
+        DisplayModerator(None, GUI_WIDTH, GUI_HEIGHT, seed=seed, renderer=renderer,
+                         cache=cache).execute()
+        renderer.save(args[2])
+        return
+
+    # Record an animation to an image sequence or a video without a window
+    if len(args) >= 4 and args[1] == "record":
+        renderer = RasterRenderer(GUI_WIDTH, GUI_HEIGHT, anti_aliased=True)
+        if args[2] == "increase":
+            moderator = IncreaseAnimationModerator(None, GUI_WIDTH, GUI_HEIGHT, seed=seed
+                                                   , renderer=renderer, cache=cache)
+        elif args[2] == "move":
+            num_move_triangles = int(args[5]) if len(args) >= 6 else 1
+            moderator = MoveAnimationModerator(None, GUI_WIDTH, GUI_HEIGHT
+                                               , num_move_triangles=num_move_triangles, seed=seed
+                                               , renderer=renderer, cache=cache)
+        elif args[2] == "drift":
+            moderator = DriftAnimationModerator(None, GUI_WIDTH, GUI_HEIGHT, seed=seed, renderer=renderer
+                                                , target_fps=target_fps or RECORD_FPS, cache=cache)
+        else:
+            print("Command line arguments: record [increase | move | drift] output_file "
+                  "[num_frames: int]? [num_move_triangles: int]?")
+            return
+        num_frames = int(args[4]) if len(args) >= 5 else RECORD_NUM_FRAMES
+        with FrameRecorder(args[3], fps=target_fps or RECORD_FPS) as recorder:
+            moderator.record(recorder, num_frames)
+        return
 
-if __name__ == "__main__":
     # Create window
     root = Tk()
     root.title(GUI_TITLE)
 
     # Pause commandline arguments and create moderator
     moderator: Moderator
-    args = sys.argv
     if len(args) >= 2:
         moderator_type = args[1]
         if moderator_type == "increase":
-            moderator = IncreaseAnimationModerator(root, GUI_WIDTH, GUI_HEIGHT)
+            moderator = IncreaseAnimationModerator(root, GUI_WIDTH, GUI_HEIGHT, seed=seed
+                                                   , target_fps=target_fps, cache=cache)
         elif moderator_type == "move":
             num_move_triangles = int(args[2]) if len(args) >= 3 else 1
             moderator = MoveAnimationModerator(root, GUI_WIDTH, GUI_HEIGHT
-                                               , num_move_triangles=num_move_triangles)
+                                               , num_move_triangles=num_move_triangles, seed=seed
+                                               , target_fps=target_fps, cache=cache)
+        elif moderator_type == "drift":
+            moderator = DriftAnimationModerator(root, GUI_WIDTH, GUI_HEIGHT, seed=seed
+                                                , target_fps=target_fps, cache=cache)
         elif moderator_type == "display":
-            moderator = DisplayModerator(root, GUI_WIDTH, GUI_HEIGHT)
+            moderator = DisplayModerator(root, GUI_WIDTH, GUI_HEIGHT, seed=seed, cache=cache)
         else:
-            print("Command line arguments: [increase | move | display]? [num_move_triangles: int]?")
-            exit(0)
+            print("Command line arguments: [increase | move | drift | display | record | batch]? "
+                  "[num_move_triangles: int | output_image: str]? [--profile[=FILE]]? [--fps=N]?")
+            return
     else:
-        moderator = DisplayModerator(root, GUI_WIDTH, GUI_HEIGHT)
+        moderator = DisplayModerator(root, GUI_WIDTH, GUI_HEIGHT, seed=seed, cache=cache)
 
     # Execute
     moderator.execute()
 
+
+def run_batch(args: list, num_workers: int = None):
+    """
+    batch output_directory [num_meshes] [WIDTHxHEIGHT,...] [density,...] [first_seed]
+    A mesh is generated for every combination of size, density and seed,
+    the seeds being first_seed, first_seed + 1, ..., first_seed + num_meshes - 1.
+    """
+    num_meshes = int(args[3]) if len(args) >= 4 else BATCH_NUM_MESHES
+    sizes = [(GUI_WIDTH, GUI_HEIGHT)]
+    if len(args) >= 5:
+        sizes = [tuple(int(length) for length in size.split("x")) for size in args[4].split(",")]
+    densities = [BATCH_DENSITY]
+    if len(args) >= 6:
+        densities = [float(density) for density in args[5].split(",")]
+    first_seed = int(args[6]) if len(args) >= 7 else 0
+
+    generator = BatchGenerator(args[2], sizes, densities, range(first_seed, first_seed + num_meshes),
+                               num_workers=num_workers)
+    result = generator.run()
+    print(f"{result['meshes']} meshes, {result['triangles']} triangles, "
+          f"{result['bytes'] / 1e6:.1f} MB in {result['seconds']:.2f}s on {generator.num_workers} workers")
+    print(f"{result['meshes_per_second']:.2f} meshes/s, "
+          f"{result['triangles_per_second']:.0f} triangles/s")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    profile_args = [arg for arg in sys.argv if arg.startswith(PROFILE_FLAG)]
+    target_fps = get_flag_value(FPS_FLAG)
+    target_fps = float(target_fps) if target_fps is not None else None
+    num_workers = get_flag_value(WORKERS_FLAG)
+    num_workers = int(num_workers) if num_workers is not None else None
+    seed = get_flag_value(SEED_FLAG)
+    seed = int(seed) if seed is not None else None
+    cache_directory = get_flag_value(CACHE_FLAG)
+    cache = MeshCache(cache_directory) if cache_directory else None
+    if not profile_args:
+        run(args, target_fps, num_workers, seed, cache)
+        exit(0)
+
+    # Profile until the window is closed or the output is written
+    profile_path = profile_args[-1].partition("=")[2]
+    profiler = cProfile.Profile() if profile_path else None
+    try:
+        if profiler is None:
+            run(args, target_fps, num_workers, seed, cache)
+        else:
+            profiler.runcall(run, args, target_fps, num_workers, seed, cache)
+    finally:
+        if profiler is not None:
+            profiler.dump_stats(profile_path)
+            print(f"cProfile statistics: {profile_path}")
+        print(STATS.get_summary())
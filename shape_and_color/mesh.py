@@ -0,0 +1,400 @@
+"""
+Module for the array-backed triangle mesh.
+"""
+
+import struct
+import numpy as np
+from tkinter import Canvas
+from libs import Color, Drawable, Point, Triangle
+from palette import Palette
+from spatial_index import TriangleGrid
+from stats import STATS
+
+
+class TriangleMesh(Drawable):
+    """
+    Structure-of-arrays triangle mesh.
+
+    vertices  : float64 array (N, 2) holding the coordinates of each vertex.
+    triangles : int32 array (M, 3) holding the vertex indices of each triangle
+                in counterclockwise order.
+    neighbors : int32 array (M, 3). neighbors[t, i] is the triangle on the other
+                side of the side opposite to vertex i of triangle t, or -1 when
+                that side is on the boundary.
+    color_indices : int32 array (M,) holding the palette index of the color
+                of each triangle. The array is updated in place, so it can be
+                shared with a simulation.
+    adjacency : (indptr, indices) compressed sparse row form of the neighbors.
+                The triangles adjacent to t are indices[indptr[t]:indptr[t + 1]].
+    vertex_triangles : int32 array (N,) holding the first triangle using each
+                vertex, or -1 for a vertex used by no triangle.
+    spatial_index : "TriangleGrid" used by "locate" and "locate_many".
+
+    The adjacency, the vertex triangles and the spatial index are built on
+    first use. When the vertices or the triangles are changed in place,
+    "invalidate" drops them and increments "geometry_version", by which
+    renderers notice that the triangles have to be redrawn.
+    """
+
+    """
+    Binary file of "save" and "load"
+     -header   : FILE_HEADER, i.e. FILE_MAGIC, FILE_VERSION, a reserved field
+                 and the numbers of vertices, triangles, adjacency indices and
+                 palette colors.
+     -sections : The arrays of FILE_SECTIONS in that order, in little-endian
+                 and each one starting at a multiple of FILE_ALIGNMENT bytes,
+                 so that they can be used straight from a memory map.
+    """
+    FILE_MAGIC = b"SACMESH\0"
+    FILE_VERSION = 1
+    FILE_HEADER = struct.Struct("<8sIIqqqq")
+    FILE_ALIGNMENT = 64
+    FILE_SECTIONS = (
+        ("vertices", "<f8", 2),
+        ("triangles", "<i4", 3),
+        ("neighbors", "<i4", 3),
+        ("adjacency_indptr", "<i8", 1),
+        ("adjacency_indices", "<i4", 1),
+        ("color_indices", "<i4", 1),
+        ("palette", "u1", 3),
+    )
+
+    __vertices: np.ndarray
+    __triangles: np.ndarray
+    __neighbors: np.ndarray
+    __palette: Palette
+    __color_indices: np.ndarray
+    __adjacency: tuple
+    __vertex_triangles: np.ndarray
+    __spatial_index: TriangleGrid
+    __geometry_version: int
+    # Arrays with room to grow that the arrays above are views of, after "resize"
+    __buffers: dict
+
+    @property
+    def vertices(self):
+        return self.__vertices
+
+    @property
+    def triangles(self):
+        return self.__triangles
+
+    @property
+    def neighbors(self):
+        return self.__neighbors
+
+    @property
+    def palette(self):
+        return self.__palette
+
+    @property
+    def color_indices(self):
+        return self.__color_indices
+
+    @property
+    def colors(self) -> list:
+        """ The color of each triangle. It is built on each call, prefer "color_indices". """
+        palette_colors = self.__palette.colors
+        return [palette_colors[index] for index in self.__color_indices.tolist()]
+
+    @property
+    def adjacency(self):
+        if self.__adjacency is None:
+            with STATS.phase("adjacency"):
+                self.__adjacency = self.compute_adjacency(self.__neighbors)
+        return self.__adjacency
+
+    @property
+    def vertex_triangles(self):
+        if self.__vertex_triangles is None:
+            vertex_triangles = np.full(len(self.__vertices), len(self.__triangles), dtype=np.int32)
+            np.minimum.at(vertex_triangles, self.__triangles.ravel(),
+                          np.repeat(np.arange(len(self.__triangles), dtype=np.int32), 3))
+            vertex_triangles[vertex_triangles == len(self.__triangles)] = -1
+            self.__vertex_triangles = vertex_triangles
+        return self.__vertex_triangles
+
+    @property
+    def spatial_index(self):
+        if self.__spatial_index is None:
+            with STATS.phase("spatial_index"):
+                self.__spatial_index = TriangleGrid(self.__vertices, self.__triangles)
+        return self.__spatial_index
+
+    @property
+    def geometry_version(self):
+        return self.__geometry_version
+
+    @property
+    def num_vertices(self):
+        return len(self.__vertices)
+
+    @property
+    def num_triangles(self):
+        return len(self.__triangles)
+
+    def __init__(self, vertices, triangles, neighbors=None, colors: list = None,
+                 palette: Palette = None, color_indices=None, adjacency: tuple = None):
+        """
+        The colors are given either as "color_indices" into "palette" or as
+        a list of "colors". Without them every triangle has the default color.
+        "neighbors" and "adjacency" are computed when they are not given.
+        """
+        self.__vertices = np.ascontiguousarray(vertices, dtype=np.float64).reshape(-1, 2)
+        self.__triangles = np.ascontiguousarray(triangles, dtype=np.int32).reshape(-1, 3)
+        if neighbors is None:
+            neighbors = self.compute_neighbors(self.__triangles)
+        self.__neighbors = np.ascontiguousarray(neighbors, dtype=np.int32).reshape(-1, 3)
+        if palette is None:
+            palette = Palette.get_default_palette()
+        self.__palette = palette
+        if color_indices is None:
+            if colors is None:
+                color_indices = np.full(len(self.__triangles), Palette.DEFAULT_INDEX)
+            else:
+                color_indices = [palette.get_index(color) for color in colors]
+        self.__color_indices = np.array(color_indices, dtype=np.int32).reshape(-1)
+        self.__adjacency = adjacency
+        self.__vertex_triangles = None
+        self.__spatial_index = None
+        self.__geometry_version = 0
+        self.__buffers = dict()
+
+    def make_writable(self):
+        """
+        Copy the vertices, triangles and neighbors when they are read-only,
+        e.g. memory-mapped by "load", so that they can be changed in place.
+        """
+        if not self.__vertices.flags.writeable:
+            self.__vertices = self.__vertices.copy()
+        if not self.__triangles.flags.writeable:
+            self.__triangles = self.__triangles.copy()
+        if not self.__neighbors.flags.writeable:
+            self.__neighbors = self.__neighbors.copy()
+
+    def invalidate(self, triangles_changed: bool = True):
+        """
+        To be called after moving vertices in place, and with "triangles_changed"
+        after changing the triangles and neighbors, e.g. by "flip".
+        """
+        self.__spatial_index = None
+        if triangles_changed:
+            self.__adjacency = None
+            self.__vertex_triangles = None
+        self.__geometry_version += 1
+
+    def resize(self, num_vertices: int, num_triangles: int):
+        """
+        Change the numbers of vertices and triangles, keeping the first ones.
+        New vertices and triangles are zero, their neighbors -1 and their
+        color the default one. The arrays grow by half of their size at a
+        time, so adding triangles one by one is amortized constant time.
+        The arrays taken from the mesh before are no longer its arrays.
+        """
+        self.__vertices = self.__resize_array("vertices", self.__vertices, num_vertices, 0)
+        self.__triangles = self.__resize_array("triangles", self.__triangles, num_triangles, 0)
+        self.__neighbors = self.__resize_array("neighbors", self.__neighbors, num_triangles, -1)
+        self.__color_indices = self.__resize_array("color_indices", self.__color_indices, num_triangles,
+                                                   Palette.DEFAULT_INDEX)
+        self.invalidate()
+
+    def __resize_array(self, name: str, array: np.ndarray, length: int, fill) -> np.ndarray:
+        buffer = self.__buffers.get(name)
+        if buffer is None or array.base is not buffer or len(buffer) < length:
+            buffer = np.empty((max(length, len(array) * 3 // 2),) + array.shape[1:], dtype=array.dtype)
+            buffer[:min(len(array), length)] = array[:length]
+            self.__buffers[name] = buffer
+        resized = buffer[:length]
+        resized[len(array):] = fill
+        return resized
+
+    def flip(self, triangle: int, i: int) -> int:
+        """
+        Replace the side opposite to vertex i of "triangle" with the other
+        diagonal of the quadrilateral it forms with its neighbor there, which
+        must be convex. Both triangles keep their indices and colors.
+        "triangle" becomes (a, b, d) and the neighbor (a, d, c), where
+        (a, b, c) is "triangle" starting at vertex i and d is the vertex of
+        the neighbor opposite to the side.
+        Returns the index of the neighbor.
+        """
+        triangles = self.__triangles
+        neighbors = self.__neighbors
+        other = int(neighbors[triangle, i])
+        a, b, c = (int(triangles[triangle, (i + k) % 3]) for k in range(3))
+        j = neighbors[other].tolist().index(triangle)
+        d = int(triangles[other, j])
+
+        # Neighbors across c-a, a-b, b-d and d-c
+        across_ca = int(neighbors[triangle, (i + 1) % 3])
+        across_ab = int(neighbors[triangle, (i + 2) % 3])
+        across_bd = int(neighbors[other, (j + 1) % 3])
+        across_dc = int(neighbors[other, (j + 2) % 3])
+
+        triangles[triangle] = (a, b, d)
+        neighbors[triangle] = (across_bd, other, across_ab)
+        triangles[other] = (a, d, c)
+        neighbors[other] = (across_dc, across_ca, triangle)
+        if across_bd >= 0:
+            neighbors[across_bd][neighbors[across_bd] == other] = triangle
+        if across_ca >= 0:
+            neighbors[across_ca][neighbors[across_ca] == triangle] = other
+        return other
+
+    def get_adjacent_triangles(self, triangle: int) -> list:
+        """ Indices of the triangles sharing a side with "triangle". """
+        indptr, indices = self.adjacency
+        return indices[indptr[triangle]:indptr[triangle + 1]].tolist()
+
+    def locate(self, x: float, y: float) -> int:
+        """ Index of a triangle containing (x, y), or -1 when it is outside the mesh. """
+        return self.spatial_index.locate(x, y)
+
+    def locate_many(self, points) -> np.ndarray:
+        """ "locate" for every point of a float (N, 2) array, as an int32 array. """
+        return self.spatial_index.locate_many(points)
+
+    def get_triangle_coordinates(self, triangle: int) -> list:
+        """ Flat coordinate list [x1, y1, x2, y2, x3, y3] of "triangle". """
+        return self.__vertices[self.__triangles[triangle]].ravel().tolist()
+
+    def get_triangle(self, triangle: int) -> Triangle:
+        """ Build a "Triangle" object for "triangle". """
+        x1, y1, x2, y2, x3, y3 = self.get_triangle_coordinates(triangle)
+        return Triangle(Point(x1, y1), Point(x2, y2), Point(x3, y3),
+                        color=self.__palette[self.__color_indices[triangle]])
+
+    def set_color(self, triangle: int, color: Color):
+        self.__color_indices[triangle] = self.__palette.get_index(color)
+
+    def set_color_index(self, triangle: int, index: int):
+        self.__color_indices[triangle] = index
+
+    def assign_colors(self, indices, triangles=None):
+        """
+        Set the palette indices of "triangles" at once,
+        or of all the triangles when "triangles" is None.
+        """
+        if triangles is None:
+            self.__color_indices[:] = indices
+        else:
+            self.__color_indices[triangles] = indices
+
+    def assign_random_colors(self, seed: int = None, triangles=None):
+        """
+        Give every triangle, or every one of "triangles", a random color
+        other than the default one.
+        """
+        rng = np.random.default_rng(seed)
+        size = self.num_triangles if triangles is None else len(triangles)
+        self.assign_colors(self.__palette.get_random_indices(size, rng), triangles)
+
+    def draw(self, canvas: Canvas):
+        coordinates = self.__vertices[self.__triangles].reshape(-1, 6).tolist()
+        hexes = self.__palette.hexes
+        for points, index in zip(coordinates, self.__color_indices.tolist()):
+            canvas.create_polygon(points, fill=hexes[index], outline="#000")
+
+    def save(self, path: str):
+        """ Write the mesh with its adjacency, colors and palette to "path". """
+        indptr, indices = self.adjacency
+        arrays = {
+            "vertices": self.__vertices,
+            "triangles": self.__triangles,
+            "neighbors": self.__neighbors,
+            "adjacency_indptr": indptr,
+            "adjacency_indices": indices,
+            "color_indices": self.__color_indices,
+            "palette": self.__palette.rgb,
+        }
+        counts = (self.num_vertices, self.num_triangles, len(indices), len(self.__palette))
+        with open(path, "wb") as file:
+            file.write(self.FILE_HEADER.pack(self.FILE_MAGIC, self.FILE_VERSION, 0, *counts))
+            for (name, dtype, width), (offset, shape) in zip(self.FILE_SECTIONS,
+                                                             self.get_file_layout(*counts)):
+                file.write(bytes(offset - file.tell()))
+                file.write(np.ascontiguousarray(arrays[name], dtype=dtype).tobytes())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "TriangleMesh":
+        """
+        Read a mesh written by "save". With "mmap" the vertices, triangles,
+        neighbors and adjacency are read-only views of a memory map of the
+        file, so only the pages in use are read. The colors are always copied.
+        """
+        data = np.memmap(path, dtype=np.uint8, mode="r") if mmap else np.fromfile(path, dtype=np.uint8)
+        if len(data) < cls.FILE_HEADER.size:
+            raise ValueError(f"Not a mesh file: {path}")
+        magic, version, _, *counts = cls.FILE_HEADER.unpack(data[:cls.FILE_HEADER.size].tobytes())
+        if magic != cls.FILE_MAGIC:
+            raise ValueError(f"Not a mesh file: {path}")
+        if version != cls.FILE_VERSION:
+            raise ValueError(f"Unsupported mesh file version {version}: {path}")
+
+        arrays = dict()
+        for (name, dtype, width), (offset, shape) in zip(cls.FILE_SECTIONS, cls.get_file_layout(*counts)):
+            count = int(np.prod(shape))
+            if offset + count * np.dtype(dtype).itemsize > len(data):
+                raise ValueError(f"Truncated mesh file: {path}")
+            arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+
+        rgb = arrays["palette"]
+        palette = Palette.get_default_palette()
+        if not np.array_equal(rgb, palette.rgb):
+            palette = Palette([Color(*color) for color in rgb.tolist()])
+        return TriangleMesh(arrays["vertices"], arrays["triangles"], arrays["neighbors"],
+                            palette=palette, color_indices=arrays["color_indices"],
+                            adjacency=(arrays["adjacency_indptr"], arrays["adjacency_indices"]))
+
+    @classmethod
+    def get_file_layout(cls, num_vertices: int, num_triangles: int, num_adjacency_indices: int,
+                        num_colors: int) -> list:
+        """ (offset, shape) of each of FILE_SECTIONS. """
+        lengths = (num_vertices, num_triangles, num_triangles, num_triangles + 1,
+                   num_adjacency_indices, num_triangles, num_colors)
+        layout = list()
+        offset = cls.FILE_HEADER.size
+        for (name, dtype, width), length in zip(cls.FILE_SECTIONS, lengths):
+            offset = -(-offset // cls.FILE_ALIGNMENT) * cls.FILE_ALIGNMENT
+            shape = (length, width) if width > 1 else (length,)
+            layout.append((offset, shape))
+            offset += length * width * np.dtype(dtype).itemsize
+        return layout
+
+    @staticmethod
+    def compute_neighbors(triangles: np.ndarray) -> np.ndarray:
+        """
+        Compute the neighbor array of "triangles" in one pass over their sides.
+
+        Side 3 * t + i is the side opposite to vertex i of triangle t, and it is
+        keyed by its sorted vertex pair. Sorting the keys puts the two triangles
+        owning the same side next to each other, and they are linked at once.
+        """
+        triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        neighbors = np.full(len(triangles) * 3, -1, dtype=np.int32)
+        if len(triangles) == 0:
+            return neighbors.reshape(-1, 3)
+
+        v1 = triangles[:, [1, 2, 0]].ravel()
+        v2 = triangles[:, [2, 0, 1]].ravel()
+        keys = np.minimum(v1, v2) * (int(triangles.max()) + 1) + np.maximum(v1, v2)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        shared = np.flatnonzero(sorted_keys[1:] == sorted_keys[:-1])
+
+        side1 = order[shared]
+        side2 = order[shared + 1]
+        neighbors[side1] = side2 // 3
+        neighbors[side2] = side1 // 3
+        return neighbors.reshape(-1, 3)
+
+    @staticmethod
+    def compute_adjacency(neighbors: np.ndarray) -> tuple:
+        """
+        Compress the neighbor array into (indptr, indices) without the
+        missing neighbors.
+        """
+        exists = neighbors >= 0
+        indptr = np.zeros(len(neighbors) + 1, dtype=np.int64)
+        np.cumsum(exists.sum(axis=1), out=indptr[1:])
+        return indptr, neighbors[exists]
@@ -0,0 +1,70 @@
+"""
+Module for keeping triangulated meshes on disk.
+"""
+
+import os
+from delaunay_triangles import DelaunayTriangles
+from stats import STATS
+
+
+class MeshCache:
+    """
+    Directory of meshes saved by "TriangleMesh.save", one file per
+    (width, height, density, seed).
+
+    The points of a seed are always the same, so a mesh found here is the one
+    a triangulation would build, and loading it memory-maps the file instead.
+    The files written by "BatchGenerator" have the same names, so a batch
+    output directory can be used as a cache.
+    """
+
+    FILE_EXTENSION = ".mesh"
+
+    __directory: str
+
+    @property
+    def directory(self):
+        return self.__directory
+
+    def __init__(self, directory: str):
+        self.__directory = directory
+
+    def get_path(self, width: int, height: int, density: float, seed: int) -> str:
+        return os.path.join(self.__directory, self.get_file_name(width, height, density, seed))
+
+    def load(self, delaunay_triangles: DelaunayTriangles, density: float, seed: int) -> bool:
+        """
+        Load the mesh of "delaunay_triangles" from the cache.
+        Returns False when it is missing or unreadable.
+        """
+        path = self.get_path(delaunay_triangles.width, delaunay_triangles.height, density, seed)
+        if not os.path.exists(path):
+            STATS.count("mesh_cache_misses")
+            return False
+        try:
+            with STATS.phase("mesh_load"):
+                delaunay_triangles.load(path)
+        except (OSError, ValueError):
+            STATS.count("mesh_cache_misses")
+            return False
+        STATS.count("mesh_cache_hits")
+        return True
+
+    def save(self, delaunay_triangles: DelaunayTriangles, density: float, seed: int):
+        """
+        Store the mesh of "delaunay_triangles". The file is written under
+        a temporary name and then renamed, so readers never see half of it.
+        """
+        os.makedirs(self.__directory, exist_ok=True)
+        path = self.get_path(delaunay_triangles.width, delaunay_triangles.height, density, seed)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            delaunay_triangles.save(temporary_path)
+            os.replace(temporary_path, path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    @staticmethod
+    def get_file_name(width: int, height: int, density: float, seed: int) -> str:
+        return f"mesh_{width}x{height}_{density:.9g}_{seed}{MeshCache.FILE_EXTENSION}"
@@ -1,8 +1,16 @@
 import random
 from abc import ABCMeta, abstractmethod
 from tkinter import Frame, Canvas, Tk
+from batch import BatchGenerator
 from delaunay_triangles import DelaunayTriangles
-from libs import Color, DEFAULT_COLOR, Point
+from kinetic import KineticMesh
+from libs import Point
+from mesh_cache import MeshCache
+from recorders import FrameRecorder
+from renderers import Renderer, CanvasRenderer
+from scheduler import FrameScheduler
+from simulation import MeshSimulation, IncreaseRule, MoveRule
+from stats import STATS
 
 
 class Moderator(Frame, metaclass=ABCMeta):
@@ -13,28 +21,56 @@ class Moderator(Frame, metaclass=ABCMeta):
     width: int
     height: int
     canvas: Canvas
+    renderer: Renderer
     delaunay_triangles: DelaunayTriangles
+    seed: int
+    cache: MeshCache
 
     def __init__(self, master: Tk, width: int, height: int
-                 , num_points_adjuster: int = num_points_adjuster):
-        super().__init__(master, width=width, height=height)
+                 , num_points_adjuster: int = num_points_adjuster, seed: int = None
+                 , renderer: Renderer = None, cache: MeshCache = None):
+        """
+        Without "renderer" the mesh is drawn on a Tk canvas in "master".
+        With "renderer" no widget is created and "master" may be None.
+        With "cache" and "seed" the mesh is loaded from "cache" when it is
+        there, and stored in it after the triangulation otherwise.
+        """
+        if renderer is None:
+            super().__init__(master, width=width, height=height)
         self.master = master
         self.width = width
         self.height = height
         self.num_points_adjuster = num_points_adjuster
-        self.pack()
-        self.initialize_widgets()
+        self.seed = seed
+        self.cache = cache
+        if renderer is None:
+            self.pack()
+            self.initialize_widgets()
+        else:
+            self.renderer = renderer
         self.create_delaunay_triangles()
 
     def initialize_widgets(self):
         self.canvas = Canvas(self, width=self.width, height=self.height)
         self.canvas.pack()
+        self.renderer = CanvasRenderer(self.canvas)
 
     def create_delaunay_triangles(self):
-        self.delaunay_triangles = DelaunayTriangles(self.width, self.height)
-        num_points = int(self.width * self.height / self.num_points_adjuster)
-        points = DelaunayTriangles.create_points_randomly(self.width, self.height, num_points)
-        self.delaunay_triangles.triangulation(points)
+        # Built as "BatchGenerator.generate_mesh" with the density of main.py, so that
+        # a batch output directory is a cache holding the very meshes built here
+        self.delaunay_triangles = DelaunayTriangles(self.width, self.height,
+                                                    engine=BatchGenerator.DEFAULT_ENGINE)
+        density = 1 / self.num_points_adjuster
+        use_cache = self.cache is not None and self.seed is not None
+        if use_cache and self.cache.load(self.delaunay_triangles, density, self.seed):
+            return
+
+        with STATS.phase("create_points"):
+            points = DelaunayTriangles.create_points_poisson_disk(self.width, self.height, density,
+                                                                  seed=self.seed)
+        self.delaunay_triangles.triangulation(points, seed=self.seed)
+        if use_cache:
+            self.cache.save(self.delaunay_triangles, density, self.seed)
 
     @abstractmethod
     def execute(self):
@@ -43,133 +79,157 @@ class Moderator(Frame, metaclass=ABCMeta):
 
 class DisplayModerator(Moderator):
     def __init__(self, master: Tk, width: int, height: int
-                 , num_points_adjuster: int = Moderator.num_points_adjuster):
-        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster)
+                 , num_points_adjuster: int = Moderator.num_points_adjuster
+                 , seed: int = None, renderer: Renderer = None, cache: MeshCache = None):
+        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster
+                         , seed=seed, renderer=renderer, cache=cache)
 
     def execute(self):
         # Fill color in each triangles
-        colors = Color.get_all_colors()
-        triangles = self.delaunay_triangles.triangles
-        for triangle in triangles:
-            color = random.choice(colors)
-            triangle.color = color
+        mesh = self.delaunay_triangles.mesh
+        mesh.assign_random_colors(seed=random.getrandbits(32))
+
+        self.renderer.draw(self.delaunay_triangles.mesh)
+        if isinstance(self.renderer, CanvasRenderer):
+            # Left click adds a point and right click removes the nearest one
+            self.canvas.bind("<Button-1>", lambda event: self.edit(Point(event.x, event.y), True))
+            self.canvas.bind("<Button-3>", lambda event: self.edit(Point(event.x, event.y), False))
+        if self.master is not None:
+            self.master.mainloop()
+
+    def edit(self, point: Point, insert: bool):
+        """ Add or remove a point and color only the triangles it created. """
+        if not (0 <= point.x <= self.width and 0 <= point.y <= self.height):
+            return
+        if insert:
+            self.delaunay_triangles.insert_point(point)
+        else:
+            self.delaunay_triangles.remove_point(point)
+        mesh = self.delaunay_triangles.mesh
+        mesh.assign_random_colors(seed=random.getrandbits(32),
+                                  triangles=self.delaunay_triangles.created_triangles)
+        self.renderer.update(mesh)
+
+
+class AnimationModerator(Moderator):
+    simulation: MeshSimulation
+    scheduler: FrameScheduler
+    # One step of the rules per second
+    target_fps: float = 1
 
-        self.delaunay_triangles.draw(self.canvas)
-        self.master.mainloop()
-
-
-class IncreaseAnimationModerator(Moderator):
     def __init__(self, master: Tk, width: int, height: int
-                 , num_points_adjuster: int = Moderator.num_points_adjuster * 2):
-        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster)
+                 , num_points_adjuster: int = Moderator.num_points_adjuster
+                 , seed: int = None, renderer: Renderer = None, target_fps: float = None
+                 , cache: MeshCache = None):
+        if target_fps is not None:
+            self.target_fps = target_fps
+        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster
+                         , seed=seed, renderer=renderer, cache=cache)
 
-    triangle_queue: dict
-    update_time_ms: int = 1000
+    @abstractmethod
+    def create_simulation(self) -> MeshSimulation:
+        pass
 
     def execute(self):
-        self.delaunay_triangles.create_triangle_adjacency_map()
+        self.simulation = self.create_simulation()
+
+        # Draw and update
+        self.renderer.draw(self.delaunay_triangles.mesh)
+        self.scheduler = FrameScheduler(self, self.target_fps, self.simulation.step, self.render)
+        self.scheduler.start()
+        self.master.mainloop()
 
-        # Get all colors
-        colors = Color.get_all_colors()
+    def render(self):
+        self.renderer.update(self.delaunay_triangles.mesh)
+
+    def record(self, recorder: FrameRecorder, num_frames: int):
+        """
+        Step the simulation as fast as possible and write "num_frames" frames,
+        stopping early when the simulation is finished.
+        The renderer has to have an "image", e.g. "RasterRenderer".
+        """
+        mesh = self.delaunay_triangles.mesh
+        self.simulation = self.create_simulation()
+        self.renderer.draw(mesh)
+        recorder.write(self.renderer.image)
+        for frame in range(1, num_frames):
+            if self.simulation.is_finished:
+                break
+            with STATS.phase("tick"):
+                self.simulation.step()
+                self.renderer.update(mesh)
+            STATS.count(STATS.FRAMES)
+            recorder.write(self.renderer.image)
+
+
+class IncreaseAnimationModerator(AnimationModerator):
+    def __init__(self, master: Tk, width: int, height: int
+                 , num_points_adjuster: int = Moderator.num_points_adjuster * 2
+                 , seed: int = None, renderer: Renderer = None, target_fps: float = None
+                 , cache: MeshCache = None):
+        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster
+                         , seed=seed, renderer=renderer, target_fps=target_fps, cache=cache)
 
+    def create_simulation(self) -> MeshSimulation:
         # Find triangle with lowest coordinate
+        mesh = self.delaunay_triangles.mesh
         lowest_triangle = self.delaunay_triangles.find_triangle_has_in_edge(Point(1, 1))
-        lowest_triangle.color = random.choice(colors)
 
-        # Initialize queue
-        self.triangle_queue = dict()
-        self.triangle_queue[lowest_triangle] = [None]
+        # Start a wave from it
+        simulation = MeshSimulation(mesh, IncreaseRule([lowest_triangle]),
+                                    seed=random.getrandbits(32))
+        palette = simulation.palette
+        simulation.set_color_index(lowest_triangle, random.randrange(1, len(palette)))
+        return simulation
 
-        # Draw and update
-        self.delaunay_triangles.draw(self.canvas)
-        self.after(self.update_time_ms, self.update)
-        self.master.mainloop()
 
-    def update(self):
-        new_queue = dict()
-        old_queue = self.triangle_queue
-
-        for current_triangle, previous_triangles in old_queue.items():
-            adjacent_triangles = self.delaunay_triangles \
-                .get_adjacent_triangles(current_triangle)
-            for adjacent_triangle in adjacent_triangles:
-                if adjacent_triangle in previous_triangles:
-                    continue
-                adjacent_triangle.color = DEFAULT_COLOR \
-                    if adjacent_triangle.color == current_triangle.color \
-                    else current_triangle.color
-                if adjacent_triangle in new_queue:
-                    new_queue[adjacent_triangle].append(current_triangle)
-                else:
-                    new_queue[adjacent_triangle] = [current_triangle]
-            current_triangle.color = DEFAULT_COLOR
-
-        tmp_queue = dict()
-        for triangle, previous_triangles in new_queue.items():
-            if triangle.color != DEFAULT_COLOR:
-                tmp_queue[triangle] = previous_triangles
-
-        new_queue = tmp_queue
-        self.triangle_queue = new_queue
-        self.delaunay_triangles.draw(self.canvas)
-        self.after(self.update_time_ms, self.update)
-
-
-class MoveAnimationModerator(Moderator):
+class MoveAnimationModerator(AnimationModerator):
     num_move_points: int
 
     def __init__(self, master: Tk, width: int, height: int
                  , num_points_adjuster: int = Moderator.num_points_adjuster * 2
-                 , num_move_triangles: int = 1):
+                 , num_move_triangles: int = 1, seed: int = None, renderer: Renderer = None
+                 , target_fps: float = None, cache: MeshCache = None):
         self.num_move_triangles = num_move_triangles
-        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster)
-
-    triangle_queue: dict
-    update_time_ms: int = 1000
+        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster
+                         , seed=seed, renderer=renderer, target_fps=target_fps, cache=cache)
+
+    def create_simulation(self) -> MeshSimulation:
+        # Choose triangle randomly
+        mesh = self.delaunay_triangles.mesh
+        start_triangles = [random.randrange(mesh.num_triangles)
+                           for i in range(self.num_move_triangles)]
+
+        # Start a walker from each of them
+        simulation = MeshSimulation(mesh, MoveRule(start_triangles),
+                                    seed=random.getrandbits(32))
+        palette = simulation.palette
+        for triangle in start_triangles:
+            simulation.set_color_index(triangle, random.randrange(1, len(palette)))
+        return simulation
+
+
+class DriftAnimationModerator(AnimationModerator):
+    """
+    The vertices drift and the mesh is kept Delaunay by a "KineticMesh",
+    which is stepped in place of a simulation. The triangles keep random colors.
+    """
+    # Smooth motion
+    target_fps: float = 30
+    # Pixels per second
+    speed: float = 20
 
-    def execute(self):
-        self.delaunay_triangles.create_triangle_adjacency_map()
-
-        # Get all colors
-        colors = Color.get_all_colors()
-
-        # Initialize queue
-        self.triangle_queue = dict()
-
-        # Choose triangle randomly and enqueue
-        triangles = self.delaunay_triangles.triangles
-        for i in range(self.num_move_triangles):
-            triangle = random.choice(triangles)
-            triangle.color = random.choice(colors)
-            self.triangle_queue[triangle] = None
-
-        # Draw and update
-        self.delaunay_triangles.draw(self.canvas)
-        self.after(self.update_time_ms, self.update)
-        self.master.mainloop()
-
-    def update(self):
-        new_queue = dict()
-        old_queue = self.triangle_queue
-
-        for current_triangle, previous in old_queue.items():
-            adjacent_triangles = list(self.delaunay_triangles \
-                                      .get_adjacent_triangles(current_triangle))
-            if previous in adjacent_triangles:
-                adjacent_triangles.remove(previous)
-
-            iterator = list(adjacent_triangles)
-            for adjacent_triangle in iterator:
-                if adjacent_triangle.color != DEFAULT_COLOR:
-                    adjacent_triangles.remove(adjacent_triangle)
-
-            if len(adjacent_triangles) == 0:
-                continue
-
-            next_move = random.choice(adjacent_triangles)
-            next_move.color = current_triangle.color
-            new_queue[next_move] = current_triangle
-
-        self.triangle_queue = new_queue
-        self.delaunay_triangles.draw(self.canvas)
-        self.after(self.update_time_ms, self.update)
+    def __init__(self, master: Tk, width: int, height: int
+                 , num_points_adjuster: int = Moderator.num_points_adjuster
+                 , speed: float = None, seed: int = None, renderer: Renderer = None
+                 , target_fps: float = None, cache: MeshCache = None):
+        if speed is not None:
+            self.speed = speed
+        super().__init__(master, width, height, num_points_adjuster=num_points_adjuster
+                         , seed=seed, renderer=renderer, target_fps=target_fps, cache=cache)
+
+    def create_simulation(self) -> KineticMesh:
+        mesh = self.delaunay_triangles.mesh
+        mesh.assign_random_colors(seed=random.getrandbits(32))
+        # One step per frame
+        return KineticMesh(mesh, self.speed, 1 / self.target_fps, seed=random.getrandbits(32))
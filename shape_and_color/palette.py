@@ -0,0 +1,102 @@
+"""
+Module for colors addressed by palette indices.
+"""
+
+import threading
+import numpy as np
+from libs import Color, DEFAULT_COLOR
+
+
+class Palette:
+    """
+    List of colors addressed by small integer indices.
+
+    The hex string and the RGB values of every color are computed once, so
+    a triangle only needs to keep an index and drawing it is a table lookup.
+
+    hexes : list of the "#rrggbb" strings, one for each index.
+    rgb   : uint8 array (K, 3) holding the RGB values of each index.
+
+    palette[DEFAULT_INDEX] is the default color.
+
+    The default palette is shared by every mesh, so colors are added under a
+    lock, and "rgb" is replaced by a new array rather than changed in place.
+    Meshes on separate threads can therefore add colors to it at once.
+    """
+
+    DEFAULT_INDEX = 0
+
+    __colors: list
+    __hexes: list
+    __rgb: np.ndarray
+    __indices: dict
+    __lock: threading.Lock
+
+    @property
+    def colors(self):
+        return self.__colors
+
+    @property
+    def hexes(self):
+        return self.__hexes
+
+    @property
+    def rgb(self):
+        return self.__rgb
+
+    def __init__(self, colors: list):
+        """ colors[DEFAULT_INDEX] becomes the default color. """
+        self.__colors = list()
+        self.__hexes = list()
+        self.__indices = dict()
+        self.__rgb = np.empty((0, 3), dtype=np.uint8)
+        self.__lock = threading.Lock()
+        self.add_colors(colors)
+
+    def __len__(self):
+        return len(self.__colors)
+
+    def __getitem__(self, index: int) -> Color:
+        return self.__colors[index]
+
+    def add_colors(self, colors: list):
+        """ Append "colors" to the palette, keeping the first index of duplicates. """
+        with self.__lock:
+            self.__add_colors(colors)
+
+    def __add_colors(self, colors: list):
+        for color in colors:
+            self.__indices.setdefault(color, len(self.__colors))
+            self.__colors.append(color)
+            self.__hexes.append(color.hex)
+        self.__rgb = np.array([(color.red, color.green, color.blue) for color in self.__colors],
+                              dtype=np.uint8).reshape(-1, 3)
+
+    def get_index(self, color: Color) -> int:
+        """ Index of "color". A color not in the palette is appended. """
+        index = self.__indices.get(color)
+        if index is not None:
+            return index
+        with self.__lock:
+            # Another thread may have appended it meanwhile
+            index = self.__indices.get(color)
+            if index is None:
+                index = len(self.__colors)
+                self.__add_colors([color])
+        return index
+
+    def get_random_indices(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """ "size" random indices of the colors other than the default one, in one draw. """
+        return rng.integers(self.DEFAULT_INDEX + 1, len(self.__colors), size=size, dtype=np.int32)
+
+    _default_palette = None
+    _default_palette_lock = threading.Lock()
+
+    @classmethod
+    def get_default_palette(cls) -> "Palette":
+        """ The default color followed by "Color.get_all_colors()". """
+        if cls._default_palette is None:
+            with cls._default_palette_lock:
+                if cls._default_palette is None:
+                    cls._default_palette = Palette([DEFAULT_COLOR] + Color.get_all_colors())
+        return cls._default_palette
@@ -0,0 +1,133 @@
+"""
+Module for writing rendered frames to an image sequence or a video.
+"""
+
+import os
+import queue
+import threading
+import cv2
+import numpy as np
+
+
+class FrameRecorder:
+    """
+    Writes frames on encoder threads behind a bounded queue.
+
+    "write" copies the frame into the queue and returns at once unless the
+    queue is full, so the producer only waits when the encoders fall behind.
+    A path ending with ".png" writes a PNG sequence: a path with a "%" is used
+    as the printf pattern of the file names, otherwise the frame number is
+    appended to the file name. Any other extension writes a video with
+    cv2.VideoWriter. PNG frames are encoded on "num_workers" threads, a video
+    on one thread since its frames must be written in order.
+    """
+
+    FOURCCS = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+    QUEUE_SIZE = 16
+
+    __path: str
+    __fps: float
+    __queue: queue.Queue
+    __workers: list
+    __video_writer: cv2.VideoWriter
+    __num_frames: int
+    __error: Exception
+
+    @property
+    def path(self):
+        return self.__path
+
+    @property
+    def num_frames(self):
+        return self.__num_frames
+
+    def __init__(self, path: str, fps: float = 30, num_workers: int = None,
+                 queue_size: int = QUEUE_SIZE):
+        self.__path = path
+        self.__fps = fps
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__video_writer = None
+        self.__num_frames = 0
+        self.__error = None
+
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".png":
+            if "%" not in path:
+                root, extension = os.path.splitext(path)
+                self.__path = root + "_%05d" + extension
+            if num_workers is None:
+                num_workers = os.cpu_count() or 1
+            target = self.__write_images
+        elif extension in self.FOURCCS:
+            num_workers = 1
+            target = self.__write_video
+        else:
+            raise ValueError(f"Unsupported output format: {path}")
+
+        self.__workers = [threading.Thread(target=target, daemon=True)
+                          for i in range(max(num_workers, 1))]
+        for worker in self.__workers:
+            worker.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, frame: np.ndarray):
+        """ Queue an RGB uint8 frame (height, width, 3). """
+        if self.__error is not None:
+            raise self.__error
+        self.__queue.put((self.__num_frames, frame.copy()))
+        self.__num_frames += 1
+
+    def close(self):
+        """ Wait until all queued frames are written. """
+        for worker in self.__workers:
+            self.__queue.put(None)
+        for worker in self.__workers:
+            worker.join()
+        self.__workers = list()
+        if self.__video_writer is not None:
+            self.__video_writer.release()
+            self.__video_writer = None
+        if self.__error is not None:
+            raise self.__error
+
+    def __write_images(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+            # Keep taking frames after an error so that "write" never blocks
+            if self.__error is not None:
+                continue
+            index, frame = item
+            try:
+                path = self.__path % index
+                if not cv2.imwrite(path, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)):
+                    raise IOError(f"Could not write the image: {path}")
+            except Exception as error:
+                self.__error = error
+
+    def __write_video(self):
+        while True:
+            item = self.__queue.get()
+            if item is None:
+                return
+            if self.__error is not None:
+                continue
+            index, frame = item
+            try:
+                if self.__video_writer is None:
+                    extension = os.path.splitext(self.__path)[1].lower()
+                    fourcc = cv2.VideoWriter_fourcc(*self.FOURCCS[extension])
+                    height, width = frame.shape[:2]
+                    self.__video_writer = cv2.VideoWriter(self.__path, fourcc, self.__fps,
+                                                          (width, height))
+                    if not self.__video_writer.isOpened():
+                        raise IOError(f"Could not open the video: {self.__path}")
+                self.__video_writer.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+            except Exception as error:
+                self.__error = error
@@ -0,0 +1,300 @@
+"""
+Module for drawing a triangle mesh and keeping the drawing up to date.
+"""
+
+import cv2
+import numpy as np
+from abc import ABC, abstractmethod
+from tkinter import Canvas
+from libs import Color, DEFAULT_COLOR
+from mesh import TriangleMesh
+from stats import STATS
+
+
+class Renderer(ABC):
+    """
+    Draws a triangle mesh once and then only redraws the triangles whose
+    palette index changed, or whose vertices moved when the
+    "geometry_version" of the mesh changed.
+    """
+
+    @abstractmethod
+    def draw(self, mesh: TriangleMesh):
+        pass
+
+    @abstractmethod
+    def update(self, mesh: TriangleMesh) -> int:
+        """
+        Redraw the triangles whose color or vertices changed since the last
+        draw or update. Returns the number of redrawn triangles.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @staticmethod
+    def find_changed_triangles(color_indices: np.ndarray, drawn_indices: np.ndarray) -> np.ndarray:
+        return np.flatnonzero(color_indices != drawn_indices)
+
+    @staticmethod
+    def find_moved_triangles(coordinates: np.ndarray, drawn_coordinates: np.ndarray) -> np.ndarray:
+        return np.flatnonzero((coordinates != drawn_coordinates).any(axis=1))
+
+
+class CanvasRenderer(Renderer):
+    """
+    Draws a triangle mesh on a Tk canvas once and then only recolors it.
+
+    The canvas item ID of each triangle is kept together with the palette index
+    it was last drawn with. An update compares the indices of the mesh with them and
+    sends the changed ones to Tk as a single Tcl script, so a frame costs one
+    round-trip however many triangles change, and no items are created.
+    The coordinates are kept as well, and when the geometry of the mesh has
+    changed, the triangles that moved or were flipped are moved with "coords"
+    in the same script.
+    When triangles were added to or removed from the end of the mesh drawn
+    last, only their items are created or deleted.
+    """
+
+    __canvas: Canvas
+    __item_ids: list
+    __drawn_mesh: TriangleMesh
+    __drawn_indices: np.ndarray
+    __drawn_coordinates: np.ndarray
+    __drawn_version: int
+
+    @property
+    def canvas(self):
+        return self.__canvas
+
+    @property
+    def item_ids(self):
+        return self.__item_ids
+
+    def __init__(self, canvas: Canvas):
+        self.__canvas = canvas
+        self.__item_ids = list()
+        self.__drawn_mesh = None
+        self.__drawn_indices = np.empty(0, dtype=np.int32)
+        self.__drawn_coordinates = np.empty((0, 6))
+        self.__drawn_version = -1
+
+    def draw(self, mesh: TriangleMesh):
+        """ Replace the items on the canvas with one polygon per triangle of "mesh". """
+        with STATS.phase("draw"):
+            self.clear()
+            coordinates = mesh.vertices[mesh.triangles].reshape(-1, 6)
+            hexes = mesh.palette.hexes
+            self.__item_ids = [self.__canvas.create_polygon(points, fill=hexes[index], outline="#000")
+                               for points, index in zip(coordinates.tolist(), mesh.color_indices.tolist())]
+            self.__drawn_mesh = mesh
+            self.__drawn_indices = mesh.color_indices.copy()
+            self.__drawn_coordinates = coordinates
+            self.__drawn_version = mesh.geometry_version
+        STATS.count("canvas_items_created", len(self.__item_ids))
+
+    def update(self, mesh: TriangleMesh) -> int:
+        if mesh is not self.__drawn_mesh:
+            self.draw(mesh)
+            return mesh.num_triangles
+        if len(self.__item_ids) != mesh.num_triangles:
+            self.__resize(mesh)
+
+        with STATS.phase("render_update"):
+            changed = self.find_changed_triangles(mesh.color_indices, self.__drawn_indices)
+            moved = np.empty(0, dtype=np.int64)
+            if mesh.geometry_version != self.__drawn_version:
+                coordinates = mesh.vertices[mesh.triangles].reshape(-1, 6)
+                moved = self.find_moved_triangles(coordinates, self.__drawn_coordinates)
+                self.__drawn_coordinates[moved] = coordinates[moved]
+                self.__drawn_version = mesh.geometry_version
+            if len(changed) == 0 and len(moved) == 0:
+                return 0
+
+            indices = mesh.color_indices[changed]
+            self.__drawn_indices[changed] = indices
+            hexes = mesh.palette.hexes
+            item_ids = self.__item_ids
+            path = str(self.__canvas)
+            script = [f"{path} itemconfigure {item_ids[triangle]} -fill {hexes[index]}"
+                      for triangle, index in zip(changed.tolist(), indices.tolist())]
+            script.extend(f"{path} coords {item_ids[triangle]} {' '.join(map(str, points))}"
+                          for triangle, points in zip(moved.tolist(),
+                                                      self.__drawn_coordinates[moved].tolist()))
+            self.__canvas.tk.eval("\n".join(script))
+            num_touched = len(np.union1d(changed, moved))
+        STATS.count("canvas_items_touched", num_touched, per_frame=True)
+        return num_touched
+
+    def __resize(self, mesh: TriangleMesh):
+        """
+        Delete the items past the last triangle of "mesh", or create the items
+        of the triangles added at its end, with the colors they have now.
+        """
+        num_items = len(self.__item_ids)
+        if mesh.num_triangles < num_items:
+            self.__canvas.delete(*self.__item_ids[mesh.num_triangles:])
+            del self.__item_ids[mesh.num_triangles:]
+            self.__drawn_indices = self.__drawn_indices[:mesh.num_triangles]
+            self.__drawn_coordinates = self.__drawn_coordinates[:mesh.num_triangles]
+            return
+
+        coordinates = mesh.vertices[mesh.triangles[num_items:]].reshape(-1, 6)
+        hexes = mesh.palette.hexes
+        self.__item_ids.extend(self.__canvas.create_polygon(points, fill=hexes[index], outline="#000")
+                               for points, index in zip(coordinates.tolist(),
+                                                        mesh.color_indices[num_items:].tolist()))
+        self.__drawn_indices = np.concatenate((self.__drawn_indices, mesh.color_indices[num_items:]))
+        self.__drawn_coordinates = np.concatenate((self.__drawn_coordinates, coordinates))
+        STATS.count("canvas_items_created", len(coordinates))
+
+    def clear(self):
+        """ Delete the items created by this renderer. """
+        if self.__item_ids:
+            self.__canvas.delete(*self.__item_ids)
+        self.__item_ids = list()
+        self.__drawn_mesh = None
+        self.__drawn_indices = np.empty(0, dtype=np.int32)
+        self.__drawn_coordinates = np.empty((0, 6))
+        self.__drawn_version = -1
+
+
+class RasterRenderer(Renderer):
+    """
+    Rasterizes a triangle mesh into a NumPy RGB image without a display.
+
+    The triangles are grouped by palette index and each group is filled with one
+    OpenCV call, then all outlines are drawn with one more call.
+    Coordinates are passed in fixed point with SHIFT fractional bits.
+    A triangle moving uncovers pixels of other triangles, so the whole
+    image is drawn again when the geometry of the mesh has changed.
+
+    It also has "create_polygon" and "create_oval" with the arguments of a
+    Tk canvas, so any "Drawable" can draw itself on it.
+    """
+
+    SHIFT = 4
+
+    __width: int
+    __height: int
+    __anti_aliased: bool
+    __line_type: int
+    __background: tuple
+    __outline: tuple
+    __image: np.ndarray
+    __drawn_indices: np.ndarray
+    __drawn_version: int
+
+    @property
+    def width(self):
+        return self.__width
+
+    @property
+    def height(self):
+        return self.__height
+
+    @property
+    def anti_aliased(self):
+        return self.__anti_aliased
+
+    @property
+    def image(self):
+        """ uint8 array (height, width, 3) in RGB order. """
+        return self.__image
+
+    def __init__(self, width: int, height: int, anti_aliased: bool = False,
+                 background: Color = DEFAULT_COLOR, outline: Color = Color(0, 0, 0)):
+        self.__width = width
+        self.__height = height
+        self.__anti_aliased = anti_aliased
+        self.__line_type = cv2.LINE_AA if anti_aliased else cv2.LINE_8
+        self.__background = (background.red, background.green, background.blue)
+        self.__outline = (outline.red, outline.green, outline.blue)
+        self.__image = np.empty((height, width, 3), dtype=np.uint8)
+        self.__drawn_indices = np.empty(0, dtype=np.int32)
+        self.__drawn_version = -1
+        self.clear()
+
+    def draw(self, mesh: TriangleMesh):
+        with STATS.phase("draw"):
+            self.clear()
+            self.__draw_triangles(mesh, np.arange(mesh.num_triangles))
+            self.__drawn_indices = mesh.color_indices.copy()
+            self.__drawn_version = mesh.geometry_version
+        STATS.count("triangles_rasterized", mesh.num_triangles)
+
+    def update(self, mesh: TriangleMesh) -> int:
+        if len(self.__drawn_indices) != mesh.num_triangles \
+                or mesh.geometry_version != self.__drawn_version:
+            self.draw(mesh)
+            return mesh.num_triangles
+
+        with STATS.phase("render_update"):
+            changed = self.find_changed_triangles(mesh.color_indices, self.__drawn_indices)
+            if len(changed) > 0:
+                self.__draw_triangles(mesh, changed)
+                self.__drawn_indices[changed] = mesh.color_indices[changed]
+        STATS.count("triangles_redrawn", len(changed), per_frame=True)
+        return len(changed)
+
+    def clear(self):
+        self.__image[:] = self.__background
+        self.__drawn_indices = np.empty(0, dtype=np.int32)
+        self.__drawn_version = -1
+
+    def save(self, path: str):
+        """ Write the image to "path". The format follows the extension, e.g. PNG. """
+        if not cv2.imwrite(path, cv2.cvtColor(self.__image, cv2.COLOR_RGB2BGR)):
+            raise IOError(f"Could not write the image: {path}")
+
+    def create_polygon(self, *coordinates, fill: str = "", outline: str = ""):
+        polygon = self.__to_fixed_point(np.asarray(coordinates, dtype=np.float64).reshape(1, -1, 2))
+        if fill:
+            cv2.fillPoly(self.__image, polygon, self.parse_hex(fill),
+                         self.__line_type, self.SHIFT)
+        if outline:
+            cv2.polylines(self.__image, polygon, True, self.parse_hex(outline), 1,
+                          self.__line_type, self.SHIFT)
+
+    def create_oval(self, x1: float, y1: float, x2: float, y2: float,
+                    fill: str = "", outline: str = ""):
+        center = self.__to_fixed_point(np.array([(x1 + x2) / 2, (y1 + y2) / 2]))
+        axes = self.__to_fixed_point(np.array([abs(x2 - x1) / 2, abs(y2 - y1) / 2]))
+        if fill:
+            cv2.ellipse(self.__image, center.tolist(), axes.tolist(), 0, 0, 360,
+                        self.parse_hex(fill), -1, self.__line_type, self.SHIFT)
+        if outline:
+            cv2.ellipse(self.__image, center.tolist(), axes.tolist(), 0, 0, 360,
+                        self.parse_hex(outline), 1, self.__line_type, self.SHIFT)
+
+    def __to_fixed_point(self, coordinates: np.ndarray) -> np.ndarray:
+        return np.rint(coordinates * (1 << self.SHIFT)).astype(np.int32)
+
+    def __draw_triangles(self, mesh: TriangleMesh, triangles: np.ndarray):
+        """ Fill "triangles" one palette index at a time, then outline them. """
+        polygons = self.__to_fixed_point(mesh.vertices[mesh.triangles[triangles]])
+
+        # Sort the triangles by index and cut them where the index changes
+        indices = mesh.color_indices[triangles]
+        order = np.argsort(indices, kind="stable")
+        sorted_indices = indices[order]
+        group_starts = np.flatnonzero(np.r_[True, sorted_indices[1:] != sorted_indices[:-1]])
+        rgb = mesh.palette.rgb.tolist()
+        for index, positions in zip(sorted_indices[group_starts].tolist(),
+                                    np.split(order, group_starts[1:])):
+            cv2.fillPoly(self.__image, polygons[positions], rgb[index], self.__line_type, self.SHIFT)
+
+        cv2.polylines(self.__image, polygons, True, self.__outline, 1,
+                      self.__line_type, self.SHIFT)
+
+    @staticmethod
+    def parse_hex(color_hex: str) -> tuple:
+        """ Convert "#rgb" or "#rrggbb" into an (r, g, b) tuple. """
+        digits = color_hex.lstrip("#")
+        if len(digits) == 3:
+            digits = "".join(digit * 2 for digit in digits)
+        if len(digits) != 6:
+            raise ValueError(f"Unsupported color: {color_hex}")
+        return tuple(int(digits[i:i + 2], 16) for i in range(0, 6, 2))
@@ -0,0 +1,129 @@
+"""
+Module for scheduling animation frames on the Tk event loop.
+"""
+
+import math
+import time
+from tkinter import Misc
+from stats import STATS
+
+
+class FrameScheduler:
+    """
+    Calls "step" and "render" at a target frame rate with "after".
+
+    Frames are due at fixed times from the start, so the time taken by a tick
+    does not push the following frames back. When a tick makes the scheduler
+    miss frames, the simulation catches up by running one step per missed frame
+    (at most "max_steps_per_frame") before rendering once, and the frames that
+    were not rendered are counted as dropped.
+    """
+
+    """
+    Weight of the last tick in the moving average of the tick cost.
+    """
+    COST_SMOOTHING = 0.1
+
+    __widget: Misc
+    __step: callable
+    __render: callable
+    __frame_interval: float
+    __max_steps_per_frame: int
+    __next_frame_time: float
+    __after_id: str
+    __num_frames: int
+    __num_steps: int
+    __num_dropped_frames: int
+    __average_cost: float
+
+    @property
+    def target_fps(self):
+        return 1 / self.__frame_interval
+
+    @property
+    def frame_interval(self):
+        return self.__frame_interval
+
+    @property
+    def num_frames(self):
+        return self.__num_frames
+
+    @property
+    def num_steps(self):
+        return self.__num_steps
+
+    @property
+    def num_dropped_frames(self):
+        return self.__num_dropped_frames
+
+    @property
+    def average_cost(self):
+        """ Moving average of the seconds taken by a tick (steps and render). """
+        return self.__average_cost
+
+    @property
+    def is_running(self):
+        return self.__after_id is not None
+
+    def __init__(self, widget: Misc, target_fps: float, step: callable, render: callable,
+                 max_steps_per_frame: int = 4):
+        if target_fps <= 0:
+            raise ValueError(f"Target FPS must be positive: {target_fps}")
+        self.__widget = widget
+        self.__step = step
+        self.__render = render
+        self.__frame_interval = 1 / target_fps
+        self.__max_steps_per_frame = max(max_steps_per_frame, 1)
+        self.__next_frame_time = 0.0
+        self.__after_id = None
+        self.__num_frames = 0
+        self.__num_steps = 0
+        self.__num_dropped_frames = 0
+        self.__average_cost = 0.0
+
+    def start(self):
+        """ Schedule the first frame one interval from now. """
+        self.stop()
+        self.__next_frame_time = time.perf_counter() + self.__frame_interval
+        self.__schedule()
+
+    def stop(self):
+        if self.__after_id is not None:
+            self.__widget.after_cancel(self.__after_id)
+            self.__after_id = None
+
+    def tick(self):
+        """ Run the steps due by now and render one frame. """
+        begin = time.perf_counter()
+
+        # Frames whose time has passed, this one included
+        due_frames = 1 + max(int(math.floor((begin - self.__next_frame_time) / self.__frame_interval)), 0)
+        dropped_frames = due_frames - 1
+        num_steps = min(due_frames, self.__max_steps_per_frame)
+
+        with STATS.phase("tick"):
+            for i in range(num_steps):
+                self.__step()
+            self.__render()
+        cost = time.perf_counter() - begin
+
+        self.__num_frames += 1
+        self.__num_steps += num_steps
+        self.__num_dropped_frames += dropped_frames
+        if self.__num_frames == 1:
+            self.__average_cost = cost
+        else:
+            self.__average_cost += (cost - self.__average_cost) * self.COST_SMOOTHING
+        self.__next_frame_time += due_frames * self.__frame_interval
+        STATS.count(STATS.FRAMES)
+        STATS.count("frames_dropped", dropped_frames, per_frame=True)
+        STATS.count("simulation_steps", num_steps, per_frame=True)
+
+    def __on_frame(self):
+        self.__after_id = None
+        self.tick()
+        self.__schedule()
+
+    def __schedule(self):
+        delay = self.__next_frame_time - time.perf_counter()
+        self.__after_id = self.__widget.after(max(int(round(delay * 1000)), 1), self.__on_frame)
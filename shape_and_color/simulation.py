@@ -0,0 +1,222 @@
+"""
+Module for running rules over the triangles of a mesh.
+"""
+
+import numpy as np
+from abc import ABC, abstractmethod
+from mesh import TriangleMesh
+from palette import Palette
+from stats import STATS
+
+
+class MeshSimulation:
+    """
+    Applies a rule to a triangle mesh one tick at a time.
+
+    The rule works on the palette index array of the mesh in place, and
+    palette[DEFAULT_COLOR_INDEX] is the default color.
+    """
+
+    DEFAULT_COLOR_INDEX = Palette.DEFAULT_INDEX
+
+    __mesh: TriangleMesh
+    __neighbors: np.ndarray
+    __rule: "Rule"
+    __rng: np.random.Generator
+    __num_ticks: int
+
+    @property
+    def mesh(self):
+        return self.__mesh
+
+    @property
+    def neighbors(self):
+        return self.__neighbors
+
+    @property
+    def palette(self):
+        return self.__mesh.palette
+
+    @property
+    def color_indices(self):
+        return self.__mesh.color_indices
+
+    @property
+    def rule(self):
+        return self.__rule
+
+    @property
+    def rng(self):
+        return self.__rng
+
+    @property
+    def num_ticks(self):
+        return self.__num_ticks
+
+    @property
+    def is_finished(self):
+        return len(self.__rule.frontier) == 0
+
+    def __init__(self, mesh: TriangleMesh, rule: "Rule", seed: int = None):
+        self.__mesh = mesh
+        self.__neighbors = mesh.neighbors
+        self.__rule = rule
+        self.__rng = np.random.default_rng(seed)
+        self.__num_ticks = 0
+
+    def set_color_index(self, triangle: int, index: int):
+        self.__mesh.set_color_index(triangle, index)
+
+    def step(self) -> np.ndarray:
+        """
+        Apply the rule once. Returns the triangles whose color changed.
+        """
+        with STATS.phase("simulation_step"):
+            color_indices = self.__mesh.color_indices
+            previous_indices = color_indices.copy()
+            self.__rule.step(self)
+            self.__num_ticks += 1
+            changed = np.flatnonzero(color_indices != previous_indices)
+        STATS.count("triangles_changed", len(changed), per_frame=True)
+        return changed
+
+
+class Rule(ABC):
+    """
+    A rule updates the color indices of a simulation from its frontier,
+    the triangles that are active in the current tick.
+    """
+
+    @property
+    @abstractmethod
+    def frontier(self) -> np.ndarray:
+        pass
+
+    @abstractmethod
+    def step(self, simulation: MeshSimulation):
+        pass
+
+
+class IncreaseRule(Rule):
+    """
+    Waves spreading from the frontier.
+
+    Every frontier triangle passes its color to its neighbors except the ones
+    it came from, and goes back to the default color. A neighbor reached by
+    several triangles toggles for each of them in frontier order: it takes the
+    color when it differs and goes back to the default color when it is the same.
+    The neighbors that end up colored make the next frontier.
+    """
+
+    __frontier: np.ndarray
+    __came_from: np.ndarray
+
+    @property
+    def frontier(self):
+        return self.__frontier
+
+    def __init__(self, start_triangles):
+        self.__frontier = np.unique(np.asarray(start_triangles, dtype=np.int64))
+        self.__came_from = np.zeros((len(self.__frontier), 3), dtype=bool)
+
+    def step(self, simulation: MeshSimulation):
+        frontier = self.__frontier
+        if len(frontier) == 0:
+            return
+        neighbors = simulation.neighbors
+        color_indices = simulation.color_indices
+        default_index = MeshSimulation.DEFAULT_COLOR_INDEX
+
+        # Every (source, target) pair in frontier order
+        adjacent = neighbors[frontier]
+        passes = (adjacent >= 0) & ~self.__came_from
+        sources = np.repeat(frontier, 3)[passes.ravel()]
+        targets = adjacent[passes].astype(np.int64)
+        colors = color_indices[sources]
+        initial_colors = color_indices[targets]
+        color_indices[frontier] = default_index
+        if len(targets) == 0:
+            self.__frontier = np.empty(0, dtype=np.int64)
+            self.__came_from = np.zeros((0, 3), dtype=bool)
+            return
+
+        # Group the pairs by target and find the last run of the same color
+        order = np.argsort(targets, kind="stable")
+        targets = targets[order]
+        sources = sources[order]
+        colors = colors[order]
+        initial_colors = initial_colors[order]
+        group_starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+        group_ends = np.r_[group_starts[1:], len(targets)] - 1
+        run_starts = np.flatnonzero(np.r_[True, (targets[1:] != targets[:-1])
+                                          | (colors[1:] != colors[:-1])])
+        last_run_starts = run_starts[np.searchsorted(run_starts, group_ends, side="right") - 1]
+        run_lengths = group_ends - last_run_starts + 1
+
+        # Toggle from the color before the last run
+        last_colors = colors[group_ends]
+        toggles_from_same = (last_run_starts == group_starts) \
+            & (initial_colors[group_ends] == last_colors)
+        colored = (run_lengths % 2 == 1) != toggles_from_same
+        group_targets = targets[group_starts]
+        color_indices[group_targets] = np.where(colored, last_colors, default_index)
+
+        # The colored targets go on, remembering where they were reached from
+        reached_from = (neighbors[targets] == sources[:, None]).astype(np.uint8)
+        came_from = np.maximum.reduceat(reached_from, group_starts, axis=0).astype(bool)
+        self.__frontier = group_targets[colored]
+        self.__came_from = came_from[colored]
+
+
+class MoveRule(Rule):
+    """
+    Walkers moving over the default colored triangles.
+
+    Every frontier triangle moves its color to a random neighbor that has the
+    default color and is not the triangle it came from, leaving its own color
+    behind. A walker with nowhere to go stops. When walkers choose the same
+    triangle, one of them moves and the others stay for this tick.
+    """
+
+    __frontier: np.ndarray
+    __previous: np.ndarray
+
+    @property
+    def frontier(self):
+        return self.__frontier
+
+    def __init__(self, start_triangles):
+        self.__frontier = np.unique(np.asarray(start_triangles, dtype=np.int64))
+        self.__previous = np.full(len(self.__frontier), -1, dtype=np.int64)
+
+    def step(self, simulation: MeshSimulation):
+        frontier = self.__frontier
+        if len(frontier) == 0:
+            return
+        color_indices = simulation.color_indices
+        rng = simulation.rng
+
+        # Choose a random free neighbor for every walker
+        adjacent = simulation.neighbors[frontier].astype(np.int64)
+        free = (adjacent >= 0) & (adjacent != self.__previous[:, None])
+        free &= color_indices[np.maximum(adjacent, 0)] == MeshSimulation.DEFAULT_COLOR_INDEX
+        keys = np.where(free, rng.random(adjacent.shape), -1.0)
+        choices = keys.argmax(axis=1)
+        moving = free[np.arange(len(frontier)), choices]
+        walkers = np.flatnonzero(moving)
+        targets = adjacent[walkers, choices[walkers]]
+
+        # One walker per target moves, in a random order
+        shuffle = rng.permutation(len(walkers))
+        _, first = np.unique(targets[shuffle], return_index=True)
+        movers = walkers[shuffle[first]]
+        targets = targets[shuffle[first]]
+        color_indices[targets] = color_indices[frontier[movers]]
+
+        # Walkers that lost the target stay where they are
+        next_frontier = frontier.copy()
+        next_previous = self.__previous.copy()
+        next_frontier[movers] = targets
+        next_previous[movers] = frontier[movers]
+        self.__frontier = next_frontier[moving]
+        self.__previous = next_previous[moving]
@@ -0,0 +1,139 @@
+"""
+Module for finding the triangle of a mesh containing a point.
+"""
+
+import math
+import numpy as np
+
+
+class TriangleGrid:
+    """
+    Uniform grid of triangle buckets over the bounding box of the vertices.
+
+    The box is cut into about CELLS_PER_TRIANGLE square cells per triangle,
+    and every triangle is put in the bucket of each cell its bounding box
+    overlaps. The buckets are kept in compressed sparse row form: the
+    triangles of cell c are indices[indptr[c]:indptr[c + 1]].
+    A point is located by testing the few triangles of its cell, so the
+    expected time of a query does not depend on the size of the mesh.
+    """
+
+    CELLS_PER_TRIANGLE = 0.5
+
+    __vertices: np.ndarray
+    __triangles: np.ndarray
+    __origin: np.ndarray
+    __cell_size: float
+    __num_columns: int
+    __num_rows: int
+    __indptr: np.ndarray
+    __indices: np.ndarray
+
+    @property
+    def cell_size(self):
+        return self.__cell_size
+
+    @property
+    def shape(self):
+        """ (rows, columns) of the grid. """
+        return self.__num_rows, self.__num_columns
+
+    def __init__(self, vertices: np.ndarray, triangles: np.ndarray):
+        """ "triangles" are vertex indices in counterclockwise order, as in "TriangleMesh". """
+        self.__vertices = vertices
+        self.__triangles = triangles
+        if len(triangles) == 0:
+            self.__origin = np.zeros(2)
+            self.__cell_size = 1.0
+            self.__num_columns = self.__num_rows = 0
+            self.__indptr = np.zeros(1, dtype=np.int64)
+            self.__indices = np.empty(0, dtype=np.int32)
+            return
+
+        corners = vertices[triangles]
+        low = corners.min(axis=1)
+        high = corners.max(axis=1)
+        self.__origin = low.min(axis=0)
+        size = np.maximum(high.max(axis=0) - self.__origin, np.finfo(np.float64).tiny)
+        self.__cell_size = math.sqrt(size[0] * size[1] / (len(triangles) * self.CELLS_PER_TRIANGLE)) \
+            or float(size.max())
+        self.__num_columns = int(size[0] // self.__cell_size) + 1
+        self.__num_rows = int(size[1] // self.__cell_size) + 1
+
+        # Every (cell, triangle) pair of the cells overlapped by the bounding boxes
+        first = self.__to_cell_coordinates(low)
+        last = self.__to_cell_coordinates(high)
+        widths = last[:, 0] - first[:, 0] + 1
+        counts = widths * (last[:, 1] - first[:, 1] + 1)
+        owners = np.repeat(np.arange(len(triangles), dtype=np.int32), counts)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+        columns = first[owners, 0] + offsets % widths[owners]
+        rows = first[owners, 1] + offsets // widths[owners]
+        cells = rows * self.__num_columns + columns
+
+        order = np.argsort(cells, kind="stable")
+        self.__indices = owners[order]
+        self.__indptr = np.zeros(self.__num_rows * self.__num_columns + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.__num_rows * self.__num_columns),
+                  out=self.__indptr[1:])
+
+    def locate(self, x: float, y: float) -> int:
+        """ Index of a triangle containing (x, y), or -1 when no triangle does. """
+        cell = int(self.get_cells(np.array([[x, y]], dtype=np.float64))[0])
+        if cell < 0:
+            return -1
+        candidates = self.__indices[self.__indptr[cell]:self.__indptr[cell + 1]]
+        inside = self.contains(candidates, np.full(len(candidates), x), np.full(len(candidates), y))
+        found = np.flatnonzero(inside)
+        return int(candidates[found[0]]) if len(found) > 0 else -1
+
+    def locate_many(self, points: np.ndarray) -> np.ndarray:
+        """
+        Batched "locate" for a float (N, 2) array of points.
+        Returns an int32 array of triangle indices with -1 for the points
+        outside the mesh. The k-th candidates of all pending points are
+        tested together, so the loop runs as many times as the largest bucket.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        result = np.full(len(points), -1, dtype=np.int32)
+        cells = self.get_cells(points)
+        pending = np.flatnonzero(cells >= 0)
+        starts = self.__indptr[cells[pending]]
+        counts = self.__indptr[cells[pending] + 1] - starts
+        keep = counts > 0
+        pending, starts, counts = pending[keep], starts[keep], counts[keep]
+
+        k = 0
+        while len(pending) > 0:
+            candidates = self.__indices[starts + k]
+            inside = self.contains(candidates, points[pending, 0], points[pending, 1])
+            result[pending[inside]] = candidates[inside]
+            keep = ~inside & (counts > k + 1)
+            pending, starts, counts = pending[keep], starts[keep], counts[keep]
+            k += 1
+        return result
+
+    def contains(self, triangles: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """ Whether each of "triangles" contains the point of the same position, boundary included. """
+        corners = self.__vertices[self.__triangles[triangles]]
+        inside = np.ones(len(triangles), dtype=bool)
+        for i in range(3):
+            a = corners[:, i]
+            b = corners[:, (i + 1) % 3]
+            inside &= (b[:, 0] - a[:, 0]) * (ys - a[:, 1]) - (b[:, 1] - a[:, 1]) * (xs - a[:, 0]) >= 0
+        return inside
+
+    def get_cells(self, points: np.ndarray) -> np.ndarray:
+        """ Flat cell index of each point, or -1 when it is outside the grid. """
+        coordinates = np.floor((points - self.__origin) / self.__cell_size)
+        outside = ~(coordinates >= 0).all(axis=1) \
+            | (coordinates[:, 0] >= self.__num_columns) | (coordinates[:, 1] >= self.__num_rows)
+        coordinates[outside] = 0
+        cells = coordinates[:, 1].astype(np.int64) * self.__num_columns + coordinates[:, 0].astype(np.int64)
+        cells[outside] = -1
+        return cells
+
+    def __to_cell_coordinates(self, points: np.ndarray) -> np.ndarray:
+        """ (column, row) of the cell of each point, clipped to the grid. """
+        coordinates = np.floor((points - self.__origin) / self.__cell_size).astype(np.int64)
+        return np.clip(coordinates, 0, [self.__num_columns - 1, self.__num_rows - 1])
@@ -0,0 +1,109 @@
+"""
+Module for phase timers and counters.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class Stats:
+    """
+    Phase timers and counters shared by the whole program through STATS.
+
+    A phase is timed with "with STATS.phase(name):" and keeps the number of
+    calls, the total time and the longest call. A counter is a plain sum,
+    e.g. the in-circle tests of a triangulation or the canvas items touched.
+    Counters counted with "per_frame" are also reported per frame,
+    a frame being one FRAMES count.
+    The sums are updated under a lock, so several threads can time and
+    count into the same STATS.
+    """
+
+    FRAMES = "frames"
+
+    __timers: dict
+    __counters: dict
+    __frame_counters: set
+    __enabled: bool
+    __lock: threading.Lock
+
+    @property
+    def enabled(self):
+        return self.__enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        self.__enabled = enabled
+
+    @property
+    def timers(self) -> dict:
+        """ name -> {"calls", "total", "max"} with the times in seconds. """
+        with self.__lock:
+            return {name: {"calls": calls, "total": total, "max": longest}
+                    for name, (calls, total, longest) in self.__timers.items()}
+
+    @property
+    def counters(self) -> dict:
+        with self.__lock:
+            return dict(self.__counters)
+
+    def __init__(self, enabled: bool = True):
+        self.__enabled = enabled
+        self.__lock = threading.Lock()
+        self.reset()
+
+    @contextmanager
+    def phase(self, name: str):
+        if not self.__enabled:
+            yield
+            return
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - begin)
+
+    def add_time(self, name: str, seconds: float):
+        with self.__lock:
+            timer = self.__timers.get(name)
+            if timer is None:
+                self.__timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, amount: int = 1, per_frame: bool = False):
+        if self.__enabled:
+            with self.__lock:
+                self.__counters[name] = self.__counters.get(name, 0) + amount
+                if per_frame:
+                    self.__frame_counters.add(name)
+
+    def reset(self):
+        with self.__lock:
+            self.__timers = dict()
+            self.__counters = dict()
+            self.__frame_counters = set()
+
+    def get_summary(self) -> str:
+        with self.__lock:
+            return self.__format_summary()
+
+    def __format_summary(self) -> str:
+        lines = [f"{'phase':24}{'calls':>8}{'total(s)':>12}{'mean(ms)':>12}{'max(ms)':>12}"]
+        for name, (calls, total, longest) in self.__timers.items():
+            lines.append(f"{name:24}{calls:>8}{total:>12.3f}"
+                         f"{total / calls * 1000:>12.3f}{longest * 1000:>12.3f}")
+
+        frames = self.__counters.get(self.FRAMES, 0)
+        lines.append("")
+        lines.append(f"{'counter':24}{'total':>14}{'per frame':>14}")
+        for name, value in self.__counters.items():
+            per_frame = f"{value / frames:>14.1f}" if frames and name in self.__frame_counters else ""
+            lines.append(f"{name:24}{value:>14}{per_frame}")
+        return "\n".join(lines)
+
+
+STATS = Stats()
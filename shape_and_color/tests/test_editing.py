@@ -0,0 +1,76 @@
+"""
+Headless checks of "DelaunayTriangles.insert_point" and "remove_point" on
+meshes changed in place by "KineticMesh" and on loaded meshes.
+
+Run from the repository root with "python -m unittest discover shape_and_color/tests".
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from delaunay_triangles import DelaunayTriangles
+from kinetic import KineticMesh
+from libs import Point
+from mesh import TriangleMesh
+
+
+WIDTH = 800
+HEIGHT = 400
+NUM_POINTS = 200
+NUM_EDITS = 40
+
+
+class EditingTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(2)
+        self.delaunay_triangles = DelaunayTriangles(WIDTH, HEIGHT)
+        self.delaunay_triangles.triangulation(
+            DelaunayTriangles.create_points_randomly(WIDTH, HEIGHT, NUM_POINTS, seed=3), seed=1)
+
+    def edit(self):
+        """ Insert and remove random points, checking the mesh after each of them. """
+        for i in range(NUM_EDITS):
+            point = Point(self.rng.uniform(0, WIDTH), self.rng.uniform(0, HEIGHT))
+            if i % 2 == 0:
+                self.delaunay_triangles.insert_point(point)
+            else:
+                self.delaunay_triangles.remove_point(point)
+            self.assert_delaunay(self.delaunay_triangles.mesh)
+
+    def assert_delaunay(self, mesh: TriangleMesh):
+        vertices = mesh.vertices
+        triangles = mesh.triangles
+        self.assertTrue((KineticMesh.compute_double_areas(vertices, triangles) > 0).all(),
+                        "a triangle is clockwise or flat")
+        np.testing.assert_array_equal(mesh.neighbors, TriangleMesh.compute_neighbors(triangles))
+
+        sides = np.argwhere(mesh.neighbors >= 0)
+        illegal = KineticMesh.compute_illegal_sides(vertices, triangles, mesh.neighbors, sides)
+        self.assertFalse(illegal.any(), "a side is not Delaunay")
+
+    def test_edit_after_drift(self):
+        kinetic_mesh = KineticMesh(self.delaunay_triangles.mesh, speed=200, time_step=0.1, seed=4)
+        for i in range(20):
+            kinetic_mesh.step()
+        self.assertGreater(kinetic_mesh.num_flips, 0)
+        self.assert_delaunay(self.delaunay_triangles.mesh)
+        self.edit()
+
+    def test_edit_after_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mesh.mesh")
+            self.delaunay_triangles.mesh.save(path)
+            loaded = DelaunayTriangles(WIDTH, HEIGHT)
+            loaded.load(path, mmap=False)
+        self.delaunay_triangles = loaded
+        self.edit()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Headless check that a mesh written by the batch generation is the one a
+moderator builds for the same size, density and seed, so that a batch
+output directory can be used as the cache of the moderators.
+
+Run from the repository root with "python -m unittest discover shape_and_color/tests".
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from batch import generate_mesh_file
+from mesh import TriangleMesh
+from moderators import DisplayModerator
+from renderers import RasterRenderer
+
+
+SIZES = ((1600, 800), (800, 600), (333, 777))
+SEEDS = (0, 1, 2)
+
+
+class MeshCacheTest(unittest.TestCase):
+    def test_batch_mesh_is_moderator_mesh(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for width, height in SIZES:
+                for seed in SEEDS:
+                    with self.subTest(width=width, height=height, seed=seed):
+                        moderator = DisplayModerator(None, width, height, seed=seed,
+                                                     renderer=RasterRenderer(width, height))
+                        density = 1 / moderator.num_points_adjuster
+                        path, num_triangles = generate_mesh_file(
+                            (directory, width, height, density, seed, moderator.delaunay_triangles.engine))
+                        written = TriangleMesh.load(path, mmap=False)
+                        built = moderator.delaunay_triangles.mesh
+                        np.testing.assert_array_equal(written.vertices, built.vertices)
+                        np.testing.assert_array_equal(written.triangles, built.triangles)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Headless checks of "IncreaseRule" and "MoveRule" on small hand-built meshes.
+
+Run from the repository root with "python -m unittest discover shape_and_color/tests".
+"""
+
+import math
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from mesh import TriangleMesh
+from simulation import MeshSimulation, IncreaseRule, MoveRule
+
+
+# Color indices, 0 being the default color
+RED = 1
+BLUE = 2
+GRAY = 3
+
+
+def create_hexagon() -> TriangleMesh:
+    """ Six triangles around the center, triangle i between triangles i - 1 and i + 1. """
+    vertices = [(0.0, 0.0)] + [(math.cos(i * math.pi / 3), math.sin(i * math.pi / 3)) for i in range(6)]
+    triangles = [(0, i + 1, (i + 1) % 6 + 1) for i in range(6)]
+    return TriangleMesh(vertices, triangles)
+
+
+def create_star() -> TriangleMesh:
+    """ Triangle 0 with triangles 1, 2 and 3 on its sides, which have no other neighbor. """
+    vertices = [(0.0, 0.0), (2.0, 0.0), (1.0, 2.0), (1.0, -1.0), (2.5, 1.5), (-0.5, 1.5)]
+    triangles = [(0, 1, 2), (0, 3, 1), (1, 4, 2), (2, 5, 0)]
+    return TriangleMesh(vertices, triangles)
+
+
+class IncreaseRuleTest(unittest.TestCase):
+    def create_simulation(self, colors: dict) -> MeshSimulation:
+        mesh = create_hexagon()
+        for triangle, color in colors.items():
+            mesh.set_color_index(triangle, color)
+        return MeshSimulation(mesh, IncreaseRule(list(colors)), seed=0)
+
+    def assert_step(self, simulation: MeshSimulation, frontier: list, color_indices: list):
+        simulation.step()
+        np.testing.assert_array_equal(simulation.rule.frontier, frontier)
+        np.testing.assert_array_equal(simulation.color_indices, color_indices)
+
+    def test_wave_meets_itself(self):
+        simulation = self.create_simulation({0: RED})
+        self.assert_step(simulation, [1, 5], [0, RED, 0, 0, 0, RED])
+        self.assert_step(simulation, [2, 4], [0, 0, RED, 0, RED, 0])
+        # Triangle 3 takes the color from 2 and goes back to the default color when 4 brings the same one
+        self.assert_step(simulation, [], [0, 0, 0, 0, 0, 0])
+        self.assertTrue(simulation.is_finished)
+
+    def test_waves_of_two_colors_meet(self):
+        simulation = self.create_simulation({1: RED, 5: BLUE})
+        # Triangle 0 is reached from 1 and then from 5, and keeps the last color
+        self.assert_step(simulation, [0, 2, 4], [BLUE, 0, RED, 0, BLUE, 0])
+        # Triangle 0 came from both of its neighbors and stops
+        self.assert_step(simulation, [3], [0, 0, 0, BLUE, 0, 0])
+        self.assert_step(simulation, [], [0, 0, 0, 0, 0, 0])
+
+    def test_toggles_use_colors_at_start_of_tick(self):
+        # Triangles 0 and 1 reach each other while both are still colored
+        simulation = self.create_simulation({0: RED, 1: RED})
+        self.assert_step(simulation, [2, 5], [0, 0, RED, 0, 0, RED])
+
+
+class MoveRuleTest(unittest.TestCase):
+    def test_walkers_choose_same_target(self):
+        winners = set()
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                mesh = create_star()
+                mesh.set_color_index(1, RED)
+                mesh.set_color_index(2, BLUE)
+                simulation = MeshSimulation(mesh, MoveRule([1, 2]), seed=seed)
+
+                # Both walkers can only go to triangle 0; one moves and the other waits
+                simulation.step()
+                winner = 1 if simulation.color_indices[0] == RED else 2
+                loser = 3 - winner
+                winners.add(winner)
+                expected_frontier = [0, 0]
+                expected_frontier[loser - 1] = loser
+                np.testing.assert_array_equal(simulation.rule.frontier, expected_frontier)
+                winner_color = RED if winner == 1 else BLUE
+                np.testing.assert_array_equal(simulation.color_indices, [winner_color, RED, BLUE, 0])
+
+                # The winner goes on to the last free triangle and the loser has nowhere to go
+                simulation.step()
+                np.testing.assert_array_equal(simulation.rule.frontier, [3])
+                np.testing.assert_array_equal(simulation.color_indices, [winner_color, RED, BLUE, winner_color])
+
+                # The winner does not go back
+                simulation.step()
+                self.assertTrue(simulation.is_finished)
+        self.assertEqual(winners, {1, 2})
+
+    def test_walker_avoids_colored_triangles(self):
+        mesh = create_star()
+        mesh.set_color_index(1, RED)
+        mesh.set_color_index(2, GRAY)
+        mesh.set_color_index(3, GRAY)
+        simulation = MeshSimulation(mesh, MoveRule([1]), seed=0)
+        simulation.step()
+        np.testing.assert_array_equal(simulation.rule.frontier, [0])
+        np.testing.assert_array_equal(simulation.color_indices, [RED, RED, GRAY, GRAY])
+        simulation.step()
+        self.assertTrue(simulation.is_finished)
+        np.testing.assert_array_equal(simulation.color_indices, [RED, RED, GRAY, GRAY])
+
+
+if __name__ == "__main__":
+    unittest.main()
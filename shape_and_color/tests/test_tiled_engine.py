@@ -0,0 +1,89 @@
+"""
+Headless checks that "TiledEngine" builds the triangulation of "SweepHullEngine",
+both when the tiles are stitched and when it falls back to one triangulation.
+
+Run from the repository root with "python -m unittest discover shape_and_color/tests".
+"""
+
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from triangulation_engines import SweepHullEngine, TiledEngine
+
+
+NUM_WORKERS = 2
+NUM_TILES = 6
+
+
+class RecordingEngine(SweepHullEngine):
+    """ Records the number of points of every triangulation run in this process. """
+    num_points = list()
+
+    def triangulate(self, points: np.ndarray) -> np.ndarray:
+        RecordingEngine.num_points.append(len(points))
+        return super().triangulate(points)
+
+
+class CheckedTiledEngine(TiledEngine):
+    """ Records the result of every Euler's formula check. """
+    def __init__(self):
+        super().__init__(num_workers=NUM_WORKERS, num_tiles=NUM_TILES, tile_engine=RecordingEngine)
+        self.checks = list()
+
+    def is_triangulation(self, triangles: np.ndarray, num_points: int) -> bool:
+        result = TiledEngine.is_triangulation(triangles, num_points)
+        self.checks.append(bool(result))
+        return result
+
+
+def create_grid(num_columns: int, num_rows: int) -> np.ndarray:
+    xs, ys = np.meshgrid(np.arange(num_columns, dtype=float), np.arange(num_rows, dtype=float))
+    return np.column_stack((xs.ravel(), ys.ravel()))
+
+
+class TiledEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.engine = CheckedTiledEngine()
+        RecordingEngine.num_points = list()
+
+    def assert_same_triangles(self, points: np.ndarray):
+        """ Same triangles as "SweepHullEngine" and counterclockwise, in any order. """
+        triangles = self.engine.triangulate(points)
+        expected = SweepHullEngine().triangulate(points)
+        self.assertEqual(len(triangles), len(expected))
+        np.testing.assert_array_equal(
+            np.unique(TiledEngine.get_canonical_triangles(triangles), axis=0),
+            np.unique(TiledEngine.get_canonical_triangles(expected), axis=0))
+
+    def test_random_points(self):
+        points = self.rng.random((30000, 2)) * [2000, 1000]
+        self.assertEqual(self.engine.get_num_tiles(len(points)), NUM_TILES)
+        self.assert_same_triangles(points)
+        self.assertEqual(self.engine.checks, [True])
+
+    def test_jittered_grid(self):
+        # The seams cross many nearly cocircular points, which are stitched
+        points = create_grid(250, 120) + self.rng.uniform(-0.3, 0.3, (30000, 2))
+        self.assert_same_triangles(points)
+        self.assertEqual(self.engine.checks, [True])
+        # Only the incomplete points were triangulated again in this process
+        self.assertEqual(len(RecordingEngine.num_points), 1)
+        self.assertGreater(RecordingEngine.num_points[0], 0)
+        self.assertLess(RecordingEngine.num_points[0], len(points))
+
+    def test_cocircular_grid(self):
+        # With the cocircular points the stitched triangles fail the check,
+        # and all points are triangulated at once
+        points = create_grid(250, 120)
+        self.assert_same_triangles(points)
+        self.assertEqual(self.engine.checks, [False])
+        self.assertEqual(RecordingEngine.num_points[-1], len(points))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,687 @@
+"""
+Module for alternative Delaunay triangulation engines.
+
+Every engine takes an (N, 2) array of distinct points and returns the
+Delaunay triangles as an int32 (M, 3) array of point indices in
+counterclockwise order.
+"""
+
+import math
+import os
+import numpy as np
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+
+class TriangulationEngine(ABC):
+    @abstractmethod
+    def triangulate(self, points: np.ndarray) -> np.ndarray:
+        pass
+
+    @staticmethod
+    def orient(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+        """ Positive when a, b and c are in counterclockwise order. """
+        return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+    @staticmethod
+    def in_circle(ax: float, ay: float, bx: float, by: float, cx: float, cy: float,
+                  dx: float, dy: float) -> bool:
+        """
+        Whether d is inside the circumscribed circle of the
+        counterclockwise triangle a, b, c.
+        """
+        adx = ax - dx
+        ady = ay - dy
+        bdx = bx - dx
+        bdy = by - dy
+        cdx = cx - dx
+        cdy = cy - dy
+        return (adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) \
+            + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) \
+            + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady) > 0
+
+    @staticmethod
+    def compute_circumcircles(points: np.ndarray, triangles: np.ndarray) -> tuple:
+        """ Center x, center y and radius arrays of the circumscribed circles of "triangles". """
+        a = points[triangles[:, 0]]
+        b = points[triangles[:, 1]] - a
+        c = points[triangles[:, 2]] - a
+        d = 2 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+        b2 = b[:, 0] ** 2 + b[:, 1] ** 2
+        c2 = c[:, 0] ** 2 + c[:, 1] ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            center_x = (c[:, 1] * b2 - b[:, 1] * c2) / d
+            center_y = (b[:, 0] * c2 - c[:, 0] * b2) / d
+        return a[:, 0] + center_x, a[:, 1] + center_y, np.hypot(center_x, center_y)
+
+
+class DivideAndConquerEngine(TriangulationEngine):
+    """
+    Guibas and Stolfi divide and conquer algorithm on a quad-edge structure.
+
+    Edge e is an integer. The four quad-edges of an edge record are
+    4 * k, 4 * k + 1 (rotated), 4 * k + 2 (symmetric) and 4 * k + 3.
+    """
+
+    __xs: list
+    __ys: list
+    __onext: list
+    __org: list
+
+    def triangulate(self, points: np.ndarray) -> np.ndarray:
+        if len(points) < 3:
+            return np.empty((0, 3), dtype=np.int32)
+
+        # Sort the points lexicographically
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        self.__xs = points[order, 0].tolist()
+        self.__ys = points[order, 1].tolist()
+        self.__onext = list()
+        self.__org = list()
+
+        self.__delaunay(0, len(order))
+        triangles = self.__collect_triangles()
+        return order[triangles].astype(np.int32).reshape(-1, 3)
+
+    def __delaunay(self, begin: int, end: int) -> tuple:
+        """
+        Triangulate points [begin, end) and return the counterclockwise
+        convex hull edge out of the leftmost point and the clockwise
+        convex hull edge out of the rightmost point.
+        """
+        count = end - begin
+        if count == 2:
+            a = self.__make_edge(begin, begin + 1)
+            return a, a ^ 2
+        if count == 3:
+            a = self.__make_edge(begin, begin + 1)
+            b = self.__make_edge(begin + 1, begin + 2)
+            self.__splice(a ^ 2, b)
+            orientation = self.__orient(begin, begin + 1, begin + 2)
+            if orientation > 0:
+                self.__connect(b, a)
+                return a, b ^ 2
+            if orientation < 0:
+                c = self.__connect(b, a)
+                return c ^ 2, c
+            return a, b ^ 2
+
+        middle = (begin + end) // 2
+        left_outside, left_inside = self.__delaunay(begin, middle)
+        right_inside, right_outside = self.__delaunay(middle, end)
+
+        org = self.__org
+
+        # Compute the lower common tangent of the two halves
+        while True:
+            if self.__left_of(org[right_inside], left_inside):
+                left_inside = self.__lnext(left_inside)
+            elif self.__right_of(org[left_inside], right_inside):
+                right_inside = self.__rprev(right_inside)
+            else:
+                break
+
+        base = self.__connect(right_inside ^ 2, left_inside)
+        if org[left_inside] == org[left_outside]:
+            left_outside = base ^ 2
+        if org[right_inside] == org[right_outside]:
+            right_outside = base
+
+        # Merge the two halves from the bottom to the top
+        while True:
+            left_candidate = self.__onext[base ^ 2]
+            if self.__is_valid(left_candidate, base):
+                while self.__in_circle(org[base ^ 2], org[base], org[left_candidate ^ 2],
+                                       org[self.__onext[left_candidate] ^ 2]):
+                    following = self.__onext[left_candidate]
+                    self.__delete_edge(left_candidate)
+                    left_candidate = following
+
+            right_candidate = self.__oprev(base)
+            if self.__is_valid(right_candidate, base):
+                while self.__in_circle(org[base ^ 2], org[base], org[right_candidate ^ 2],
+                                       org[self.__oprev(right_candidate) ^ 2]):
+                    following = self.__oprev(right_candidate)
+                    self.__delete_edge(right_candidate)
+                    right_candidate = following
+
+            left_valid = self.__is_valid(left_candidate, base)
+            right_valid = self.__is_valid(right_candidate, base)
+            if not left_valid and not right_valid:
+                break
+            if not left_valid or (right_valid and self.__in_circle(
+                    org[left_candidate ^ 2], org[left_candidate],
+                    org[right_candidate], org[right_candidate ^ 2])):
+                base = self.__connect(right_candidate, base ^ 2)
+            else:
+                base = self.__connect(base ^ 2, left_candidate ^ 2)
+
+        return left_outside, right_outside
+
+    def __collect_triangles(self) -> np.ndarray:
+        """ Walk the left face of every edge and keep counterclockwise triangles. """
+        org = self.__org
+        visited = [False] * len(org)
+        triangles = list()
+        for e in range(0, len(org), 2):
+            if visited[e] or org[e] < 0:
+                continue
+            e1 = self.__lnext(e)
+            e2 = self.__lnext(e1)
+            visited[e] = visited[e1] = visited[e2] = True
+            if self.__lnext(e2) != e:
+                continue
+            if self.__orient(org[e], org[e1], org[e2]) > 0:
+                triangles.extend((org[e], org[e1], org[e2]))
+        return np.array(triangles, dtype=np.int64)
+
+    def __make_edge(self, origin: int, destination: int) -> int:
+        e = len(self.__onext)
+        self.__onext.extend((e, e + 3, e + 2, e + 1))
+        self.__org.extend((origin, -1, destination, -1))
+        return e
+
+    def __splice(self, a: int, b: int):
+        onext = self.__onext
+        alpha = self.__rot(onext[a])
+        beta = self.__rot(onext[b])
+        onext[a], onext[b] = onext[b], onext[a]
+        onext[alpha], onext[beta] = onext[beta], onext[alpha]
+
+    def __connect(self, a: int, b: int) -> int:
+        """ Add an edge from the destination of a to the origin of b. """
+        e = self.__make_edge(self.__org[a ^ 2], self.__org[b])
+        self.__splice(e, self.__lnext(a))
+        self.__splice(e ^ 2, b)
+        return e
+
+    def __delete_edge(self, e: int):
+        self.__splice(e, self.__oprev(e))
+        self.__splice(e ^ 2, self.__oprev(e ^ 2))
+        self.__org[e] = self.__org[e ^ 2] = -1
+
+    @staticmethod
+    def __rot(e: int) -> int:
+        return (e & ~3) | ((e + 1) & 3)
+
+    def __lnext(self, e: int) -> int:
+        e = self.__onext[(e & ~3) | ((e + 3) & 3)]
+        return (e & ~3) | ((e + 1) & 3)
+
+    def __oprev(self, e: int) -> int:
+        e = self.__onext[(e & ~3) | ((e + 1) & 3)]
+        return (e & ~3) | ((e + 1) & 3)
+
+    def __rprev(self, e: int) -> int:
+        return self.__onext[e ^ 2]
+
+    def __orient(self, a: int, b: int, c: int) -> float:
+        xs = self.__xs
+        ys = self.__ys
+        return (xs[b] - xs[a]) * (ys[c] - ys[a]) - (ys[b] - ys[a]) * (xs[c] - xs[a])
+
+    def __in_circle(self, a: int, b: int, c: int, d: int) -> bool:
+        xs = self.__xs
+        ys = self.__ys
+        x = xs[d]
+        y = ys[d]
+        adx = xs[a] - x
+        ady = ys[a] - y
+        bdx = xs[b] - x
+        bdy = ys[b] - y
+        cdx = xs[c] - x
+        cdy = ys[c] - y
+        return (adx * adx + ady * ady) * (bdx * cdy - cdx * bdy) \
+            + (bdx * bdx + bdy * bdy) * (cdx * ady - adx * cdy) \
+            + (cdx * cdx + cdy * cdy) * (adx * bdy - bdx * ady) > 0
+
+    def __left_of(self, point: int, e: int) -> bool:
+        return self.__orient(point, self.__org[e], self.__org[e ^ 2]) > 0
+
+    def __right_of(self, point: int, e: int) -> bool:
+        return self.__orient(point, self.__org[e ^ 2], self.__org[e]) > 0
+
+    def __is_valid(self, e: int, base: int) -> bool:
+        """ Whether the destination of e is above the base edge. """
+        org = self.__org
+        return self.__orient(org[e ^ 2], org[base ^ 2], org[base]) > 0
+
+
+class SweepHullEngine(TriangulationEngine):
+    """
+    Radial sweep-hull algorithm (S-hull).
+
+    Points are added in order of their distance from the circumscribed
+    circle of a small seed triangle. Each point is outside the current
+    convex hull, so it is connected to the hull edges it can see and the
+    new triangles are legalized by flipping edges.
+
+    Half-edge h = 3 * t + i goes from the vertex i of triangle t to the
+    next vertex, and its opposite half-edge is stored in "halfedges".
+    """
+
+    __xs: list
+    __ys: list
+    __triangles: list
+    __halfedges: list
+    __hull_start: int
+    __hull_prev: list
+    __hull_next: list
+    __hull_triangle: list
+
+    def triangulate(self, points: np.ndarray) -> np.ndarray:
+        count = len(points)
+        if count < 3:
+            return np.empty((0, 3), dtype=np.int32)
+        xs = self.__xs = points[:, 0].tolist()
+        ys = self.__ys = points[:, 1].tolist()
+
+        # Seed point close to the center of the bounding box
+        center = (points.min(axis=0) + points.max(axis=0)) / 2
+        i0 = int(np.argmin(((points - center) ** 2).sum(axis=1)))
+
+        # The point closest to the seed
+        distances = ((points - points[i0]) ** 2).sum(axis=1)
+        distances[i0] = np.inf
+        i1 = int(np.argmin(distances))
+
+        # The point forming the smallest circumscribed circle with them
+        b = points[i1] - points[i0]
+        c = points - points[i0]
+        d = 2 * (b[0] * c[:, 1] - b[1] * c[:, 0])
+        b2 = b[0] ** 2 + b[1] ** 2
+        c2 = c[:, 0] ** 2 + c[:, 1] ** 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            radii = ((c[:, 1] * b2 - b[1] * c2) ** 2 + (b[0] * c2 - c[:, 0] * b2) ** 2) / d ** 2
+        radii[(d == 0) | ~np.isfinite(radii)] = np.inf
+        radii[[i0, i1]] = np.inf
+        i2 = int(np.argmin(radii))
+        if not np.isfinite(radii[i2]):
+            # All points are collinear
+            return np.empty((0, 3), dtype=np.int32)
+        if self.orient(xs[i0], ys[i0], xs[i1], ys[i1], xs[i2], ys[i2]) < 0:
+            i1, i2 = i2, i1
+
+        x0, y0 = xs[i0], ys[i0]
+        center_x, center_y = self.__circumcenter(i0, i1, i2)
+        order = np.argsort(np.hypot(points[:, 0] - center_x, points[:, 1] - center_y),
+                           kind="stable")
+
+        # Counterclockwise hull as a linked list with an angular hash
+        self.__hull_prev = [0] * count
+        self.__hull_next = [0] * count
+        self.__hull_triangle = [0] * count
+        hull_prev = self.__hull_prev
+        hull_next = self.__hull_next
+        hull_triangle = self.__hull_triangle
+        hash_size = max(int(math.ceil(math.sqrt(count))), 1)
+        hull_hash = [-1] * hash_size
+
+        def hash_key(x: float, y: float) -> int:
+            return int(self.__pseudo_angle(x - center_x, y - center_y) * hash_size) % hash_size
+
+        self.__hull_start = i0
+        hull_next[i0] = hull_prev[i2] = i1
+        hull_next[i1] = hull_prev[i0] = i2
+        hull_next[i2] = hull_prev[i1] = i0
+        hull_triangle[i0] = 0
+        hull_triangle[i1] = 1
+        hull_triangle[i2] = 2
+        hull_hash[hash_key(x0, y0)] = i0
+        hull_hash[hash_key(xs[i1], ys[i1])] = i1
+        hull_hash[hash_key(xs[i2], ys[i2])] = i2
+
+        self.__triangles = list()
+        self.__halfedges = list()
+        self.__add_triangle(i0, i1, i2, -1, -1, -1)
+
+        orient = self.orient
+        for i in order.tolist():
+            if i == i0 or i == i1 or i == i2:
+                continue
+            x = xs[i]
+            y = ys[i]
+
+            # Find a hull edge visible from the point
+            start = 0
+            key = hash_key(x, y)
+            for j in range(hash_size):
+                start = hull_hash[(key + j) % hash_size]
+                if start != -1 and start != hull_next[start]:
+                    break
+            start = hull_prev[start]
+            e = start
+            while orient(xs[e], ys[e], xs[hull_next[e]], ys[hull_next[e]], x, y) >= 0:
+                e = hull_next[e]
+                if e == start:
+                    e = -1
+                    break
+            if e == -1:
+                # Point on the hull (near duplicate)
+                continue
+
+            # Add the first triangle from the point
+            t = self.__add_triangle(e, i, hull_next[e], -1, -1, hull_triangle[e])
+            hull_triangle[i] = self.__legalize(t + 2)
+            hull_triangle[e] = t
+
+            # Walk forward through the hull
+            n = hull_next[e]
+            q = hull_next[n]
+            while orient(xs[n], ys[n], xs[q], ys[q], x, y) < 0:
+                t = self.__add_triangle(n, i, q, hull_triangle[i], -1, hull_triangle[n])
+                hull_triangle[i] = self.__legalize(t + 2)
+                hull_next[n] = n
+                n = q
+                q = hull_next[n]
+
+            # Walk backward from the other side
+            if e == start:
+                q = hull_prev[e]
+                while orient(xs[q], ys[q], xs[e], ys[e], x, y) < 0:
+                    t = self.__add_triangle(q, i, e, -1, hull_triangle[e], hull_triangle[q])
+                    self.__legalize(t + 2)
+                    hull_triangle[q] = t
+                    hull_next[e] = e
+                    e = q
+                    q = hull_prev[e]
+
+            # Update the hull
+            self.__hull_start = hull_prev[i] = e
+            hull_next[e] = hull_prev[n] = i
+            hull_next[i] = n
+            hull_hash[hash_key(x, y)] = i
+            hull_hash[hash_key(xs[e], ys[e])] = e
+
+        return np.array(self.__triangles, dtype=np.int32).reshape(-1, 3)
+
+    def __add_triangle(self, i0: int, i1: int, i2: int, a: int, b: int, c: int) -> int:
+        t = len(self.__triangles)
+        self.__triangles.extend((i0, i1, i2))
+        self.__halfedges.extend((-1, -1, -1))
+        self.__link(t, a)
+        self.__link(t + 1, b)
+        self.__link(t + 2, c)
+        return t
+
+    def __link(self, a: int, b: int):
+        self.__halfedges[a] = b
+        if b != -1:
+            self.__halfedges[b] = a
+
+    def __legalize(self, a: int) -> int:
+        """
+        Flip the edge a and the edges around the new point until every
+        pair of triangles satisfies the Delaunay condition.
+
+                  pl                    pl
+                 /||\\                  /  \\
+              al/ || \\bl            al/    \\a
+               /  ||  \\              /      \\
+              /  a||b  \\    flip    /___ar___\\
+            p0\\   ||   /p1   =>   p0\\---bl---/p1
+               \\  ||  /              \\      /
+              ar\\ || /br             b\\    /br
+                 \\||/                  \\  /
+                  pr                    pr
+        """
+        xs = self.__xs
+        ys = self.__ys
+        triangles = self.__triangles
+        halfedges = self.__halfedges
+        stack = list()
+        while True:
+            b = halfedges[a]
+            a0 = a - a % 3
+            ar = a0 + (a + 2) % 3
+
+            if b == -1:
+                if not stack:
+                    break
+                a = stack.pop()
+                continue
+
+            b0 = b - b % 3
+            al = a0 + (a + 1) % 3
+            bl = b0 + (b + 2) % 3
+            p0 = triangles[ar]
+            pr = triangles[a]
+            pl = triangles[al]
+            p1 = triangles[bl]
+
+            if self.in_circle(xs[p0], ys[p0], xs[pr], ys[pr], xs[pl], ys[pl], xs[p1], ys[p1]):
+                triangles[a] = p1
+                triangles[b] = p0
+                hbl = halfedges[bl]
+
+                # The flipped edge was on the hull, fix the reference to it
+                if hbl == -1:
+                    e = self.__hull_start
+                    while True:
+                        if self.__hull_triangle[e] == bl:
+                            self.__hull_triangle[e] = a
+                            break
+                        e = self.__hull_prev[e]
+                        if e == self.__hull_start:
+                            break
+
+                self.__link(a, hbl)
+                self.__link(b, halfedges[ar])
+                self.__link(ar, bl)
+                stack.append(b0 + (b + 1) % 3)
+            else:
+                if not stack:
+                    break
+                a = stack.pop()
+        return ar
+
+    def __circumcenter(self, a: int, b: int, c: int) -> tuple:
+        xs = self.__xs
+        ys = self.__ys
+        bx = xs[b] - xs[a]
+        by = ys[b] - ys[a]
+        cx = xs[c] - xs[a]
+        cy = ys[c] - ys[a]
+        d = 2 * (bx * cy - by * cx)
+        b2 = bx * bx + by * by
+        c2 = cx * cx + cy * cy
+        return xs[a] + (cy * b2 - by * c2) / d, ys[a] + (bx * c2 - cx * b2) / d
+
+    @staticmethod
+    def __pseudo_angle(dx: float, dy: float) -> float:
+        """ Monotonic in the angle of (dx, dy), in [0, 1). """
+        p = dx / (abs(dx) + abs(dy)) if dx or dy else 0.0
+        return (3 - p if dy > 0 else 1 + p) / 4
+
+
+class TiledEngine(TriangulationEngine):
+    """
+    Triangulates overlapping tiles in worker processes and stitches them.
+
+    The points are cut into a grid of tiles holding about the same number of
+    points, and every tile is extended by OVERLAP mean point spacings.
+    The points of each extended tile are triangulated by "tile_engine" in
+    a ProcessPoolExecutor. A tile knows every point inside its extended
+    rectangle, so a triangle whose circumscribed circle lies inside it is
+    a triangle of the whole triangulation, and only those are kept.
+
+    The seams are then repaired. A point is complete when the kept triangles
+    close a fan around it. Every missing triangle has incomplete vertices
+    only, so it is a triangle of the Delaunay triangulation of the incomplete
+    points. The missing ones are found in it by a flood fill starting on the
+    outer side of the open sides of the kept triangles, without crossing them.
+
+    The result is checked with Euler's formula. When the check fails, which
+    can happen with many cocircular points, all points are triangulated by
+    "tile_engine" at once.
+    """
+
+    # Extension of the tiles in mean point spacings
+    OVERLAP = 4
+    MIN_POINTS_PER_TILE = 5000
+    # Relative margin on the radii when checking that a circle is inside a tile
+    RADIUS_SLACK = 1e-9
+
+    __num_workers: int
+    __num_tiles: int
+    __tile_engine: type
+
+    @property
+    def num_workers(self):
+        return self.__num_workers
+
+    @property
+    def num_tiles(self):
+        return self.__num_tiles
+
+    def __init__(self, num_workers: int = None, num_tiles: int = None, tile_engine: type = None):
+        """
+        "num_workers" defaults to the number of CPUs and "num_tiles" to "num_workers".
+        "tile_engine" is the engine class run on each tile, "SweepHullEngine" by default.
+        """
+        self.__num_workers = num_workers or os.cpu_count() or 1
+        self.__num_tiles = num_tiles or self.__num_workers
+        self.__tile_engine = SweepHullEngine if tile_engine is None else tile_engine
+
+    def get_num_tiles(self, num_points: int) -> int:
+        """
+        Number of tiles the points are cut into, at most "num_tiles" with at
+        least MIN_POINTS_PER_TILE points each. Below 2, the points are
+        triangulated at once by "tile_engine".
+        """
+        return min(self.__num_tiles, num_points // self.MIN_POINTS_PER_TILE)
+
+    def triangulate(self, points: np.ndarray) -> np.ndarray:
+        num_tiles = self.get_num_tiles(len(points))
+        if num_tiles < 2:
+            return self.__tile_engine().triangulate(points)
+
+        kept = self.__triangulate_tiles(points, num_tiles)
+        triangles = self.__stitch(points, kept)
+        if not self.is_triangulation(triangles, len(points)):
+            return self.__tile_engine().triangulate(points)
+        return triangles
+
+    def __triangulate_tiles(self, points: np.ndarray, num_tiles: int) -> np.ndarray:
+        """ The triangles kept by the tiles, without duplicates. """
+        xs = points[:, 0]
+        ys = points[:, 1]
+
+        # Mean spacing in the bulk of the points, ignoring outliers such as a huge triangle
+        low = np.quantile(points, 0.01, axis=0)
+        high = np.quantile(points, 0.99, axis=0)
+        size = np.maximum(high - low, np.finfo(np.float64).tiny)
+        spacing = math.sqrt(size[0] * size[1] / (0.98 ** 2 * len(points)))
+        overlap = self.OVERLAP * spacing
+
+        # Columns and then rows of each column with the same number of points
+        num_columns = min(max(int(round(math.sqrt(num_tiles * size[0] / size[1]))), 1), num_tiles)
+        num_rows = max(int(round(num_tiles / num_columns)), 1)
+        x_edges = np.quantile(xs, np.linspace(0, 1, num_columns + 1))
+        x_edges[[0, -1]] = -np.inf, np.inf
+        columns = np.searchsorted(x_edges[1:-1], xs, side="right")
+        tiles = list()
+        for column in range(num_columns):
+            y_edges = np.quantile(ys[columns == column], np.linspace(0, 1, num_rows + 1))
+            y_edges[[0, -1]] = -np.inf, np.inf
+            for row in range(num_rows):
+                bounds = (x_edges[column] - overlap, y_edges[row] - overlap,
+                          x_edges[column + 1] + overlap, y_edges[row + 1] + overlap)
+                inside = (xs >= bounds[0]) & (ys >= bounds[1]) & (xs <= bounds[2]) & (ys <= bounds[3])
+                tiles.append((np.flatnonzero(inside), bounds))
+
+        with ProcessPoolExecutor(max_workers=min(self.__num_workers, len(tiles))) as executor:
+            futures = [executor.submit(triangulate_tile, points[indices], bounds, self.__tile_engine)
+                       for indices, bounds in tiles]
+            kept = [indices[future.result()] for (indices, bounds), future in zip(tiles, futures)]
+        return np.unique(self.get_canonical_triangles(np.concatenate(kept)), axis=0)
+
+    def __stitch(self, points: np.ndarray, kept: np.ndarray) -> np.ndarray:
+        """ Add the missing triangles to the kept ones. """
+        count = len(points)
+
+        # Sides of the kept triangles, directed as in their triangle
+        starts = kept.ravel().astype(np.int64)
+        ends = kept[:, [1, 2, 0]].ravel().astype(np.int64)
+        sides, inverse, side_counts = np.unique(np.minimum(starts, ends) * count + np.maximum(starts, ends),
+                                                return_inverse=True, return_counts=True)
+        is_open = side_counts[inverse] != 2
+
+        complete = np.zeros(count, dtype=bool)
+        complete[starts] = True
+        complete[starts[is_open]] = False
+        complete[ends[is_open]] = False
+        incomplete = np.flatnonzero(~complete)
+        candidates = incomplete[self.__tile_engine().triangulate(points[incomplete])]
+        if len(candidates) == 0:
+            return kept.astype(np.int32)
+
+        # Neighbor across each directed side of the candidates
+        candidate_starts = candidates.ravel().astype(np.int64)
+        candidate_ends = candidates[:, [1, 2, 0]].ravel().astype(np.int64)
+        directed = candidate_starts * count + candidate_ends
+        order = np.argsort(directed)
+        sorted_directed = directed[order]
+
+        def find_sides(keys: np.ndarray) -> np.ndarray:
+            """ Side of the candidates for each directed key, or -1. """
+            positions = np.minimum(np.searchsorted(sorted_directed, keys), len(order) - 1)
+            return np.where(sorted_directed[positions] == keys, order[positions], -1)
+
+        twins = find_sides(candidate_ends * count + candidate_starts)
+        walls = np.isin(np.minimum(candidate_starts, candidate_ends) * count
+                        + np.maximum(candidate_starts, candidate_ends), sides[side_counts == 1])
+        passable = (twins >= 0) & ~walls
+
+        # The candidates on the outer side of an open side are missing
+        seeds = find_sides(ends[is_open] * count + starts[is_open])
+        frontier = np.unique(seeds[seeds >= 0] // 3)
+        missing = np.zeros(len(candidates), dtype=bool)
+        missing[frontier] = True
+        while len(frontier) > 0:
+            frontier_sides = (3 * frontier[:, None] + np.arange(3)).ravel()
+            neighbors = twins[frontier_sides[passable[frontier_sides]]] // 3
+            frontier = np.unique(neighbors[~missing[neighbors]])
+            missing[frontier] = True
+        return np.concatenate((kept, candidates[missing])).astype(np.int32)
+
+    @staticmethod
+    def get_canonical_triangles(triangles: np.ndarray) -> np.ndarray:
+        """ Rotate each triangle so that its smallest vertex comes first, keeping the order. """
+        first = triangles.argmin(axis=1)
+        return triangles[np.arange(len(triangles))[:, None], (first[:, None] + np.arange(3)) % 3]
+
+    @staticmethod
+    def is_triangulation(triangles: np.ndarray, num_points: int) -> bool:
+        """
+        Whether "triangles" can be a triangulation of all the points: every
+        point is used, no side has more than 2 triangles, and the number of
+        triangles is 2 * points - hull sides - 2 (Euler's formula).
+        """
+        if len(np.unique(triangles)) != num_points:
+            return False
+        starts = triangles.ravel().astype(np.int64)
+        ends = triangles[:, [1, 2, 0]].ravel().astype(np.int64)
+        _, side_counts = np.unique(np.minimum(starts, ends) * num_points + np.maximum(starts, ends),
+                                   return_counts=True)
+        if (side_counts > 2).any():
+            return False
+        return len(triangles) == 2 * num_points - np.count_nonzero(side_counts == 1) - 2
+
+
+def triangulate_tile(points: np.ndarray, bounds: tuple, engine_class: type) -> np.ndarray:
+    """
+    Worker of "TiledEngine". Triangulate the points of an extended tile and
+    return the triangles whose circumscribed circle is inside
+    "bounds" = (x1, y1, x2, y2).
+    """
+    triangles = engine_class().triangulate(points)
+    if len(triangles) == 0:
+        return triangles
+    center_x, center_y, radii = TriangulationEngine.compute_circumcircles(points, triangles)
+    radii = radii * (1 + TiledEngine.RADIUS_SLACK)
+    x1, y1, x2, y2 = bounds
+    with np.errstate(invalid="ignore"):
+        inside = (center_x - radii > x1) & (center_y - radii > y1) \
+            & (center_x + radii < x2) & (center_y + radii < y2)
+    return triangles[inside]